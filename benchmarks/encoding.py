@@ -0,0 +1,89 @@
+#
+# Compare previous str()-based payload encoding with quantastica.qps_api.encoding
+# for 10-qubit state vectors and 8-qubit unitaries. Requires numpy.
+# str() of arrays is fast only because it truncates. The encoder writes the same text as str(list) at about the same
+# cost (repr of each element), plus checks of length and norm computed by NumPy.
+#
+# Usage (from repository root): python -m benchmarks.encoding [num_vector_pairs]
+#
+
+import sys
+import time
+import numpy as np
+
+from quantastica.qps_api.encoding import encode_vectors, encode_matrix
+
+
+def random_state(num_qubits, rng):
+    state = rng.normal(size=2 ** num_qubits) + 1j * rng.normal(size=2 ** num_qubits)
+    return state / np.linalg.norm(state)
+
+
+def random_unitary(num_qubits, rng):
+    dim = 2 ** num_qubits
+    q, r = np.linalg.qr(rng.normal(size=(dim, dim)) + 1j * rng.normal(size=(dim, dim)))
+    return q * (np.diagonal(r) / np.abs(np.diagonal(r)))
+
+
+def previous_vectors(vector_pairs):
+    text1 = ""
+    text2 = ""
+    for vector_pair in vector_pairs:
+        if(len(text1) > 0):
+            text1 += "\n"
+        if(len(text2) > 0):
+            text2 += "\n"
+        text1 += str(vector_pair[0])
+        text2 += str(vector_pair[1])
+    return text1, text2
+
+
+def measure(function, *args, repeat=5):
+    best = None
+    for i in range(repeat):
+        t = time.perf_counter()
+        output = function(*args)
+        elapsed = time.perf_counter() - t
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def report(name, measurement, text):
+    elapsed, output = measurement
+    output_text = text(output)
+    print(f"  {name:12s} {elapsed * 1000:9.2f} ms  {len(output_text):10d} chars  truncated: {'...' in output_text}")
+
+
+def main():
+    num_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+
+    rng = np.random.default_rng(1)
+
+    vector_pairs = [[random_state(10, rng), random_state(10, rng)] for i in range(num_pairs)]
+    unitary = random_unitary(8, rng)
+
+    #
+    # "str()" is what was sent before (lossy for arrays), "str(list)" is the previous lossless path (converting to lists first)
+    #
+    list_pairs = [[vector_pair[0].tolist(), vector_pair[1].tolist()] for vector_pair in vector_pairs]
+
+    print(f"{num_pairs} pairs of 10-qubit states")
+    report("str()", measure(previous_vectors, vector_pairs), lambda output: output[0] + output[1])
+    report("str(list)", measure(previous_vectors, list_pairs), lambda output: output[0] + output[1])
+    t_new, (new1, new2) = measure(encode_vectors, vector_pairs)
+    report("encoder", (t_new, (new1, new2)), lambda output: output[0] + output[1])
+
+    print("8-qubit unitary")
+    report("str()", measure(str, unitary), lambda output: output)
+    report("str(list)", measure(lambda matrix: str(matrix.tolist()), unitary), lambda output: output)
+    report("encoder", measure(encode_matrix, unitary), lambda output: output)
+
+    #
+    # Lossless check: parse encoded text back
+    #
+    decoded = np.array([complex(x) for x in new1.split("\n")[0][1:-1].split(", ")])
+    print("round-trip exact:", np.array_equal(decoded, vector_pairs[0][0]))
+
+
+if __name__ == "__main__":
+    main()
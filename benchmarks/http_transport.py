@@ -0,0 +1,63 @@
+#
+# Compare per-call requests.post() with the pooled keep-alive transport used by QPSAPI.http_post
+#
+# Usage (from repository root): python -m benchmarks.http_transport [num_requests] [num_threads]
+#
+
+import sys
+import time
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+from quantastica.qps_api.qps_api import QPSAPI, _urljoin
+from quantastica.qps_api.stub_server import QSTUBSERVER
+from quantastica.qps_api.metrics import _percentile
+
+
+def run(name, post, num_requests, num_threads):
+    latencies = []
+    latencies_lock = threading.Lock()
+
+    def one_request(i):
+        t = time.perf_counter()
+        response = post()
+        response.raise_for_status()
+        elapsed = time.perf_counter() - t
+        with latencies_lock:
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        list(executor.map(one_request, range(num_requests)))
+    total = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"{name:12s} {num_requests / total:10.1f} req/s   p50 {_percentile(latencies, 0.50) * 1000:7.3f} ms   p99 {_percentile(latencies, 0.99) * 1000:7.3f} ms")
+
+
+def main():
+    num_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    num_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    stub = QSTUBSERVER().start()
+    stub.add_job({ "_id": "stub", "status": "running" })
+
+    api = QPSAPI()
+    api.use_account("stub-token", stub.url)
+
+    url = _urljoin(api.api_url, "generator", "job", "status")
+    headers = {"Authorization": "Bearer " + api.api_token }
+    data = { "_id": "stub" }
+
+    print(f"{num_requests} requests, {num_threads} threads")
+
+    run("per-call", lambda: requests.post(url=url, headers=headers, json=data, timeout=api.http_timeout), num_requests, num_threads)
+    run("pooled", lambda: api.http_post(url=url, headers=headers, json=data), num_requests, num_threads)
+
+    api.close()
+    stub.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#
+# Measure import time of quantastica.qps_api with "python -X importtime" and guard against regressions:
+# fails (exit code 1) if median cumulative import time exceeds the budget, if heavy dependencies
+# (requests, urllib3, asyncio) are imported eagerly, or if QPS object is created at import time.
+#
+# Usage (from repository root): python -m benchmarks.import_time [budget_ms] [runs]
+#
+
+import sys
+import statistics
+import subprocess
+
+
+HEAVY_MODULES = ["requests", "urllib3", "asyncio", "concurrent.futures.thread"]
+
+CHECK_SCRIPT = """
+import sys
+import quantastica.qps_api as qps_api
+loaded = [name for name in {heavy!r} if name in sys.modules]
+qps_loaded = object.__getattribute__(qps_api.QPS, "_qps_api") is not None
+print("LOADED=" + ",".join(loaded))
+print("QPS_LOADED=" + str(qps_loaded))
+"""
+
+
+def import_time_us():
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import quantastica.qps_api"], capture_output=True, text=True, check=True)
+
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if(len(parts) == 3 and parts[2].strip() == "quantastica.qps_api"):
+            return int(parts[1].strip())
+
+    raise Exception("quantastica.qps_api not found in -X importtime output")
+
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 60.0
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+
+    # warm up (writes .pyc files)
+    import_time_us()
+
+    times_ms = [import_time_us() / 1000.0 for i in range(runs)]
+    median_ms = statistics.median(times_ms)
+
+    check = subprocess.run([sys.executable, "-c", CHECK_SCRIPT.format(heavy=HEAVY_MODULES)], capture_output=True, text=True, check=True)
+    values = dict(line.split("=", 1) for line in check.stdout.splitlines() if "=" in line)
+    loaded = [name for name in values.get("LOADED", "").split(",") if name]
+    qps_loaded = values.get("QPS_LOADED") == "True"
+
+    print(f"import quantastica.qps_api: median {median_ms:.1f} ms, min {min(times_ms):.1f} ms, max {max(times_ms):.1f} ms ({runs} runs), budget {budget_ms:.1f} ms")
+    print("eagerly imported heavy modules:", ", ".join(loaded) if loaded else "none")
+    print("QPS created at import:", qps_loaded)
+
+    failed = median_ms > budget_ms or len(loaded) > 0 or qps_loaded
+    if(failed):
+        print("FAILED")
+        sys.exit(1)
+
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
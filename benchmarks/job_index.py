@@ -0,0 +1,62 @@
+#
+# Monitoring an account with many historical jobs: bytes received and time per refresh
+# for full list_jobs() vs incremental QJOBINDEX.sync(). A few jobs are active and change status between refreshes.
+#
+# Usage (from repository root): python -m benchmarks.job_index [num_jobs] [num_active] [num_refreshes]
+#
+
+import sys
+import time
+
+from quantastica.qps_api import QPSAPI, QJOBINDEX
+from quantastica.qps_api.stub_server import QSTUBSERVER
+
+
+def main():
+    num_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    num_active = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    num_refreshes = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    # responses are not compressed, so bytes are those of JSON
+    stub = QSTUBSERVER(gzip_responses=False).start()
+    for i in range(num_jobs):
+        status = "running" if i >= num_jobs - num_active else "done"
+        stub.add_job({ "_id": f"job{i:06d}", "name": f"Sweep {i % 100}", "type": "circuit" if i % 2 else "vectors", "status": status })
+
+    api = QPSAPI()
+    api.use_account("stub-token", stub.url)
+
+    def refresh_server(refresh):
+        # one active job finishes and a new one starts
+        stub.update_job(f"job{num_jobs - num_active + refresh:06d}", status="done")
+        stub.add_job({ "_id": f"job{num_jobs + refresh:06d}", "name": "Sweep new", "type": "circuit", "status": "running" })
+
+    print(f"{num_jobs} jobs, {num_active} active, {num_refreshes} refreshes")
+
+    index = QJOBINDEX(api)
+    index.sync()
+
+    for name, refresh_function in (("list_jobs()", lambda: api.synth.list_jobs()), ("QJOBINDEX.sync()", lambda: index.sync(full=False))):
+        stub.reset_stats()
+        elapsed = 0.0
+        for refresh in range(num_refreshes):
+            refresh_server(refresh if name == "list_jobs()" else num_refreshes + refresh)
+            started = time.perf_counter()
+            refresh_function()
+            elapsed += time.perf_counter() - started
+
+        print(f"  {name:18s} {stub.stats()['bytes_out'] / num_refreshes:12.0f} bytes/refresh   {elapsed / num_refreshes * 1000:8.2f} ms/refresh")
+
+    started = time.perf_counter()
+    for i in range(100):
+        running = index.jobs(status="running", limit=20)
+        index.jobs(name="Sweep 7", job_type="circuit", limit=20, offset=40)
+    print(f"  local queries       {(time.perf_counter() - started) / 200 * 1000:8.3f} ms/query   ({len(running)} running, {index.count(name='Sweep 7')} named \"Sweep 7\")")
+
+    index.close()
+    api.close()
+    stub.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#
+# Bytes on the wire and peak memory for large jobs:
+#   - decompose_unitary() request body with and without gzip compression (requires numpy)
+#   - job with many circuits: get_job() (whole response in memory) vs streamed iter_circuits(), with and without field selection
+# Each download mode runs in a separate process so peak RSS of one mode doesn't hide another.
+#
+# Usage (from repository root): python -m benchmarks.large_payloads [num_qubits] [num_circuits]
+#
+
+import sys
+import json
+import zlib
+import random
+import resource
+import subprocess
+
+from quantastica.qps_api import QPSAPI
+from quantastica.qps_api.stub_server import QSTUBSERVER
+
+
+def make_job(num_circuits):
+    random.seed(1)
+
+    circuits = []
+    for i in range(num_circuits):
+        gates = [f"u3({random.random():.12f},{random.random():.12f},{random.random():.12f}) q[{random.randrange(8)}];" for j in range(60)]
+        circuits.append({
+            "program": [{ "name": "u3", "wires": [random.randrange(8)], "options": { "params": { "theta": random.random(), "phi": random.random(), "lambda": random.random() } } } for j in range(60)],
+            "qasm": "OPENQASM 2.0;\ninclude \"qelib1.inc\";\nqreg q[8];\n" + "\n".join(gates) + "\n",
+            "qasmExt": "OPENQASM 2.0;\ninclude \"qelib1.inc\";\nqreg q[8];\n" + "\n".join(gates) + "\n"
+        })
+
+    return { "_id": "stub", "name": "Benchmark", "type": "circuit", "status": "done", "output": { "circuits": circuits } }
+
+
+def peak_rss():
+    # KiB. On Linux ru_maxrss survives exec (child would report parent's peak), so the process' own high-water mark is read from /proc.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if(line.startswith("VmHWM:")):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(mode, url):
+    #
+    # Runs in separate process. Prints peak RSS growth (KiB) and number of circuits.
+    #
+    api = QPSAPI()
+    api.use_account("stub-token", url)
+    api.job_cache = None
+
+    # warm up: import requests and open connection before measuring
+    api.synth.job_status("stub")
+    baseline = peak_rss()
+
+    count = 0
+    if(mode == "get_job"):
+        job = api.synth.get_job("stub")
+        for circuit in job["output"]["circuits"]:
+            count += len(circuit["qasm"]) > 0
+    else:
+        fields = ["qasm"] if mode == "iter_circuits_qasm" else None
+        for circuit in api.synth.iter_circuits("stub", fields=fields):
+            count += len(circuit["qasm"]) > 0
+
+    peak = peak_rss()
+
+    print(json.dumps({ "rss_kib": peak - baseline, "circuits": count }))
+
+
+def main():
+    if(len(sys.argv) > 1 and sys.argv[1] == "--child"):
+        child(sys.argv[2], sys.argv[3])
+        return
+
+    num_qubits = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    num_circuits = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    job = make_job(num_circuits)
+    job_body = json.dumps(job).encode("utf-8")
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    job_gzip = compressor.compress(job_body) + compressor.flush()
+
+    stub = QSTUBSERVER().start()
+    stub.add_job(job)
+
+    url = stub.url
+
+    #
+    # Request body
+    #
+    import numpy as np
+    from benchmarks.encoding import random_unitary
+
+    dimension = 2 ** num_qubits
+    unitary = random_unitary(num_qubits, np.random.default_rng(2))
+
+    print(f"decompose_unitary() request, {num_qubits} qubits ({dimension}x{dimension} matrix):")
+    for name, compress_threshold in (("uncompressed", None), ("gzip", 16 * 1024)):
+        api = QPSAPI()
+        api.use_account("stub-token", url)
+        api.pending_jobs = None
+        api.transport.compress_threshold = compress_threshold
+
+        stub.reset_stats()
+
+        api.synth.decompose_unitary(unitary, start_job=False, use_cache=False)
+
+        print(f"  {name:14s} {stub.stats()['bytes_in']:12d} bytes sent")
+
+        api.close()
+
+    #
+    # Response body
+    #
+    print(f"job with {num_circuits} circuits ({len(job_body)} bytes JSON, {len(job_gzip)} bytes gzip):")
+    for mode in ("get_job", "iter_circuits", "iter_circuits_qasm"):
+        stub.reset_stats()
+
+        output = subprocess.run([sys.executable, "-m", "benchmarks.large_payloads", "--child", mode, url], capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        print(f"  {mode:20s} peak RSS +{result['rss_kib'] / 1024:8.1f} MiB   {stub.stats()['bytes_out']:10d} bytes received   {result['circuits']} circuits")
+
+    stub.close()
+
+
+if __name__ == "__main__":
+    main()
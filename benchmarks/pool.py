@@ -0,0 +1,106 @@
+#
+# Throughput of QPSPOOL with 1, 2, 4, ... stub backends (each runs one job at a time, like QPS): jobs are submitted with
+# solve_many() and collected with wait_jobs(). Also:
+#   - unequal backends (one 4x slower), jobs streamed: least_queued vs weighted round robin with equal weights
+#   - failover: one of the backends is down from the start
+#
+# Usage (from repository root): python -m benchmarks.pool [num_jobs] [max_backends] [job_duration]
+#
+
+import sys
+import time
+import logging
+
+from quantastica.qps_api import QPSAPI, QPSPOOL, QRETRYPOLICY
+from quantastica.qps_api.stub_server import QSTUBSERVER
+
+
+def problems(count, offset=0):
+    return [{ "type": "vectors", "source": { "vectors": { "text1": "[1, 0]", "text2": "[0, 1]" } }, "settings": { "seed": offset + i } } for i in range(count)]
+
+
+def make_pool(stubs, balancing="least_queued"):
+    backends = []
+    for stub in stubs:
+        backend = QPSAPI()
+        backend.use_account("stub-token", stub.url)
+        backend.job_cache = None
+        backend.pending_jobs = None
+        backend.retry_policy = QRETRYPOLICY(base_delay=0.1, max_delay=0.5)
+        backends.append(backend)
+
+    pool = QPSPOOL(backends, balancing=balancing, queue_refresh_interval=0.5)
+    pool.poll_strategy.initial_interval = 0.05
+    pool.poll_strategy.max_interval = 0.25
+
+    return pool
+
+
+def run(pool, num_jobs, offset=0):
+    started = time.perf_counter()
+    submitted = pool.synth.solve_many(problems(num_jobs, offset))
+    if(not submitted.ok()):
+        raise Exception(f"{len(submitted.failed_indexes())} job(s) failed to submit: {submitted.errors[submitted.failed_indexes()[0]]}")
+
+    jobs = pool.synth.wait_jobs(submitted.results)
+    elapsed = time.perf_counter() - started
+
+    done = sum(job["status"] == "done" for job in jobs)
+
+    return elapsed, done
+
+
+def main():
+    num_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    max_backends = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    job_duration = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+
+    logging.getLogger("quantastica.qps_api").setLevel(logging.CRITICAL)
+
+    print(f"{num_jobs} jobs, {job_duration * 1000:.0f} ms each (serial time on one backend {num_jobs * job_duration:.1f} s):")
+    num_backends = 1
+    while num_backends <= max_backends:
+        stubs = [QSTUBSERVER(latency=0.002, job_duration=job_duration, seed=i).start() for i in range(num_backends)]
+        pool = make_pool(stubs)
+
+        elapsed, done = run(pool, num_jobs)
+        created = [stub.stats()["jobs_created"] for stub in stubs]
+        print(f"  {num_backends:2d} backend(s)   {elapsed:6.2f} s   {done / elapsed:7.1f} jobs/s   jobs per backend {created}")
+
+        pool.close()
+        for stub in stubs:
+            stub.close()
+        num_backends *= 2
+
+    print(f"unequal backends ({job_duration * 1000:.0f} ms and {job_duration * 4000:.0f} ms per job), {num_jobs} jobs streamed with solve_stream(), 4 in flight:")
+    for balancing in ("weighted", "least_queued"):
+        stubs = [QSTUBSERVER(latency=0.002, job_duration=job_duration, seed=1).start(), QSTUBSERVER(latency=0.002, job_duration=job_duration * 4, seed=2).start()]
+        pool = make_pool(stubs, balancing)
+
+        # new jobs are submitted while others are still queued, so queue depth decides where they go
+        started = time.perf_counter()
+        done = sum(job["status"] == "done" for problem, job in pool.synth.solve_stream(problems(num_jobs), max_in_flight=4))
+        elapsed = time.perf_counter() - started
+        created = [stub.stats()["jobs_created"] for stub in stubs]
+        print(f"  {balancing:14s} {elapsed:6.2f} s   {done / elapsed:7.1f} jobs/s   jobs per backend {created}")
+
+        pool.close()
+        for stub in stubs:
+            stub.close()
+
+    print("failover (backend 2 of 3 is down):")
+    stubs = [QSTUBSERVER(latency=0.002, job_duration=job_duration, seed=i).start() for i in range(3)]
+    stubs[1].close()
+    pool = make_pool(stubs)
+
+    elapsed, done = run(pool, num_jobs)
+    created = [stub.stats()["jobs_created"] for stub in stubs]
+    print(f"  {elapsed:6.2f} s   {done} of {num_jobs} jobs done   jobs per backend {created}   healthy {[backend['healthy'] for backend in pool.status()]}")
+
+    pool.close()
+    for stub in stubs:
+        stub.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#
+# Parse, analyze and serialize back a random QASM circuit with 10^5 gates using quantastica.qps_api.qasm
+#
+# Usage (from repository root): python -m benchmarks.qasm_parser [num_gates] [num_qubits]
+#
+
+import sys
+import time
+import random
+
+from quantastica.qps_api.qasm import parse_qasm
+
+
+SINGLE_QUBIT_GATES = ["h", "x", "sx", "t", "tdg"]
+PARAMETRIC_GATES = ["u3 (1.5707963267948966, 0.7853981633974483, 3.141592653589793)", "rz (pi/4)", "gpi2 (0.25)"]
+TWO_QUBIT_GATES = ["cx", "cz", "ms (0.1, 0.2)"]
+
+
+def random_qasm(num_gates, num_qubits, rng):
+    lines = ["OPENQASM 2.0;", "include \"qelib1.inc\";", "qreg q[" + str(num_qubits) + "];", "creg c[" + str(num_qubits) + "];"]
+
+    for i in range(num_gates - num_qubits):
+        kind = rng.random()
+        if(kind < 0.4):
+            lines.append(rng.choice(SINGLE_QUBIT_GATES) + " q[" + str(rng.randrange(num_qubits)) + "];")
+        elif(kind < 0.7):
+            lines.append(rng.choice(PARAMETRIC_GATES) + " q[" + str(rng.randrange(num_qubits)) + "];")
+        else:
+            control, target = rng.sample(range(num_qubits), 2)
+            lines.append(rng.choice(TWO_QUBIT_GATES) + " q[" + str(control) + "], q[" + str(target) + "];")
+
+    for qubit in range(num_qubits):
+        lines.append("measure q[" + str(qubit) + "] -> c[" + str(qubit) + "];")
+
+    return "\n".join(lines) + "\n"
+
+
+def measure(function, *args, repeat=5):
+    best = None
+    for i in range(repeat):
+        t = time.perf_counter()
+        output = function(*args)
+        elapsed = time.perf_counter() - t
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def main():
+    num_gates = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    num_qubits = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    qasm = random_qasm(num_gates, num_qubits, random.Random(1))
+
+    t_parse, circuit = measure(parse_qasm, qasm)
+    t_stats, stats = measure(circuit.stats)
+    t_serialize, output = measure(circuit.to_qasm)
+
+    print(f"{len(circuit.gates)} gates on {num_qubits} qubits, {len(qasm)} chars")
+    print(f"  parse      {t_parse * 1000:9.2f} ms  {len(circuit.gates) / t_parse:12.0f} gates/s")
+    print(f"  stats      {t_stats * 1000:9.2f} ms  {len(circuit.gates) / t_stats:12.0f} gates/s")
+    print(f"  to_qasm    {t_serialize * 1000:9.2f} ms  {len(circuit.gates) / t_serialize:12.0f} gates/s")
+    print(f"  depth: {stats['depth']}, two-qubit gates: {stats['two_qubit_gates']}, distinct pairs: {len(stats['two_qubit_pairs'])}")
+
+    #
+    # Round trip: serialized circuit parses back to the same gates
+    #
+    print("round-trip exact:", parse_qasm(output).gates == circuit.gates)
+
+
+if __name__ == "__main__":
+    main()
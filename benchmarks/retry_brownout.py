@@ -0,0 +1,91 @@
+#
+# Simulate a server brownout with a fault-injecting stub: every request fails with 503 for the first
+# brownout seconds, then the server recovers. Worker threads poll job status in a loop.
+# Compares fixed-delay retries (previous behaviour), exponential backoff with full jitter and backoff + circuit breaker.
+#
+# Usage (from repository root): python -m benchmarks.retry_brownout [num_threads] [brownout_seconds]
+#
+
+import sys
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from quantastica.qps_api import QPSAPI, QRETRYPOLICY, QCIRCUITBREAKER, QCIRCUITOPENERROR
+from quantastica.qps_api.stub_server import QSTUBSERVER
+
+
+class FixedDelayPolicy(QRETRYPOLICY):
+    def delay(self, attempt, response=None):
+        return self.base_delay
+
+
+def run(name, stub, api, num_threads, brownout, duration):
+    stub.reset_stats()
+    stub.brownout(brownout)
+
+    started = time.monotonic()
+    stop_at = started + duration
+    first_success = []
+    outcomes = { "ok": 0, "failed": 0, "fail_fast": 0 }
+    outcomes_lock = threading.Lock()
+
+    def worker(i):
+        while time.monotonic() < stop_at:
+            try:
+                api.synth.job_status("stub")
+                outcome = "ok"
+            except QCIRCUITOPENERROR:
+                outcome = "fail_fast"
+                time.sleep(0.05)
+            except Exception:
+                outcome = "failed"
+            with outcomes_lock:
+                outcomes[outcome] += 1
+                if(outcome == "ok" and len(first_success) == 0):
+                    first_success.append(time.monotonic() - started)
+            time.sleep(0.05)
+
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        list(executor.map(worker, range(num_threads)))
+
+    stats = stub.stats()
+    recovery = (first_success[0] - brownout) if first_success else float("nan")
+    print(f"{name:18s} requests during brownout {stats['errors']:6d}   total {sum(stats['requests'].values()):6d}   ok {outcomes['ok']:5d}   failed {outcomes['failed']:4d}   fail fast {outcomes['fail_fast']:5d}   first success {recovery * 1000:7.0f} ms after recovery")
+
+
+def main():
+    num_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    brownout = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    duration = brownout + 2.0
+
+    logging.getLogger("quantastica.qps_api").setLevel(logging.CRITICAL)
+
+    stub = QSTUBSERVER().start()
+    stub.add_job({ "_id": "stub", "status": "running" })
+
+    print(f"{num_threads} threads, {brownout:.1f} s brownout, {duration:.1f} s total")
+
+    configurations = [
+        ("fixed delay", FixedDelayPolicy(max_attempts=5, base_delay=0.1), None),
+        ("full jitter", QRETRYPOLICY(max_attempts=5, base_delay=0.1, max_delay=2.0), None),
+        ("jitter + breaker", QRETRYPOLICY(max_attempts=5, base_delay=0.1, max_delay=2.0), QCIRCUITBREAKER(failure_threshold=5, reset_timeout=0.5))
+    ]
+
+    for name, retry_policy, circuit_breaker in configurations:
+        api = QPSAPI()
+        api.use_account("stub-token", stub.url)
+        api.single_flight = None
+        api.retry_policy = retry_policy
+        api.circuit_breaker = circuit_breaker
+
+        run(name, stub, api, num_threads, brownout, duration)
+
+        api.close()
+
+    stub.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#
+# Client-side scheduling (QJOBSCHEDULER) vs submitting straight into the server's FIFO queue, on a stub server running one job at a time:
+#   - interactive: a bulk sweep is queued, then interactive jobs arrive one by one. Latency of interactive jobs (submit -> done).
+#   - fair share: tenant A queues a big sweep, tenant B a small one right after. Time until B's jobs are done.
+#
+# Usage (from repository root): python -m benchmarks.scheduler [num_bulk_jobs] [job_duration]
+#
+
+import sys
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from quantastica.qps_api import QPSAPI, QJOBSCHEDULER
+from quantastica.qps_api.stub_server import QSTUBSERVER
+from quantastica.qps_api.metrics import _percentile
+
+
+def problems(count, offset):
+    return [{ "type": "vectors", "source": { "vectors": { "text1": "[1, 0]", "text2": "[0, 1]" } }, "settings": { "seed": offset + i } } for i in range(count)]
+
+
+def client(stub):
+    api = QPSAPI()
+    api.use_account("stub-token", stub.url)
+    api.job_cache = None
+    api.pending_jobs = None
+    api.poll_strategy.initial_interval = 0.02
+    api.poll_strategy.max_interval = 0.1
+
+    return api
+
+
+def interactive(scheduled, num_bulk_jobs, job_duration):
+    with QSTUBSERVER(job_duration=job_duration, seed=1) as stub:
+        api = client(stub)
+        scheduler = QJOBSCHEDULER(api, max_queued=1, poll_interval=0.05) if scheduled else None
+        bulk = scheduler.synth("bulk") if scheduled else api.synth
+        urgent = scheduler.synth("interactive") if scheduled else api.synth
+
+        bulk_ids = bulk.solve_many(problems(num_bulk_jobs, 0)).results
+
+        def urgent_job(index, problem):
+            # arrives while the sweep is still running
+            time.sleep((index + 1) * job_duration * 3)
+            started = time.perf_counter()
+            urgent.get_job(urgent.solve(problem))
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            latencies = list(executor.map(urgent_job, range(5), problems(5, 1000)))
+
+        started = time.perf_counter()
+        bulk.wait_jobs(bulk_ids)
+        bulk_left = time.perf_counter() - started
+
+        if(scheduler is not None):
+            scheduler.close()
+        api.close()
+
+    return latencies, bulk_left
+
+
+def fair_share(scheduled, num_bulk_jobs, job_duration):
+    with QSTUBSERVER(job_duration=job_duration, seed=1) as stub:
+        api = client(stub)
+        scheduler = QJOBSCHEDULER(api, max_queued=1, poll_interval=0.05) if scheduled else None
+        tenant_a = scheduler.synth("bulk", "a") if scheduled else api.synth
+        tenant_b = scheduler.synth("bulk", "b") if scheduled else api.synth
+
+        started = time.perf_counter()
+        ids_a = tenant_a.solve_many(problems(num_bulk_jobs, 0)).results
+        ids_b = tenant_b.solve_many(problems(num_bulk_jobs // 4, 1000)).results
+
+        tenant_b.wait_jobs(ids_b)
+        b_done = time.perf_counter() - started
+
+        tenant_a.wait_jobs(ids_a)
+        a_done = time.perf_counter() - started
+
+        stats = scheduler.stats() if scheduler is not None else None
+
+        if(scheduler is not None):
+            scheduler.close()
+        api.close()
+
+    return a_done, b_done, stats
+
+
+def main():
+    num_bulk_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    job_duration = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+
+    logging.getLogger("quantastica.qps_api").setLevel(logging.CRITICAL)
+
+    print(f"interactive jobs behind a sweep of {num_bulk_jobs} jobs ({job_duration * 1000:.0f} ms each):")
+    for name, scheduled in (("server FIFO", False), ("scheduler", True)):
+        latencies, bulk_left = interactive(scheduled, num_bulk_jobs, job_duration)
+        print(f"  {name:12s} interactive latency p50 {_percentile(sorted(latencies), 0.50):6.2f} s   max {max(latencies):6.2f} s   sweep finished {bulk_left:6.2f} s later")
+
+    print(f"tenant A queues {num_bulk_jobs} jobs, then tenant B queues {num_bulk_jobs // 4}:")
+    for name, scheduled in (("server FIFO", False), ("fair share", True)):
+        a_done, b_done, stats = fair_share(scheduled, num_bulk_jobs, job_duration)
+        wait_text = f"   total wait p50 {stats['classes']['bulk']['total_wait']['p50']:6.2f} s" if stats is not None else ""
+        print(f"  {name:12s} B done after {b_done:6.2f} s   A done after {a_done:6.2f} s{wait_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#
+# End-to-end client performance against the in-process stub server (QSTUBSERVER), no network or QPS account needed:
+#   - submit: solve() throughput, sequential and with solve_many()
+#   - wait: get_job(wait=True) latency over job duration (polling overhead) and wait_jobs() for a queue of jobs
+#   - convert: converter.convert_many() throughput
+#   - encoding: building request payloads (vectors, unitary)
+#   - memory: peak RSS of get_job() vs iter_circuits() for a job with many circuits (separate processes)
+#
+# Results are printed, and with --json written as JSON (one object per benchmark), so they can be compared across releases.
+#
+# Usage (from repository root): python -m benchmarks.suite [--quick] [--json results.json] [benchmark ...]
+#
+
+import sys
+import json
+import time
+import random
+import platform
+import subprocess
+import logging
+
+from quantastica.qps_api import QPSAPI
+from quantastica.qps_api.stub_server import QSTUBSERVER
+from quantastica.qps_api.metrics import _percentile
+from quantastica.qps_api.encoding import encode_vectors, encode_matrix
+
+
+def check(batch):
+    if(not batch.ok()):
+        raise Exception(f"{len(batch.failed_indexes())} of {len(batch)} requests failed: {batch.errors[batch.failed_indexes()[0]]}")
+
+    return batch
+
+
+def client(stub):
+    api = QPSAPI()
+    api.use_account("stub-token", stub.url)
+
+    # every problem must reach the server
+    api.job_cache = None
+    api.pending_jobs = None
+
+    return api
+
+
+def random_vectors(num_qubits, seed):
+    generator = random.Random(seed)
+    vector = [complex(generator.gauss(0, 1), generator.gauss(0, 1)) for i in range(1 << num_qubits)]
+    norm = sum(abs(value) ** 2 for value in vector) ** 0.5
+
+    return [value / norm for value in vector]
+
+
+def bench_submit(quick):
+    count = 50 if quick else 200
+    results = {}
+
+    with QSTUBSERVER(latency=0.002, job_duration=0.0, seed=1) as stub:
+        api = client(stub)
+
+        started = time.perf_counter()
+        for i in range(count):
+            api.synth.state_preparation(random_vectors(2, i), use_cache=False)
+        results["sequential_jobs_per_second"] = count / (time.perf_counter() - started)
+
+        problems = [{ "type": "vectors", "source": { "vectors": { "text1": "[1, 0]", "text2": json.dumps([0, 1]), "endianness1": "little", "endianness2": "little" } }, "settings": { "seed": i } } for i in range(count)]
+
+        stub.reset_stats()
+        started = time.perf_counter()
+        check(api.synth.solve_many(problems, max_in_flight=8, use_cache=False))
+        results["concurrent_jobs_per_second"] = count / (time.perf_counter() - started)
+        results["requests_per_job"] = sum(stub.stats()["requests"].values()) / count
+
+        api.close()
+
+    return results
+
+
+def bench_wait(quick):
+    count = 5 if quick else 10
+    job_duration = 0.2
+    results = {}
+
+    with QSTUBSERVER(latency=0.002, job_duration=job_duration, seed=1) as stub:
+        api = client(stub)
+
+        overheads = []
+        for i in range(count):
+            job_id = api.synth.state_preparation(random_vectors(2, i), use_cache=False)
+            started = time.perf_counter()
+            api.synth.get_job(job_id, wait=True)
+            overheads.append(time.perf_counter() - started - job_duration)
+
+        results["get_job_overhead_p50_ms"] = _percentile(sorted(overheads), 0.50) * 1000
+        results["get_job_overhead_max_ms"] = max(overheads) * 1000
+
+        # queue of jobs run one at a time: ideal time is count * job_duration
+        job_ids = [api.synth.state_preparation(random_vectors(2, 1000 + i), use_cache=False) for i in range(count)]
+        stub.reset_stats()
+        started = time.perf_counter()
+        api.synth.wait_jobs(job_ids)
+        elapsed = time.perf_counter() - started
+        stats = stub.stats()
+
+        results["wait_jobs_overhead_ms"] = (elapsed - count * job_duration) * 1000
+        results["wait_jobs_requests"] = sum(stats["requests"].values())
+        results["max_queue"] = stats["max_queue"]
+
+        api.close()
+
+    return results
+
+
+def bench_convert(quick):
+    count = 100 if quick else 500
+    results = {}
+
+    with QSTUBSERVER(latency=0.002, seed=1) as stub:
+        api = client(stub)
+        api.local_converters = None
+
+        inputs = [api.utils.random_circuit(5, "qasm", { "seed": i, "num_gates": 50 }) for i in range(count)]
+
+        started = time.perf_counter()
+        check(api.converter.convert_many(inputs, "qasm", "quil", use_cache=False))
+        results["conversions_per_second"] = count / (time.perf_counter() - started)
+
+        api.close()
+
+    return results
+
+
+def bench_encoding(quick):
+    repeat = 3 if quick else 10
+    results = {}
+
+    pairs = [(random_vectors(10, i), random_vectors(10, 100 + i)) for i in range(4)]
+    started = time.perf_counter()
+    for i in range(repeat):
+        text1, text2 = encode_vectors(pairs)
+    results["vectors_10q_ms"] = (time.perf_counter() - started) / repeat * 1000
+    results["vectors_10q_bytes"] = len(text1) + len(text2)
+
+    try:
+        import numpy as np
+        from benchmarks.encoding import random_unitary
+    except ImportError:
+        return results
+
+    unitary = random_unitary(8, np.random.default_rng(2))
+    started = time.perf_counter()
+    for i in range(repeat):
+        text = encode_matrix(unitary)
+    results["unitary_8q_ms"] = (time.perf_counter() - started) / repeat * 1000
+    results["unitary_8q_bytes"] = len(text)
+
+    return results
+
+
+def peak_rss():
+    # KiB. On Linux ru_maxrss survives exec (child would report parent's peak), so the process' own high-water mark is read from /proc.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if(line.startswith("VmHWM:")):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def memory_child(mode, url, job_id):
+    api = QPSAPI()
+    api.use_account("stub-token", url)
+    api.job_cache = None
+
+    # warm up: import requests and open connection before measuring
+    api.synth.job_status(job_id)
+    baseline = peak_rss()
+
+    count = 0
+    if(mode == "get_job"):
+        for circuit in api.synth.get_job(job_id)["output"]["circuits"]:
+            count += len(circuit["qasm"]) > 0
+    else:
+        for circuit in api.synth.iter_circuits(job_id, fields=["qasm"]):
+            count += len(circuit["qasm"]) > 0
+
+    print(json.dumps({ "rss_kib": peak_rss() - baseline, "circuits": count }))
+
+
+def bench_memory(quick):
+    num_circuits = 500 if quick else 2000
+    results = {}
+
+    with QSTUBSERVER(job_duration=0.0, num_circuits=num_circuits, circuit_gates=60, circuit_qubits=8, seed=1) as stub:
+        api = client(stub)
+        job_id = api.synth.state_preparation(random_vectors(2, 0), use_cache=False)
+        api.synth.job_status(job_id)
+        api.close()
+
+        for mode in ("get_job", "iter_circuits"):
+            stub.reset_stats()
+            output = subprocess.run([sys.executable, "-m", "benchmarks.suite", "--child", mode, stub.url, job_id], capture_output=True, text=True, check=True).stdout
+            child = json.loads(output.strip().splitlines()[-1])
+            results[mode + "_peak_rss_kib"] = child["rss_kib"]
+            results[mode + "_bytes_received"] = stub.stats()["bytes_out"]
+
+    return results
+
+
+BENCHMARKS = {
+    "submit": bench_submit,
+    "wait": bench_wait,
+    "convert": bench_convert,
+    "encoding": bench_encoding,
+    "memory": bench_memory
+}
+
+
+def package_version():
+    try:
+        from importlib.metadata import version
+        return version("quantastica-qps-api")
+    except Exception:
+        return None
+
+
+def main():
+    args = sys.argv[1:]
+    if(len(args) > 0 and args[0] == "--child"):
+        memory_child(args[1], args[2], args[3])
+        return
+
+    quick = "--quick" in args
+    json_path = None
+    if("--json" in args):
+        json_path = args[args.index("--json") + 1]
+        args.remove(json_path)
+
+    names = [arg for arg in args if not arg.startswith("--")] or list(BENCHMARKS)
+    for name in names:
+        if(name not in BENCHMARKS):
+            raise Exception("Unknown benchmark \"" + name + "\". Expected one of: " + ", ".join(BENCHMARKS) + ".")
+
+    logging.getLogger("quantastica.qps_api").setLevel(logging.CRITICAL)
+
+    report = {
+        "package_version": package_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "quick": quick,
+        "results": {}
+    }
+
+    for name in names:
+        results = BENCHMARKS[name](quick)
+        report["results"][name] = results
+        print(name)
+        for key, value in results.items():
+            print(f"  {key:32s} {value:14.2f}" if isinstance(value, float) else f"  {key:32s} {value:14d}")
+
+    if(json_path is not None):
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
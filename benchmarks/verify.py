@@ -0,0 +1,121 @@
+#
+# Local verification of returned circuits (requires numpy): brickwork circuits of u3 and cx, depth = number of qubits.
+#   - vectors: 8 vector pairs, batched contractions vs dense 2^n x 2^n gate matrices (as built with numpy.kron)
+#   - unitary: circuit vs equivalent source circuit (as for transpile), computed in chunks of columns
+#   - batch: 32 circuits with the same structure (different angles) in one call vs one call per circuit
+#
+# Usage (from repository root): python -m benchmarks.verify [max_qubits] [dense_max_qubits]
+#
+
+import sys
+import time
+
+import numpy as np
+
+from quantastica.qps_api import verify_circuits
+
+
+def u3(theta, phi, lam):
+    c = np.cos(theta / 2)
+    s = np.sin(theta / 2)
+
+    return np.array([[c, -np.exp(1j * lam) * s], [np.exp(1j * phi) * s, np.exp(1j * (phi + lam)) * c]])
+
+
+CX = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]], dtype=complex)
+
+
+def brickwork(num_qubits, rng):
+    # [(name, params, qubits)]
+    gates = []
+    for layer in range(num_qubits):
+        for qubit in range(num_qubits):
+            gates.append(("u3", rng.uniform(0, np.pi, 3).tolist(), (qubit,)))
+        for qubit in range(layer % 2, num_qubits - 1, 2):
+            gates.append(("cx", [], (qubit, qubit + 1)))
+
+    return gates
+
+
+def to_qasm(num_qubits, gates):
+    lines = ["OPENQASM 2.0;", "include \"qelib1.inc\";", f"qreg q[{num_qubits}];"]
+    for name, params, qubits in gates:
+        params_text = " (" + ", ".join(repr(param) for param in params) + ")" if len(params) > 0 else ""
+        lines.append(name + params_text + " " + ", ".join(f"q[{qubit}]" for qubit in qubits) + ";")
+
+    return "\n".join(lines) + "\n"
+
+
+def dense_outputs(num_qubits, gates, vectors):
+    # baseline: full 2^n x 2^n matrix of each gate (gates act on adjacent qubits; qubit 0 is the most significant, as with endianness="big")
+    outputs = vectors.T.copy()
+    for name, params, qubits in gates:
+        matrix = u3(*params) if name == "u3" else CX
+        full = np.kron(np.kron(np.eye(1 << qubits[0]), matrix), np.eye(1 << (num_qubits - qubits[-1] - 1)))
+        outputs = full @ outputs
+
+    return outputs.T
+
+
+def timed(function, repeat=3):
+    best = None
+    result = None
+    for i in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+
+def main():
+    max_qubits = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    dense_max_qubits = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    rng = np.random.default_rng(1)
+
+    print("vectors (8 pairs):")
+    for num_qubits in range(2, max_qubits + 1, 2):
+        gates = brickwork(num_qubits, rng)
+        qasm = to_qasm(num_qubits, gates)
+
+        inputs = rng.normal(size=(8, 1 << num_qubits)) + 1j * rng.normal(size=(8, 1 << num_qubits))
+        inputs /= np.linalg.norm(inputs, axis=1, keepdims=True)
+
+        if(num_qubits <= dense_max_qubits):
+            # expected outputs from dense baseline, so diff also checks the result
+            dense_time, outputs = timed(lambda: dense_outputs(num_qubits, gates, inputs), 1)
+            dense_text = f"   dense {dense_time * 1000:10.2f} ms"
+        else:
+            outputs = inputs
+            dense_text = "   dense          -"
+
+        elapsed, results = timed(lambda: verify_circuits([qasm], vector_pairs=list(zip(inputs, outputs)), endianness="big"))
+        diff_text = f"   diff {results[0]['diff']:.1e}" if num_qubits <= dense_max_qubits else ""
+        print(f"  {num_qubits:2d} qubits {len(gates):4d} gates   verify {elapsed * 1000:10.2f} ms{dense_text}{diff_text}")
+
+    print("unitary (vs. source circuit):")
+    for num_qubits in range(2, max_qubits + 1, 2):
+        gates = brickwork(num_qubits, rng)
+        qasm = to_qasm(num_qubits, gates)
+
+        elapsed, results = timed(lambda: verify_circuits([qasm], source_circuit=qasm), 1 if num_qubits >= 10 else 3)
+        print(f"  {num_qubits:2d} qubits {len(gates):4d} gates   verify {elapsed * 1000:10.2f} ms   diff {results[0]['diff']:.1e}")
+
+    print("batch (32 circuits, 8 vector pairs):")
+    for num_qubits in range(2, max_qubits + 1, 2):
+        structure = brickwork(num_qubits, rng)
+        circuits = [to_qasm(num_qubits, [(name, rng.uniform(0, np.pi, 3).tolist() if name == "u3" else params, qubits) for name, params, qubits in structure]) for i in range(32)]
+
+        inputs = rng.normal(size=(8, 1 << num_qubits)) + 1j * rng.normal(size=(8, 1 << num_qubits))
+        inputs /= np.linalg.norm(inputs, axis=1, keepdims=True)
+        vector_pairs = list(zip(inputs, inputs))
+
+        batch_time, results = timed(lambda: verify_circuits(circuits, vector_pairs=vector_pairs), 1)
+        single_time, results = timed(lambda: [verify_circuits([circuit], vector_pairs=vector_pairs) for circuit in circuits], 1)
+        print(f"  {num_qubits:2d} qubits   one call {batch_time * 1000:10.2f} ms   one call per circuit {single_time * 1000:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
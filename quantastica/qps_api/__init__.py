@@ -1,3 +1,82 @@
-from .qps_api import QPSAPI
+import threading
 
-QPS = QPSAPI()
+from .qps_api import QPSAPI, QPOLLSTRATEGY, QPSTimeoutError
+from .cache import QCACHE
+from .qasm import parse_qasm, QCIRCUIT, QGATE
+from .singleflight import QSINGLEFLIGHT
+from .metrics import QHOOKS, QMETRICS
+from .retry import QRETRYPOLICY, QCIRCUITBREAKER, QCIRCUITOPENERROR
+from .converters import QLOCALCONVERTERS, QLOCALCONVERTUNSUPPORTED
+from .journal import QJOBJOURNAL
+from .job_index import QJOBINDEX
+from .pool import QPSPOOL
+from .scheduler import QJOBSCHEDULER
+from .verify import verify_job, verify_circuits, circuit_unitary
+
+
+class QPSAPIPROXY:
+    #
+    # Package-level QPS object. QPSAPI (environment, ~/.quantastica/.quantasticarc) is created on first attribute access.
+    #
+    def __init__(self):
+        object.__setattr__(self, "_qps_api", None)
+        object.__setattr__(self, "_qps_api_lock", threading.Lock())
+
+        return
+
+
+    def _get_qps_api(self):
+        qps_api = object.__getattribute__(self, "_qps_api")
+        if(qps_api is not None):
+            return qps_api
+
+        with object.__getattribute__(self, "_qps_api_lock"):
+            if(object.__getattribute__(self, "_qps_api") is None):
+                object.__setattr__(self, "_qps_api", QPSAPI())
+
+            return object.__getattribute__(self, "_qps_api")
+
+
+    def __getattr__(self, name):
+        return getattr(self._get_qps_api(), name)
+
+
+    def __setattr__(self, name, value):
+        setattr(self._get_qps_api(), name, value)
+
+        return
+
+
+    def __delattr__(self, name):
+        delattr(self._get_qps_api(), name)
+
+        return
+
+
+    def __dir__(self):
+        return dir(self._get_qps_api())
+
+
+    def __repr__(self):
+        qps_api = object.__getattribute__(self, "_qps_api")
+        if(qps_api is None):
+            return "<QPSAPI (not loaded)>"
+
+        return repr(qps_api)
+
+
+QPS = QPSAPIPROXY()
+
+
+def __getattr__(name):
+    # asyncio client is imported on first use
+    if(name == "AsyncQPSAPI"):
+        from .async_qps_api import AsyncQPSAPI
+        return AsyncQPSAPI
+
+    # stub server imports http.server on start()
+    if(name == "QSTUBSERVER"):
+        from .stub_server import QSTUBSERVER
+        return QSTUBSERVER
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
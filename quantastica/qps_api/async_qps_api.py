@@ -0,0 +1,668 @@
+import asyncio
+import time
+import weakref
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .cache import cache_key
+from .qps_api import QPSAPI, _urljoin, _apply_settings, _job_finished, _normalize_job, _problem_key, _shared_request_key, _observe_jobs, _job_alias_key, _job_cache_key, _cache_job, _transpile_problem, _vectors_problem, _state_preparation_pairs, _unitary_problem, _truth_table_problem, _convert_input, _convert_data, _local_convert, _trace_path, QBATCHRESULT, _random_circuit_data, _pending_begin, _pending_end, _reconcile_candidates, _same_problem, _stored_job, _journal_result, _journal_resume, _journal_record, _stopped_status, _known_job_ids, _STATUS_POLL_MAX_JOBS, _active_job_ids
+from .metrics import _get_logger
+from .json_stream import iter_json_items
+
+
+# end of streamed items
+_END = object()
+
+# job requests which are coalesced when identical requests are in flight
+_SHARED_ACTIONS = ("status", "get")
+
+
+class AsyncQGENAPI:
+    def __init__(self, qps_api):
+        self.qps_api = qps_api
+
+        return
+
+
+    async def _call(self, action, data, extra_headers=None):
+        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+        if(extra_headers is not None):
+            headers.update(extra_headers)
+
+        url = _urljoin(self.qps_api.api_url, "generator", "job", action)
+
+        single_flight = self.qps_api.single_flight
+        if(action in _SHARED_ACTIONS and single_flight is not None):
+            # identical concurrent requests share one HTTP response
+            response = await single_flight.do_async(_shared_request_key(url, self.qps_api.api_token, data), lambda: self.qps_api.http_post(url = url, headers = headers, json = data))
+        else:
+            response = await self.qps_api.http_post(url = url, headers = headers, json = data)
+
+        response.raise_for_status()
+
+        return response.json()
+
+
+    async def solve(self, problem, settings={}, start_job=True, use_cache=True):
+        _apply_settings(problem, settings)
+
+        problem_key = _problem_key(problem) if use_cache else None
+
+        single_flight = self.qps_api.single_flight
+        if(problem_key is not None and single_flight is not None):
+            return await single_flight.do_async(("solve", self.qps_api.api_url, self.qps_api.api_token, problem_key, start_job), lambda: self._solve(problem, start_job, problem_key))
+
+        return await self._solve(problem, start_job, problem_key)
+
+
+    async def _solve(self, problem, start_job, problem_key):
+        job_cache = self.qps_api.job_cache
+        cache_problem_key = None
+        if(problem_key is not None and job_cache is not None and start_job == True):
+            cache_problem_key = _job_cache_key(self.qps_api, problem_key)
+            cached_job = job_cache.get(cache_problem_key)
+            if(cached_job is not None):
+                return cached_job["_id"]
+
+        journaled = _journal_resume(self.qps_api, problem_key)
+        if(journaled is not None):
+            job_id = journaled["job_id"]
+            if(cache_problem_key is not None):
+                job_cache.put(_job_alias_key(job_id), cache_problem_key)
+            if(start_job == True and journaled["status"] == "draft"):
+                await self.start_job(job_id)
+            return job_id
+
+        record = _pending_begin(self.qps_api, problem, problem_key, start_job)
+
+        try:
+            job = None
+            if(record["resumed"]):
+                job = await self._reconcile(problem, record)
+
+            if(job is None):
+                job = await self._create(problem, record)
+        except Exception as e:
+            if(not self.qps_api.retry_policy.ambiguous(e)):
+                _pending_end(self.qps_api, problem_key, start_job)
+            raise
+
+        _pending_end(self.qps_api, problem_key, start_job)
+
+        job_id = job["_id"]
+
+        if(cache_problem_key is not None):
+            job_cache.put(_job_alias_key(job_id), cache_problem_key)
+
+        _journal_record(self.qps_api, problem_key, job_id, job.get("status", "draft"))
+
+        if(start_job == True and job.get("status", "draft") == "draft"):
+            await self.start_job(job_id)
+
+        return job_id
+
+
+    async def _create(self, problem, record):
+        policy = self.qps_api.retry_policy
+
+        attempt = 0
+        while True:
+            try:
+                return await self._call("create", problem, { "Idempotency-Key": record["key"] })
+            except Exception as e:
+                if(not policy.ambiguous(e)):
+                    raise
+                error = e
+
+            job = await self._reconcile(problem, record)
+            if(job is not None):
+                _get_logger().warning(f"Job creation failed with {error.__class__.__name__} but job {job['_id']} was created. Using it.")
+                return job
+
+            attempt += 1
+            if(attempt >= policy.max_attempts):
+                raise error
+
+            _get_logger().warning(f"Job creation failed with {error.__class__.__name__} and job was not created. Retrying.")
+            await asyncio.sleep(policy.delay(attempt - 1) or 0)
+
+
+    async def _reconcile(self, problem, record):
+        known_job_ids = _known_job_ids(self.qps_api)
+        list_result = await self.list_jobs(status_filter="draft")
+
+        for job_id, key_matched in _reconcile_candidates(list_result, problem, record, known_job_ids):
+            job = await self.get_job(job_id, wait=False)
+            if(key_matched or _same_problem(job, problem)):
+                return job
+
+        return None
+
+
+    async def _batch_map(self, function, items, batch_result=None):
+        if(batch_result is None):
+            batch_result = QBATCHRESULT(len(items))
+            indexes = list(range(len(items)))
+        else:
+            indexes = batch_result.failed_indexes()
+
+        async def run_item(index):
+            try:
+                return await function(items[index]), None
+            except Exception as e:
+                return None, e
+
+        # concurrency is bounded by AsyncQPSAPI.max_concurrency
+        outcomes = await asyncio.gather(*[run_item(index) for index in indexes])
+
+        for index, (output, error) in zip(indexes, outcomes):
+            batch_result.results[index] = output
+            batch_result.errors[index] = error
+
+        return batch_result
+
+
+    async def solve_many(self, problems, settings={}, start_job=True, use_cache=True, previous_result=None):
+        return await self._batch_map(lambda problem: self.solve(problem, settings, start_job, use_cache), problems, previous_result)
+
+
+    async def start_many(self, job_ids, previous_result=None):
+        return await self._batch_map(self.start_job, job_ids, previous_result)
+
+
+    async def list_jobs(self, status_filter=None):
+        list_data = {}
+        if(status_filter is not None):
+            list_data["status"] = status_filter
+
+        list_result = await self._call("list", list_data)
+
+        _observe_jobs(self.qps_api, list_result)
+
+        return list_result
+
+
+    async def job_status(self, job_id):
+        status_result = await self._call("status", { "_id": job_id })
+
+        self.qps_api._observe_job_state(job_id, status_result.get("status"))
+
+        return status_result
+
+
+    async def stop_job(self, job_id):
+        stop_result = await self._call("stop", { "_id": job_id })
+
+        self.qps_api._observe_job_state(job_id, _stopped_status(self.qps_api, job_id))
+
+        return stop_result
+
+
+    async def stop_all_jobs(self, status_filter=None):
+        stop_data = {}
+        if(status_filter is not None):
+            stop_data["status"] = status_filter
+
+        return await self._call("stop_all", stop_data)
+
+
+    async def start_job(self, job_id):
+        start_result = await self._call("start", { "_id": job_id })
+
+        self.qps_api._observe_job_state(job_id, "queued")
+
+        return start_result
+
+
+    async def reset_job(self, job_id):
+        reset_result = await self._call("reset", { "_id": job_id })
+
+        self.qps_api._observe_job_state(job_id, "draft")
+
+        return reset_result
+
+
+    async def get_job(self, job_id, wait=True, timeout=None):
+        problem_key, cached_job = _stored_job(self.qps_api, job_id)
+        if(cached_job is not None):
+            return cached_job
+
+        if(wait == True):
+            await self._wait_finished(job_id, timeout)
+
+        get_job_result = _normalize_job(await self._call("get", { "_id": job_id }))
+
+        self.qps_api._observe_job_state(job_id, get_job_result.get("status"))
+
+        _cache_job(self.qps_api.job_cache, problem_key, get_job_result)
+        _journal_result(self.qps_api, job_id, get_job_result)
+
+        return get_job_result
+
+
+    async def _wait_finished(self, job_id, timeout):
+        #
+        # Wait for status change without blocking the event loop
+        #
+        poller = self.qps_api.poll_strategy.start(timeout)
+
+        while True:
+            status_result = await self.job_status(job_id)
+            if(_job_finished(status_result)):
+                poller.finish()
+                break
+
+            await asyncio.sleep(poller.next_delay(f"Job {job_id} not finished"))
+
+        return status_result
+
+
+    async def _finished_job_ids(self, job_ids):
+        if(len(job_ids) <= _STATUS_POLL_MAX_JOBS):
+            status_results = await asyncio.gather(*[self.job_status(job_id) for job_id in job_ids])
+            return set(job_id for job_id, status_result in zip(job_ids, status_results) if _job_finished(status_result))
+
+        active = _active_job_ids(await self.list_jobs())
+
+        return set(job_id for job_id in job_ids if job_id not in active)
+
+
+    async def as_completed(self, job_ids, timeout=None):
+        pending = []
+        for job_id in dict.fromkeys(job_ids):
+            problem_key, cached_job = _stored_job(self.qps_api, job_id)
+            if(cached_job is not None):
+                yield cached_job
+            else:
+                pending.append(job_id)
+
+        if(len(pending) == 0):
+            return
+
+        poller = self.qps_api.poll_strategy.start(timeout)
+
+        while True:
+            finished = await self._finished_job_ids(pending)
+            for job in await asyncio.gather(*[self.get_job(job_id, wait=False) for job_id in finished]):
+                yield job
+
+            pending = [job_id for job_id in pending if job_id not in finished]
+            if(len(pending) == 0):
+                poller.finish()
+                break
+
+            await asyncio.sleep(poller.next_delay(f"{len(pending)} job(s) not finished: " + ", ".join(pending)))
+
+
+    async def wait_jobs(self, job_ids, timeout=None):
+        jobs = {}
+        async for job in self.as_completed(job_ids, timeout):
+            jobs[job["_id"]] = job
+
+        return [jobs[job_id] for job_id in job_ids]
+
+
+    async def solve_stream(self, problems, settings={}, max_in_flight=None, timeout=None, use_cache=True):
+        if(max_in_flight is None):
+            max_in_flight = self.qps_api.max_concurrency
+
+        problems_iter = iter(problems)
+        problems_exhausted = False
+
+        in_flight = {}
+        in_flight_count = 0
+
+        poller = None
+
+        while True:
+            refill = []
+            while(not problems_exhausted and in_flight_count + len(refill) < max_in_flight):
+                try:
+                    refill.append(next(problems_iter))
+                except StopIteration:
+                    problems_exhausted = True
+
+            if(len(refill) > 0):
+                submitted = await self.solve_many(refill, settings, True, use_cache)
+                for problem, job_id, error in zip(refill, submitted.results, submitted.errors):
+                    if(error is not None):
+                        yield problem, _normalize_job({ "_id": None, "status": "error", "output": { "error_code": -1, "message": str(error) } })
+                        continue
+
+                    in_flight.setdefault(job_id, []).append(problem)
+                    in_flight_count += 1
+
+            if(in_flight_count == 0):
+                if(problems_exhausted):
+                    break
+                continue
+
+            if(poller is None):
+                poller = self.qps_api.poll_strategy.start(timeout)
+
+            cached = [job_id for job_id in in_flight if _stored_job(self.qps_api, job_id)[1] is not None]
+            finished = set(cached) if len(cached) > 0 else await self._finished_job_ids(list(in_flight.keys()))
+
+            finished_job_ids = list(finished)
+            finished_jobs = await asyncio.gather(*[self.get_job(job_id, wait=False) for job_id in finished_job_ids])
+            for job_id, job in zip(finished_job_ids, finished_jobs):
+                for problem in in_flight.pop(job_id):
+                    in_flight_count -= 1
+                    yield problem, job
+
+            if(len(finished) > 0):
+                poller.finish()
+                poller = None
+            else:
+                await asyncio.sleep(poller.next_delay(f"{in_flight_count} job(s) not finished"))
+
+
+    async def iter_circuits(self, job, fields=None, wait=True, timeout=None):
+        if(not isinstance(job, dict)):
+            job_id = job
+            problem_key, job = _stored_job(self.qps_api, job_id)
+
+        if(isinstance(job, dict)):
+            for circuit in job.get("output", {}).get("circuits", []):
+                yield circuit if fields is None else { key: circuit[key] for key in fields if key in circuit }
+            return
+
+        if(wait == True):
+            await self._wait_finished(job_id, timeout)
+
+        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+        url = _urljoin(self.qps_api.api_url, "generator", "job", "get")
+
+        response = await self.qps_api.http_post(url = url, headers = headers, json = { "_id": job_id }, stream = True)
+
+        loop = asyncio.get_running_loop()
+        try:
+            response.raise_for_status()
+
+            # blocking reads and decoding run on the executor, one circuit at a time
+            chunks = response.iter_content(chunk_size=self.qps_api.stream_chunk_size)
+            circuits = iter_json_items(chunks, ("output", "circuits"), set(fields) if fields is not None else None)
+            while True:
+                circuit = await loop.run_in_executor(self.qps_api._executor, next, circuits, _END)
+                if(circuit is _END):
+                    break
+                yield circuit
+        finally:
+            response.close()
+
+
+    async def verify_job(self, job, circuits=None, max_diff=None, diff_method=None, timeout=None):
+        from .verify import verify_job
+
+        if(not isinstance(job, dict)):
+            job = await self.get_job(job, wait=True, timeout=timeout)
+
+        # CPU-bound: runs on the executor
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(self.qps_api._executor, partial(verify_job, job, circuits, max_diff, diff_method))
+
+
+    async def transpile(self, input_qasm, method="replace_blocks", method_options={}, job_name=None, settings={}, start_job=True, use_cache=True):
+        problem = _transpile_problem(input_qasm, method, method_options, job_name)
+
+        return await self.solve(problem, settings, start_job, use_cache)
+
+
+    async def circuit_from_vectors(self, vector_pairs, endianness="little", job_name=None, settings={}, start_job=True, use_cache=True):
+        problem = _vectors_problem(vector_pairs, endianness, job_name)
+
+        return await self.solve(problem, settings, start_job, use_cache)
+
+
+    async def state_preparation(self, final_vector, endianness="little", job_name=None, settings={}, start_job=True, use_cache=True):
+        return await self.circuit_from_vectors(_state_preparation_pairs(final_vector), endianness, job_name, settings, start_job, use_cache)
+
+
+    async def decompose_unitary(self, unitary, endianness="big", job_name=None, settings={}, start_job=True, use_cache=True):
+        problem = _unitary_problem(unitary, endianness, job_name)
+
+        return await self.solve(problem, settings, start_job, use_cache)
+
+
+    async def circuit_from_truth_table(self, truth_table_csv, column_defs, csv_delimiter=None, additional_qubits=1, job_name=None, settings={}, start_job=True, use_cache=True):
+        problem = _truth_table_problem(truth_table_csv, column_defs, csv_delimiter, additional_qubits, job_name)
+
+        return await self.solve(problem, settings, start_job, use_cache)
+
+
+class AsyncQCONVERTAPI:
+    def __init__(self, qps_api):
+        self.qps_api = qps_api
+
+        return
+
+
+    async def convert(self, input_data, source_format, dest_format, use_cache=True, use_local=True, trace=None):
+        started = time.perf_counter()
+
+        if(use_local):
+            converted, convert_result = _local_convert(self.qps_api.local_converters, input_data, source_format, dest_format, trace)
+            if(converted):
+                _trace_path(trace, "local", started)
+                return convert_result
+
+        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+
+        convert_url = _urljoin(self.qps_api.api_url, "qconvert")
+        convert_data = _convert_data(input_data, source_format, dest_format)
+
+        convert_cache = self.qps_api.convert_cache if use_cache else None
+        if(convert_cache is not None):
+            convert_key = cache_key("qconvert", convert_data)
+            convert_result = convert_cache.get(convert_key)
+            if(convert_result is not None):
+                _trace_path(trace, "cache", started)
+                return convert_result
+
+        convert_response = await self.qps_api.http_post(url=convert_url, headers=headers, json=convert_data)
+
+        convert_response.raise_for_status()
+        convert_result = convert_response.text
+
+        if(convert_cache is not None):
+            convert_cache.put(convert_key, convert_result)
+
+        _trace_path(trace, "server", started)
+
+        return convert_result
+
+
+    async def validate(self, input_data, source_format, use_local=True, trace=None):
+        started = time.perf_counter()
+
+        local_converters = self.qps_api.local_converters
+        validator = local_converters.get_validator(source_format) if use_local and local_converters is not None else None
+        if(validator is not None):
+            try:
+                validator(input_data)
+                local_converters.count("local")
+                _trace_path(trace, "local", started)
+                return True
+            except Exception as e:
+                local_converters.count("fallbacks")
+                if(trace is not None):
+                    trace["local_error"] = e
+
+        server_trace = {}
+        await self.convert(input_data, source_format, "qasm", use_local=False, trace=server_trace)
+
+        _trace_path(trace, server_trace["path"], started)
+
+        return True
+
+
+    async def convert_many(self, inputs, source_format, dest_formats, use_cache=True):
+        single_dest = isinstance(dest_formats, str)
+        dests = [dest_formats] if single_dest else list(dest_formats)
+
+        input_strings = [_convert_input(input_data) for input_data in inputs]
+
+        tasks = [(input_index, dest) for input_index in range(len(input_strings)) for dest in dests]
+
+        async def convert_task(task):
+            input_index, dest = task
+            try:
+                return await self.convert(input_strings[input_index], source_format, dest, use_cache), None
+            except Exception as e:
+                return None, e
+
+        batch_result = QBATCHRESULT(len(input_strings))
+        if(not single_dest):
+            batch_result.results = [{} for input_string in input_strings]
+
+        # concurrency is bounded by AsyncQPSAPI.max_concurrency
+        outcomes = await asyncio.gather(*[convert_task(task) for task in tasks])
+
+        for (input_index, dest), (output, error) in zip(tasks, outcomes):
+            if(single_dest):
+                batch_result.results[input_index] = output
+                batch_result.errors[input_index] = error
+            elif(error is None):
+                batch_result.results[input_index][dest] = output
+            else:
+                if(batch_result.errors[input_index] is None):
+                    batch_result.errors[input_index] = {}
+                batch_result.errors[input_index][dest] = error
+
+        return batch_result
+
+
+class AsyncQUTILSAPI:
+    def __init__(self, qps_api):
+        self.qps_api = qps_api
+
+        return
+
+
+    async def random_circuit(self, num_qubits=5, output_format="quantum-circuit", options={}, use_cache=True):
+        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+
+        random_circuit_url = _urljoin(self.qps_api.api_url, "utils", "random_circuit")
+        random_circuit_data = _random_circuit_data(num_qubits, output_format, options)
+
+        random_circuit_cache = self.qps_api.convert_cache if use_cache and "seed" in random_circuit_data else None
+        if(random_circuit_cache is not None):
+            random_circuit_key = cache_key("random_circuit", random_circuit_data)
+            random_circuit_result = random_circuit_cache.get(random_circuit_key)
+            if(random_circuit_result is not None):
+                return random_circuit_result
+
+        random_circuit_response = await self.qps_api.http_post(url=random_circuit_url, headers=headers, json=random_circuit_data)
+
+        random_circuit_response.raise_for_status()
+        random_circuit_result = random_circuit_response.text
+
+        if(random_circuit_cache is not None):
+            random_circuit_cache.put(random_circuit_key, random_circuit_result)
+
+        return random_circuit_result
+
+
+class AsyncQPSAPI(QPSAPI):
+
+    def __init__(self, max_concurrency=10):
+        super().__init__()
+
+        # Maximum number of requests in flight at the same time
+        self.max_concurrency = max_concurrency
+
+        self._executor = None
+
+        # asyncio.Semaphore per event loop (a semaphore is bound to the loop which first waits on it), so the object can be
+        # used by consecutive asyncio.run() calls or by loops in different threads
+        self._semaphores = weakref.WeakKeyDictionary()
+
+        if(self.http_pool_maxsize < max_concurrency):
+            self.set_http_pool(pool_maxsize=max_concurrency)
+
+        self.synth = AsyncQGENAPI(self)
+
+        self.generator = self.synth
+
+        self.converter = AsyncQCONVERTAPI(self)
+
+        self.utils = AsyncQUTILSAPI(self)
+
+        return
+
+
+    async def http_post(self, url, headers, json, stream=False):
+        #
+        # Not a native async HTTP client: blocking requests are offloaded to a bounded thread pool (shared by all event loops)
+        # using the pooled keep-alive transport, while the coroutine awaits the result
+        #
+        if(self._executor is None):
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="qps-api")
+
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if(semaphore is None):
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        post = partial(self.transport.post, url=url, headers=headers, json=json, timeout=self.http_timeout, stream=stream)
+
+        endpoint = self._endpoint(url)
+        max_attempts = self.retry_policy.attempts(endpoint)
+
+        for attempt in range(max_attempts):
+            self._circuit_allow()
+
+            # False until outcome of the request is reported to circuit breaker (by _retry_or_raise())
+            recorded = False
+            try:
+                async with semaphore:
+                    # timing starts when request gets a slot, so it doesn't include waiting for the semaphore
+                    started = self._request_start(endpoint, url, attempt)
+
+                    try:
+                        response = await loop.run_in_executor(self._executor, post)
+
+                    except requests.exceptions.RequestException as e:
+                        self._request_end(endpoint, url, attempt, started, None, e)
+                        recorded = True
+                        delay = self._retry_or_raise(endpoint, url, attempt, max_attempts, None, e)
+
+                    else:
+                        self._request_end(endpoint, url, attempt, started, response, None, stream)
+                        recorded = True
+                        delay = self._retry_or_raise(endpoint, url, attempt, max_attempts, response, None)
+                        if(delay is None):
+                            return response
+                        if(stream):
+                            response.close()
+            finally:
+                # e.g. cancelled or payload can't be serialized: nothing is known about service health,
+                # but half-open circuit breaker must let the next probe through
+                if(not recorded):
+                    self._circuit_record(None)
+
+            await asyncio.sleep(delay)
+
+        return None
+
+
+    def close(self):
+        if(self._executor is not None):
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+        super().close()
+
+        return
+
+
+    async def __aenter__(self):
+        return self
+
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+        return
@@ -0,0 +1,285 @@
+import os
+import json
+import time
+import zlib
+import threading
+from collections import OrderedDict
+
+
+def cache_key(*parts):
+    #
+    # Content address: sha256 of canonical JSON (sorted keys, no whitespace)
+    #
+    import hashlib
+
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class QCACHE:
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, max_age=None, path=None, max_disk_bytes=512 * 1024 * 1024, compress_threshold=None):
+        # In-memory LRU tier limits
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # Entries older than max_age seconds are evicted from both tiers. None means no age limit.
+        self.max_age = max_age
+
+        # On-disk tier directory (None disables disk tier) and its size limit
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+
+        # Values whose serialized size is at least compress_threshold bytes are stored zlib-compressed. None disables compression.
+        self.compress_threshold = compress_threshold
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None
+        self._lock = threading.RLock()
+
+        self.reset_stats()
+
+        return
+
+
+    def _encode(self, value):
+        data = json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+        if(self.compress_threshold is not None and len(data) >= self.compress_threshold):
+            return b"z" + zlib.compress(data)
+
+        return b"j" + data
+
+
+    def _decode(self, data):
+        if(data[:1] == b"z"):
+            data = zlib.decompress(data[1:])
+        elif(data[:1] == b"j"):
+            data = data[1:]
+
+        return json.loads(data.decode("utf-8"))
+
+
+    def _expired(self, stored_at):
+        return self.max_age is not None and time.time() - stored_at > self.max_age
+
+
+    def _disk_file(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+
+    def _disk_size(self, file_path):
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return 0
+
+
+    #
+    # Memory tier
+    #
+
+    def _memory_put(self, key, data, stored_at):
+        if(key in self._memory):
+            self._memory_remove(key)
+
+        self._memory[key] = (data, stored_at)
+        self._memory_bytes += len(data)
+
+        while(len(self._memory) > 0 and (len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes)):
+            oldest_key = next(iter(self._memory))
+            self._memory_remove(oldest_key)
+            self._stats["evictions"] += 1
+
+        return
+
+
+    def _memory_remove(self, key):
+        data, stored_at = self._memory.pop(key)
+        self._memory_bytes -= len(data)
+
+        return
+
+
+    #
+    # Disk tier
+    #
+
+    def _disk_scan(self):
+        files = []
+        for root, dirs, names in os.walk(self.path):
+            for name in names:
+                # entry being written by _disk_put() (or left by a process which died while writing it)
+                if(".tmp" in name):
+                    continue
+
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, file_path))
+
+        return files
+
+
+    def _disk_prune(self):
+        files = self._disk_scan()
+        files.sort()
+
+        total = sum(size for mtime, size, file_path in files)
+        for mtime, size, file_path in files:
+            if(total <= self.max_disk_bytes and not self._expired(mtime)):
+                continue
+            try:
+                os.remove(file_path)
+                self._stats["evictions"] += 1
+            except OSError:
+                pass
+            total -= size
+
+        self._disk_bytes = total
+
+        return
+
+
+    def _disk_get(self, key):
+        file_path = self._disk_file(key)
+        try:
+            stored_at = os.path.getmtime(file_path)
+            with open(file_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None, None
+
+        if(self._expired(stored_at)):
+            self._disk_remove(key)
+            return None, None
+
+        return data, stored_at
+
+
+    def _disk_put(self, key, data):
+        file_path = self._disk_file(key)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        # write to temporary file and rename so other processes never read partial entry
+        temp_path = file_path + ".tmp" + str(os.getpid()) + "-" + str(threading.get_ident())
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        replaced_size = self._disk_size(file_path)
+        os.replace(temp_path, file_path)
+
+        if(self._disk_bytes is None):
+            self._disk_prune()
+        else:
+            self._disk_bytes += len(data) - replaced_size
+            if(self._disk_bytes > self.max_disk_bytes):
+                self._disk_prune()
+
+        return
+
+
+    def _disk_remove(self, key):
+        file_path = self._disk_file(key)
+        size = self._disk_size(file_path)
+        try:
+            os.remove(file_path)
+        except OSError:
+            return
+
+        if(self._disk_bytes is not None):
+            self._disk_bytes -= size
+
+        return
+
+
+    #
+    # Public interface
+    #
+
+    def get(self, key, default=None, count_stats=True):
+        with self._lock:
+            entry = self._memory.get(key)
+            if(entry is not None):
+                data, stored_at = entry
+                if(self._expired(stored_at)):
+                    self._memory_remove(key)
+                    self._stats["evictions"] += 1
+                else:
+                    self._memory.move_to_end(key)
+                    if(count_stats):
+                        self._stats["hits"] += 1
+                        self._stats["memory_hits"] += 1
+                    return self._decode(data)
+
+            if(self.path is not None):
+                data, stored_at = self._disk_get(key)
+                if(data is not None):
+                    self._memory_put(key, data, stored_at)
+                    if(count_stats):
+                        self._stats["hits"] += 1
+                        self._stats["disk_hits"] += 1
+                    return self._decode(data)
+
+            if(count_stats):
+                self._stats["misses"] += 1
+
+            return default
+
+
+    def put(self, key, value):
+        data = self._encode(value)
+
+        with self._lock:
+            self._memory_put(key, data, time.time())
+
+            if(self.path is not None):
+                self._disk_put(key, data)
+
+        return
+
+
+    def delete(self, key):
+        with self._lock:
+            if(key in self._memory):
+                self._memory_remove(key)
+
+            if(self.path is not None):
+                self._disk_remove(key)
+
+        return
+
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+            if(self.path is not None):
+                for mtime, size, file_path in self._disk_scan():
+                    try:
+                        os.remove(file_path)
+                    except OSError:
+                        pass
+                self._disk_bytes = 0
+
+        return
+
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._memory)
+            stats["bytes"] = self._memory_bytes
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+
+        return stats
+
+
+    def reset_stats(self):
+        self._stats = { "hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0 }
+
+        return
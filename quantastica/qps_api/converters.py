@@ -0,0 +1,295 @@
+import re
+import json
+import threading
+
+from .qasm import parse_qasm, QCIRCUIT, QGATE
+
+
+# quantum-circuit gates with the same name in qelib1.inc: name -> params in QASM order (None: single param, any name)
+_QUANTUM_CIRCUIT_GATES = {
+    "id": [], "x": [], "y": [], "z": [], "h": [], "s": [], "sdg": [], "t": [], "tdg": [],
+    "cx": [], "cy": [], "cz": [], "ch": [], "swap": [], "ccx": [], "cswap": [],
+    "u1": None, "rx": None, "ry": None, "rz": None, "cu1": None, "crx": None, "cry": None, "crz": None,
+    "u2": ["phi", "lambda"],
+    "u3": ["theta", "phi", "lambda"],
+    "cu3": ["theta", "phi", "lambda"],
+    "measure": [], "reset": []
+}
+
+
+# gates defined in qelib1.inc: name -> (number of params, number of qubits)
+_QELIB1_GATES = {
+    "u3": (3, 1), "u2": (2, 1), "u1": (1, 1), "u0": (1, 1), "u": (3, 1), "p": (1, 1), "id": (0, 1),
+    "x": (0, 1), "y": (0, 1), "z": (0, 1), "h": (0, 1), "s": (0, 1), "sdg": (0, 1), "t": (0, 1), "tdg": (0, 1), "sx": (0, 1), "sxdg": (0, 1),
+    "rx": (1, 1), "ry": (1, 1), "rz": (1, 1),
+    "cx": (0, 2), "cy": (0, 2), "cz": (0, 2), "ch": (0, 2), "swap": (0, 2), "csx": (0, 2),
+    "crx": (1, 2), "cry": (1, 2), "crz": (1, 2), "cu1": (1, 2), "cp": (1, 2), "rxx": (1, 2), "rzz": (1, 2), "cu3": (3, 2), "cu": (4, 2),
+    "ccx": (0, 3), "cswap": (0, 3), "rccx": (0, 3),
+    "rc3x": (0, 4), "c3x": (0, 4), "c3sqrtx": (0, 4), "c4x": (0, 5)
+}
+
+# built into OpenQASM 2.0 (no include needed)
+_BUILTIN_GATES = { "U": (3, 1), "CX": (0, 2), "reset": (0, 1) }
+
+_DEFINITION_RE = re.compile(r"(?:gate|opaque)\s+([A-Za-z_][A-Za-z0-9_]*)\s*(?:\(([^)]*)\))?\s*([^{;]*)")
+
+
+class QLOCALCONVERTUNSUPPORTED(Exception):
+    # raised by local converter when input uses features it doesn't handle: conversion falls back to the server
+    pass
+
+
+def _text(input_data):
+    if(isinstance(input_data, str)):
+        return input_data
+
+    if(isinstance(input_data, QCIRCUIT)):
+        return input_data.to_qasm()
+
+    raise QLOCALCONVERTUNSUPPORTED("Expected string, got " + type(input_data).__name__ + ".")
+
+
+def _object(input_data):
+    if(isinstance(input_data, dict)):
+        return input_data
+
+    if(isinstance(input_data, str)):
+        return json.loads(input_data)
+
+    raise QLOCALCONVERTUNSUPPORTED("Expected dict or JSON string, got " + type(input_data).__name__ + ".")
+
+
+def _param_text(value):
+    if(isinstance(value, str)):
+        return value.strip()
+
+    return repr(value)
+
+
+def _quantum_circuit_params(name, options):
+    params = options.get("params") or {}
+
+    order = _QUANTUM_CIRCUIT_GATES[name]
+    if(order is None):
+        if(len(params) != 1):
+            raise QLOCALCONVERTUNSUPPORTED("Gate \"" + name + "\" expects one parameter.")
+        return [_param_text(value) for value in params.values()]
+
+    if(len(params) != len(order) or any(param_name not in params for param_name in order)):
+        raise QLOCALCONVERTUNSUPPORTED("Gate \"" + name + "\" expects parameters " + ", ".join(order) + ".")
+
+    return [_param_text(params[param_name]) for param_name in order]
+
+
+def quantum_circuit_to_circuit(input_data):
+    #
+    # Builds QCIRCUIT from quantum-circuit JSON: "gates" is a list of wires, each a list of columns.
+    # Multi-qubit gate occupies several wires of the same column with the same "id", ordered by "connector".
+    # Gate without "id" is a single-wire gate. Gates are checked with _check_gates() like parsed QASM.
+    #
+    data = _object(input_data)
+
+    if(data.get("customGates")):
+        raise QLOCALCONVERTUNSUPPORTED("Custom gates are not supported locally.")
+
+    wires = data.get("gates") or []
+    num_qubits = max(int(data.get("numQubits") or 0), len(wires))
+
+    circuit = QCIRCUIT()
+    circuit.includes.append("qelib1.inc")
+    if(num_qubits > 0):
+        circuit.add_qreg("q", num_qubits)
+
+    for creg_name, creg_value in (data.get("cregs") or {}).items():
+        # size, or list of bit values
+        circuit.add_creg(creg_name, creg_value if isinstance(creg_value, int) else len(creg_value))
+
+    creg_offsets = circuit._creg_offsets
+
+    num_columns = max((len(wire) for wire in wires), default=0)
+    for column in range(num_columns):
+        emitted = set()
+        for wire_index, wire in enumerate(wires):
+            gate = wire[column] if column < len(wire) else None
+            if(not gate or gate.get("id") in emitted):
+                continue
+
+            gate_id = gate.get("id")
+            if(gate_id is not None):
+                emitted.add(gate_id)
+
+            name = gate.get("name")
+            if(name not in _QUANTUM_CIRCUIT_GATES):
+                raise QLOCALCONVERTUNSUPPORTED("Gate \"" + str(name) + "\" is not supported locally.")
+
+            # collect all wires of this gate in the column
+            connectors = [(gate.get("connector", 0), wire_index)]
+            if(gate_id is not None):
+                for other_index in range(wire_index + 1, len(wires)):
+                    other_wire = wires[other_index]
+                    other = other_wire[column] if column < len(other_wire) else None
+                    if(other and other.get("id") == gate_id):
+                        connectors.append((other.get("connector", 0), other_index))
+            connectors.sort()
+            qubits = [qubit for connector, qubit in connectors]
+
+            options = gate.get("options") or {}
+            params = _quantum_circuit_params(name, options)
+
+            condition = None
+            if(options.get("condition")):
+                creg_name = options["condition"].get("creg")
+                if(creg_name not in creg_offsets):
+                    raise Exception("Unknown classical register \"" + str(creg_name) + "\" in condition.")
+                condition = (creg_name, int(options["condition"].get("value", 0)))
+
+            if(name == "measure"):
+                if(len(qubits) != 1):
+                    raise QLOCALCONVERTUNSUPPORTED("Measurement expects one qubit, got " + str(len(qubits)) + ".")
+                creg = options.get("creg") or {}
+                creg_name = creg.get("name")
+                if(creg_name not in creg_offsets):
+                    raise Exception("Unknown classical register \"" + str(creg_name) + "\" in measurement.")
+                offset, size = creg_offsets[creg_name]
+                bit = int(creg.get("bit", 0))
+                if(bit >= size):
+                    raise Exception("Bit " + str(bit) + " out of range of classical register \"" + creg_name + "\".")
+                circuit.gates.append(QGATE("measure", [], qubits, [offset + bit], condition))
+                continue
+
+            circuit.gates.append(QGATE(name, params, qubits, [], condition))
+
+    # e.g. cx with a missing connector
+    return _check_gates(circuit)
+
+
+def _declared_gates(circuit):
+    #
+    # Gates which can be used in circuit: name -> (number of params, number of qubits)
+    #
+    gates = dict(_BUILTIN_GATES)
+    if("qelib1.inc" in circuit.includes):
+        gates.update(_QELIB1_GATES)
+
+    for definition in circuit.definitions:
+        match = _DEFINITION_RE.match(definition)
+        if(match is None):
+            raise QLOCALCONVERTUNSUPPORTED("Cannot parse gate definition: " + definition)
+
+        name, params, args = match.groups()
+        gates[name] = (len([param for param in (params or "").split(",") if param.strip() != ""]), len([arg for arg in args.split(",") if arg.strip() != ""]))
+
+    return gates
+
+
+def _check_gates(circuit):
+    #
+    # Gates with unknown name (e.g. QPS extended instruction set or other includes) or wrong number of params or qubits are left to the server
+    #
+    gates = _declared_gates(circuit)
+
+    for gate in circuit.gates:
+        if(gate.name == "measure" or gate.name == "barrier"):
+            continue
+
+        signature = gates.get(gate.name)
+        if(signature is None):
+            raise QLOCALCONVERTUNSUPPORTED("Gate \"" + gate.name + "\" is not supported locally.")
+
+        if(signature != (len(gate.params), len(gate.qubits))):
+            raise QLOCALCONVERTUNSUPPORTED("Gate \"" + gate.name + "\" expects " + str(signature[0]) + " parameter(s) and " + str(signature[1]) + " qubit(s), got " + str(len(gate.params)) + " and " + str(len(gate.qubits)) + ".")
+
+    return circuit
+
+
+def qasm_to_qasm(input_data):
+    return _check_gates(parse_qasm(_text(input_data))).to_qasm()
+
+
+def quantum_circuit_to_qasm(input_data):
+    return quantum_circuit_to_circuit(input_data).to_qasm()
+
+
+def validate_qasm(input_data):
+    _check_gates(parse_qasm(_text(input_data)))
+
+    return True
+
+
+def validate_quantum_circuit(input_data):
+    quantum_circuit_to_circuit(input_data)
+
+    return True
+
+
+class QLOCALCONVERTERS:
+    def __init__(self, defaults=True):
+        # (source, dest) -> function(input_data) returning converted program as string
+        self.converters = {}
+
+        # format -> function(input_data) returning True or raising Exception
+        self.validators = {}
+
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+        if(defaults):
+            self.register("qasm", "qasm", qasm_to_qasm)
+            self.register("quantum-circuit", "qasm", quantum_circuit_to_qasm)
+            self.register("quantum-circuit", "qasm-ext", quantum_circuit_to_qasm)
+
+            self.register_validator("qasm", validate_qasm)
+            self.register_validator("quantum-circuit", validate_quantum_circuit)
+
+        return
+
+
+    def register(self, source_format, dest_format, converter):
+        self.converters[(str(source_format), str(dest_format))] = converter
+
+        return
+
+
+    def unregister(self, source_format, dest_format):
+        self.converters.pop((str(source_format), str(dest_format)), None)
+
+        return
+
+
+    def register_validator(self, source_format, validator):
+        self.validators[str(source_format)] = validator
+
+        return
+
+
+    def unregister_validator(self, source_format):
+        self.validators.pop(str(source_format), None)
+
+        return
+
+
+    def get(self, source_format, dest_format):
+        return self.converters.get((str(source_format), str(dest_format)))
+
+
+    def get_validator(self, source_format):
+        return self.validators.get(str(source_format))
+
+
+    def count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+        return
+
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+    def reset_stats(self):
+        # local: handled in-process, fallbacks: local converter failed and server was called
+        self._stats = { "local": 0, "fallbacks": 0 }
+
+        return
@@ -0,0 +1,153 @@
+import numbers
+
+
+# Maximum allowed deviation of vector norm (and unitary row norm) from 1
+NORM_TOLERANCE = 1e-3
+
+
+def _number_text(value):
+    #
+    # Python numbers are written the same way as str(list) writes them (repr is exact, round-trip precision).
+    # NumPy scalars are converted to Python numbers first (their repr is "np.float64(...)").
+    #
+    value_type = type(value)
+    if(value_type is int or value_type is float or value_type is complex):
+        return repr(value)
+
+    if(isinstance(value, numbers.Integral)):
+        return repr(int(value))
+
+    if(isinstance(value, numbers.Real)):
+        return repr(float(value))
+
+    if(isinstance(value, numbers.Complex)):
+        return repr(complex(value))
+
+    return repr(value)
+
+
+def _values(vector):
+    # ndarray.tolist() converts all elements to Python numbers in a single C-level pass
+    if(hasattr(vector, "tolist") and hasattr(vector, "ndim")):
+        return vector.tolist()
+
+    return vector
+
+
+def _numeric_array(vector):
+    return getattr(getattr(vector, "dtype", None), "kind", None) in ("i", "u", "f", "c")
+
+
+def _numbers_text(vector, values):
+    # numeric ndarray elements are already Python int/float/complex after tolist(), which str(list) writes as they are
+    if(_numeric_array(vector)):
+        return str(values)
+
+    return "[" + ", ".join(map(_number_text, values)) + "]"
+
+
+def _norm_squared(values):
+    total = 0.0
+    for value in values:
+        if(not isinstance(value, numbers.Number)):
+            # symbolic value, e.g. "1/sqrt(2)", can be checked only by the server
+            return None
+        total += abs(value) ** 2
+
+    return total
+
+
+def _check_text(text, what):
+    if("..." in text):
+        raise Exception(what + " text is truncated (contains \"...\"). Pass list or array instead of its printed form.")
+
+    return text
+
+
+def _check_length(length, what):
+    if(length == 0 or length & (length - 1) != 0):
+        raise Exception(what + " length must be a power of 2, got " + str(length) + ".")
+
+    return
+
+
+def encode_vector(vector, check_norm=True):
+    if(isinstance(vector, str)):
+        return _check_text(vector, "Vector")
+
+    values = _values(vector)
+
+    if(hasattr(vector, "ndim") and vector.ndim != 1):
+        raise Exception("Vector must be 1-dimensional, got shape " + str(vector.shape) + ".")
+
+    _check_length(len(values), "Vector")
+
+    if(check_norm):
+        norm_squared = float((abs(vector) ** 2).sum()) if _numeric_array(vector) else _norm_squared(values)
+        if(norm_squared is not None and abs(norm_squared ** 0.5 - 1.0) > NORM_TOLERANCE):
+            raise Exception("Vector is not normalized (norm is " + str(norm_squared ** 0.5) + ").")
+
+    return _numbers_text(vector, values)
+
+
+def encode_vectors(vector_pairs, check_norm=True):
+    #
+    # Returns (text1, text2): initial and final vectors, one vector per line
+    #
+    lines1 = []
+    lines2 = []
+    vector_length = None
+    for vector_pair in vector_pairs:
+        text1 = encode_vector(vector_pair[0], check_norm)
+        text2 = encode_vector(vector_pair[1], check_norm)
+
+        for vector in vector_pair:
+            if(not isinstance(vector, str)):
+                if(vector_length is None):
+                    vector_length = len(vector)
+                elif(len(vector) != vector_length):
+                    raise Exception("All vectors must be of the same length.")
+
+        lines1.append(text1)
+        lines2.append(text2)
+
+    return "\n".join(lines1), "\n".join(lines2)
+
+
+def encode_matrix(matrix, check_norm=True):
+    if(isinstance(matrix, str)):
+        return _check_text(matrix, "Matrix")
+
+    rows = _values(matrix)
+
+    if(hasattr(matrix, "ndim") and matrix.ndim != 2):
+        raise Exception("Matrix must be 2-dimensional, got shape " + str(matrix.shape) + ".")
+
+    _check_length(len(rows), "Matrix")
+
+    row_norms_squared = None
+    if(check_norm and _numeric_array(matrix)):
+        row_norms_squared = (abs(matrix) ** 2).sum(axis=1).tolist()
+
+    row_texts = []
+    for row_index, row in enumerate(rows):
+        if(len(row) != len(rows)):
+            raise Exception("Matrix must be square.")
+
+        if(check_norm):
+            norm_squared = row_norms_squared[row_index] if row_norms_squared is not None else _norm_squared(row)
+            if(norm_squared is not None and abs(norm_squared ** 0.5 - 1.0) > NORM_TOLERANCE):
+                raise Exception("Matrix is not unitary (row norm is " + str(norm_squared ** 0.5) + ").")
+
+        row_texts.append(_numbers_text(matrix, row))
+
+    return "[" + ", ".join(row_texts) + "]"
+
+
+def basis_state_text(num_amplitudes, index=0):
+    #
+    # Text of computational basis state |index> without allocating the vector
+    #
+    _check_length(num_amplitudes, "Vector")
+
+    return "[" + "0, " * index + "1" + ", 0" * (num_amplitudes - index - 1) + "]"
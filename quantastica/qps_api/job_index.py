@@ -0,0 +1,344 @@
+import json
+import time
+import threading
+
+
+# list entry fields stored in their own columns (server time strings, when provided)
+_TIMESTAMPS = ("createdAt", "modifiedAt", "queuedAt", "startedAt", "finishedAt")
+
+_ORDERS = {
+    "created": "created_at, job_id",
+    "-created": "created_at DESC, job_id DESC",
+    "finished": "finished_at, job_id",
+    "-finished": "finished_at DESC, job_id DESC",
+    "name": "name, job_id"
+}
+
+
+def _changed(old_data, job):
+    #
+    # True if list entry differs from stored one. Entries with modifiedAt are compared by it (and status) only.
+    #
+    if(old_data is None):
+        return True
+
+    old_job = json.loads(old_data)
+    if(job.get("modifiedAt") is not None and old_job.get("modifiedAt") is not None):
+        return job["modifiedAt"] != old_job["modifiedAt"] or job.get("status") != old_job.get("status")
+
+    return old_job != job
+
+
+class QJOBINDEX:
+    #
+    # Local index of the account's jobs, kept up to date incrementally:
+    #   - full sync (whole job/list) first and then every full_sync_interval seconds
+    #   - incremental sync lists only jobs with active_statuses (which are few) and checks status of jobs which left these lists
+    #   - job status changes observed by any request of qps_api (job_state hook) are applied immediately. Jobs not in the index yet
+    #     (e.g. started by solve() since last sync) are added, so they are checked by ID even if they finish before the next sync.
+    # Queries by status, name and type are answered locally from indexed SQLite table.
+    #
+    def __init__(self, qps_api, path=":memory:", full_sync_interval=600.0, active_statuses=("draft", "queued", "running"), max_status_checks=50):
+        import sqlite3
+
+        self.qps_api = qps_api
+
+        self.full_sync_interval = full_sync_interval
+        self.active_statuses = tuple(active_statuses)
+
+        # if more jobs left active lists since last sync, full sync is done instead of checking them one by one
+        self.max_status_checks = max_status_checks
+
+        self.last_sync = None
+        self.last_full_sync = None
+
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+
+        with self._lock:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, name TEXT, type TEXT, status TEXT, created_at TEXT, modified_at TEXT, queued_at TEXT, started_at TEXT, finished_at TEXT, data TEXT NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS jobs_name ON jobs (name, created_at)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS jobs_type ON jobs (type, created_at)")
+
+        self.reset_stats()
+
+        qps_api.hooks.on("job_state", self._on_job_state)
+
+        return
+
+
+    def close(self):
+        self.qps_api.hooks.off("job_state", self._on_job_state)
+
+        with self._lock:
+            self._connection.close()
+
+        return
+
+
+    def reset_stats(self):
+        # full_syncs, incremental_syncs, list_requests, status_requests: requests made by sync(); updated: rows inserted or changed
+        self._stats = { "full_syncs": 0, "incremental_syncs": 0, "list_requests": 0, "status_requests": 0, "updated": 0 }
+
+        return
+
+
+    #
+    # Applying server data
+    #
+
+    def _upsert(self, jobs):
+        updated = 0
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN")
+            try:
+                for job in jobs:
+                    job_id = job.get("_id")
+                    if(job_id is None):
+                        continue
+
+                    row = connection.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+                    if(row is not None):
+                        # keep fields known from earlier entries (e.g. timestamps) which this entry doesn't have
+                        merged = json.loads(row[0])
+                        merged.update(job)
+                        job = merged
+
+                    if(not _changed(row[0] if row is not None else None, job)):
+                        continue
+
+                    connection.execute(
+                        "INSERT OR REPLACE INTO jobs (job_id, name, type, status, created_at, modified_at, queued_at, started_at, finished_at, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (job_id, job.get("name"), job.get("type"), job.get("status")) + tuple(job.get(key) for key in _TIMESTAMPS) + (json.dumps(job),)
+                    )
+                    updated += 1
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+            self._stats["updated"] += updated
+
+        return updated
+
+
+    def _remove(self, job_ids):
+        with self._lock:
+            self._connection.executemany("DELETE FROM jobs WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+
+        return
+
+
+    def _on_job_state(self, data):
+        # status observed elsewhere (job_status(), get_job(), start_job(), list_jobs()...). Other list entry fields of a job
+        # added here are filled in when it is listed.
+        with self._lock:
+            row = self._connection.execute("SELECT status FROM jobs WHERE job_id = ?", (data["job_id"],)).fetchone()
+            if(row is None or row[0] != data["status"]):
+                self._upsert([{ "_id": data["job_id"], "status": data["status"] }])
+
+        return
+
+
+    def _full_sync_due(self, full):
+        if(full is not None):
+            return full
+
+        return self.last_full_sync is None or time.time() - self.last_full_sync >= self.full_sync_interval
+
+
+    def _apply_full(self, list_result, started):
+        jobs = list_result.get("list", [])
+        self._upsert(jobs)
+
+        # jobs deleted on server
+        listed = set(job.get("_id") for job in jobs)
+        with self._lock:
+            stored = [row[0] for row in self._connection.execute("SELECT job_id FROM jobs").fetchall()]
+        self._remove([job_id for job_id in stored if job_id not in listed])
+
+        self.last_full_sync = started
+        self.last_sync = started
+        self._stats["full_syncs"] += 1
+
+        return
+
+
+    def _apply_active(self, list_results):
+        #
+        # Returns IDs of jobs stored with active status which are not in active lists anymore (their status must be checked)
+        #
+        listed = set()
+        for list_result in list_results:
+            jobs = list_result.get("list", [])
+            self._upsert(jobs)
+            listed.update(job.get("_id") for job in jobs)
+
+        with self._lock:
+            placeholders = ",".join("?" * len(self.active_statuses))
+            stored = [row[0] for row in self._connection.execute("SELECT job_id FROM jobs WHERE status IN (" + placeholders + ")", self.active_statuses).fetchall()]
+
+        return [job_id for job_id in stored if job_id not in listed]
+
+
+    def _apply_status(self, job_id, status_result):
+        if(status_result is None):
+            # job doesn't exist anymore
+            self._remove([job_id])
+        else:
+            self._upsert([{ "_id": job_id, "status": status_result.get("status") }])
+
+        return
+
+
+    def _finish_incremental(self, started):
+        self.last_sync = started
+        self._stats["incremental_syncs"] += 1
+
+        return
+
+
+    #
+    # Sync
+    #
+
+    def sync(self, full=None):
+        #
+        # full: True forces full sync, False forces incremental sync, None decides by full_sync_interval
+        #
+        import requests
+
+        synth = self.qps_api.synth
+        started = time.time()
+
+        if(self._full_sync_due(full)):
+            self._stats["list_requests"] += 1
+            self._apply_full(synth.list_jobs(), started)
+            return self
+
+        self._stats["list_requests"] += len(self.active_statuses)
+        left = self._apply_active([synth.list_jobs(status) for status in self.active_statuses])
+
+        if(len(left) > self.max_status_checks):
+            self._stats["list_requests"] += 1
+            self._apply_full(synth.list_jobs(), started)
+            return self
+
+        for job_id in left:
+            self._stats["status_requests"] += 1
+            try:
+                status_result = synth.job_status(job_id)
+            except requests.exceptions.HTTPError as e:
+                if(e.response is None or e.response.status_code != 404):
+                    raise
+                status_result = None
+            self._apply_status(job_id, status_result)
+
+        self._finish_incremental(started)
+
+        return self
+
+
+    async def sync_async(self, full=None):
+        #
+        # The same as sync() for AsyncQPSAPI
+        #
+        import asyncio
+        import requests
+
+        synth = self.qps_api.synth
+        started = time.time()
+
+        if(self._full_sync_due(full)):
+            self._stats["list_requests"] += 1
+            self._apply_full(await synth.list_jobs(), started)
+            return self
+
+        self._stats["list_requests"] += len(self.active_statuses)
+        left = self._apply_active(await asyncio.gather(*[synth.list_jobs(status) for status in self.active_statuses]))
+
+        if(len(left) > self.max_status_checks):
+            self._stats["list_requests"] += 1
+            self._apply_full(await synth.list_jobs(), started)
+            return self
+
+        async def check(job_id):
+            try:
+                return await synth.job_status(job_id)
+            except requests.exceptions.HTTPError as e:
+                if(e.response is None or e.response.status_code != 404):
+                    raise
+                return None
+
+        self._stats["status_requests"] += len(left)
+        for job_id, status_result in zip(left, await asyncio.gather(*[check(job_id) for job_id in left])):
+            self._apply_status(job_id, status_result)
+
+        self._finish_incremental(started)
+
+        return self
+
+
+    #
+    # Queries
+    #
+
+    def _where(self, status, name, job_type):
+        conditions = []
+        params = []
+        for column, value in (("status", status), ("name", name), ("type", job_type)):
+            if(value is None):
+                continue
+            if(isinstance(value, (list, tuple, set))):
+                conditions.append(column + " IN (" + ",".join("?" * len(value)) + ")")
+                params += list(value)
+            else:
+                conditions.append(column + " = ?")
+                params.append(value)
+
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+
+    def jobs(self, status=None, name=None, job_type=None, limit=None, offset=0, order="created"):
+        #
+        # List entries matching all given filters (each can be a value or a list of values), paginated.
+        # order: "created", "-created", "finished", "-finished" or "name"
+        #
+        if(order not in _ORDERS):
+            raise Exception("Unknown order \"" + str(order) + "\". Expected one of: " + ", ".join(_ORDERS) + ".")
+
+        where, params = self._where(status, name, job_type)
+
+        with self._lock:
+            rows = self._connection.execute("SELECT data FROM jobs" + where + " ORDER BY " + _ORDERS[order] + " LIMIT ? OFFSET ?", params + [limit if limit is not None else -1, offset]).fetchall()
+
+        return [json.loads(row[0]) for row in rows]
+
+
+    def count(self, status=None, name=None, job_type=None):
+        where, params = self._where(status, name, job_type)
+
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM jobs" + where, params).fetchone()[0]
+
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+        return json.loads(row[0]) if row is not None else None
+
+
+    def stats(self):
+        with self._lock:
+            statuses = { status: count for status, count in self._connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall() }
+
+        stats = dict(self._stats)
+        stats["jobs"] = sum(statuses.values())
+        stats["statuses"] = statuses
+        stats["last_sync"] = self.last_sync
+        stats["last_full_sync"] = self.last_full_sync
+
+        return stats
@@ -0,0 +1,230 @@
+import json
+import time
+import zlib
+import threading
+
+
+_COLUMNS = "seq, time, problem_key, job_id, status"
+
+# jobs in these states are not re-attached on resume: problem is submitted again
+_RESUBMIT_STATUSES = ("error",)
+
+
+class QJOBJOURNAL:
+    #
+    # Append-only SQLite journal of submitted jobs: problem hash -> job ID -> status changes -> result.
+    # Each change appends an entry, so the journal survives crashes at any point. Current state of a job is its latest entry.
+    # Can be shared by threads of one process and opened by multiple processes (WAL mode).
+    #
+    def __init__(self, path, compress_threshold=4096):
+        import sqlite3
+
+        self.path = path
+
+        # results whose JSON is at least compress_threshold bytes are stored zlib-compressed. None disables compression.
+        self.compress_threshold = compress_threshold
+
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._lock = threading.RLock()
+
+        # job_id -> (problem_key, status) of latest entry, or None if job is not in the journal
+        self._known = {}
+
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS journal (seq INTEGER PRIMARY KEY AUTOINCREMENT, time REAL NOT NULL, problem_key TEXT, job_id TEXT NOT NULL, status TEXT, result BLOB)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS journal_problem ON journal (problem_key, seq)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS journal_job ON journal (job_id, seq)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS journal_status ON journal (status, seq)")
+
+        return
+
+
+    def _encode(self, value):
+        data = json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+        if(self.compress_threshold is not None and len(data) >= self.compress_threshold):
+            return b"z" + zlib.compress(data)
+
+        return b"j" + data
+
+
+    def _decode(self, data):
+        data = bytes(data)
+        if(data[:1] == b"z"):
+            data = zlib.decompress(data[1:])
+        else:
+            data = data[1:]
+
+        return json.loads(data.decode("utf-8"))
+
+
+    def _entry(self, row):
+        if(row is None):
+            return None
+
+        return { "seq": row[0], "time": row[1], "problem_key": row[2], "job_id": row[3], "status": row[4] }
+
+
+    def _append(self, problem_key, job_id, status, result=None):
+        encoded = self._encode(result) if result is not None else None
+
+        with self._lock:
+            self._connection.execute("INSERT INTO journal (time, problem_key, job_id, status, result) VALUES (?, ?, ?, ?, ?)", (time.time(), problem_key, job_id, status, encoded))
+            self._known[job_id] = (problem_key, status)
+
+        return
+
+
+    def _latest_known(self, job_id):
+        with self._lock:
+            if(job_id not in self._known):
+                entry = self.job(job_id)
+                self._known[job_id] = (entry["problem_key"], entry["status"]) if entry is not None else None
+
+            return self._known[job_id]
+
+
+    #
+    # Recording
+    #
+
+    def record(self, problem_key, job_id, status):
+        # job was submitted (or re-attached) for problem
+        self._append(problem_key, job_id, status)
+
+        return
+
+
+    def record_status(self, job_id, status):
+        #
+        # Appends entry if status of a journaled job changed. Jobs not in the journal are ignored.
+        #
+        known = self._latest_known(job_id)
+        if(known is None or status is None or known[1] == status):
+            return
+
+        self._append(known[0], job_id, status)
+
+        return
+
+
+    def record_result(self, job_id, job):
+        #
+        # Stores finished job object. Jobs not in the journal are ignored.
+        #
+        known = self._latest_known(job_id)
+        if(known is None):
+            return
+
+        with self._lock:
+            # already stored
+            if(known[1] == job.get("status") and self.result(job_id) is not None):
+                return
+
+            self._append(known[0], job_id, job.get("status"), job)
+
+        return
+
+
+    #
+    # Lookup
+    #
+
+    def latest(self, problem_key):
+        # latest entry of the latest job submitted for problem, or None
+        with self._lock:
+            row = self._connection.execute("SELECT " + _COLUMNS + " FROM journal WHERE problem_key = ? ORDER BY seq DESC LIMIT 1", (problem_key,)).fetchone()
+
+        return self._entry(row)
+
+
+    def resumable(self, problem_key):
+        #
+        # Job to re-attach to instead of submitting the problem again, or None
+        #
+        entry = self.latest(problem_key)
+        if(entry is None or entry["status"] in _RESUBMIT_STATUSES):
+            return None
+
+        return entry
+
+
+    def job(self, job_id):
+        # latest entry of a job, or None
+        with self._lock:
+            row = self._connection.execute("SELECT " + _COLUMNS + " FROM journal WHERE job_id = ? ORDER BY seq DESC LIMIT 1", (job_id,)).fetchone()
+
+        return self._entry(row)
+
+
+    def result(self, job_id):
+        #
+        # Stored job object if it is still current, or None. Any entry after the result (e.g. job was reset or started again,
+        # even if it finished again since) means the stored result is stale.
+        #
+        with self._lock:
+            row = self._connection.execute("SELECT result FROM journal WHERE job_id = ? ORDER BY seq DESC LIMIT 1", (job_id,)).fetchone()
+
+        return self._decode(row[0]) if row is not None and row[0] is not None else None
+
+
+    def jobs(self, status=None, limit=None, offset=0):
+        #
+        # Latest entry of each job (optionally only jobs whose current status is status), least recently changed first
+        #
+        query = "SELECT " + _COLUMNS + " FROM journal AS entry WHERE seq = (SELECT MAX(seq) FROM journal WHERE job_id = entry.job_id)"
+        params = []
+        if(status is not None):
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY seq LIMIT ? OFFSET ?"
+        params += [limit if limit is not None else -1, offset]
+
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+
+        return [self._entry(row) for row in rows]
+
+
+    def stats(self):
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM journal").fetchone()[0]
+            statuses = self._connection.execute("SELECT status, COUNT(*) FROM journal AS entry WHERE seq = (SELECT MAX(seq) FROM journal WHERE job_id = entry.job_id) GROUP BY status").fetchall()
+
+        statuses = { status: count for status, count in statuses }
+
+        return { "entries": entries, "jobs": sum(statuses.values()), "statuses": statuses }
+
+
+    #
+    # Maintenance
+    #
+
+    def compact(self, vacuum=True):
+        #
+        # Removes superseded entries: keeps the latest entry of each job (older results are stale anyway).
+        # Returns number of removed entries.
+        #
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                removed = connection.execute("DELETE FROM journal WHERE seq NOT IN (SELECT MAX(seq) FROM journal GROUP BY job_id)").rowcount
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+            if(vacuum):
+                connection.execute("VACUUM")
+
+        return removed
+
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+        return
@@ -0,0 +1,269 @@
+import re
+import json
+import codecs
+
+
+_DECODER = json.JSONDecoder()
+
+_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+_STRING_SPECIAL_RE = re.compile(r"[\"\\]")
+_CONTAINER_SPECIAL_RE = re.compile(r"[\"\[\]{}]")
+_SCALAR_END_RE = re.compile(r"[,\]} \t\n\r]")
+
+
+class QJSONSTREAMREADER:
+    #
+    # Incremental JSON reader over iterable of chunks (bytes or str), e.g. response.iter_content().
+    # Only text of the value being decoded is kept in memory: skipped values are scanned and discarded chunk by chunk.
+    #
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._eof = False
+
+        self.buffer = ""
+        self.pos = 0
+
+        return
+
+
+    def _fill(self, keep_from):
+        #
+        # Appends next chunk to the buffer, dropping text before index keep_from.
+        # Returns number of characters dropped (indexes held by caller must be shifted), or None at end of input.
+        #
+        text = ""
+        while(text == "" and not self._eof):
+            chunk = next(self._chunks, None)
+            if(chunk is None):
+                self._eof = True
+                text = self._decoder.decode(b"", final=True)
+            elif(isinstance(chunk, str)):
+                text = chunk
+            else:
+                text = self._decoder.decode(chunk)
+
+        if(text == ""):
+            return None
+
+        self.buffer = self.buffer[keep_from:] + text
+        self.pos -= keep_from
+
+        return keep_from
+
+
+    def _error(self, message):
+        raise Exception("Invalid JSON: " + message + " near \"" + self.buffer[self.pos:self.pos + 32] + "\".")
+
+
+    def peek(self):
+        #
+        # Skips whitespace and returns next character ("" at end of input)
+        #
+        while True:
+            self.pos = _WHITESPACE_RE.match(self.buffer, self.pos).end()
+            if(self.pos < len(self.buffer)):
+                return self.buffer[self.pos]
+            if(self._fill(self.pos) is None):
+                return ""
+
+
+    def expect(self, char):
+        if(self.peek() != char):
+            self._error("expected \"" + char + "\"")
+        self.pos += 1
+
+        return
+
+
+    def _more(self, index, keep):
+        #
+        # Reads next chunk while scanning at index. Returns index shifted by buffer compaction, or None at end of input.
+        # If keep is False, text before index is dropped, otherwise text from self.pos is kept.
+        #
+        shift = self._fill(self.pos if keep else index)
+        if(shift is None):
+            return None
+
+        return index - shift
+
+
+    def _scan_string(self, index, keep):
+        #
+        # index points after opening quote. Returns index after closing quote.
+        #
+        while True:
+            match = _STRING_SPECIAL_RE.search(self.buffer, index)
+            if(match is not None):
+                index = match.start()
+                if(self.buffer[index] == "\""):
+                    return index + 1
+                if(index + 1 < len(self.buffer)):
+                    # escaped character
+                    index += 2
+                    continue
+            else:
+                index = len(self.buffer)
+
+            index = self._more(index, keep)
+            if(index is None):
+                self._error("unterminated string")
+
+
+    def _scan_value(self, keep):
+        #
+        # Returns index after the value starting at self.pos (skipping whitespace)
+        #
+        char = self.peek()
+        if(char == ""):
+            self._error("unexpected end of input")
+
+        index = self.pos + 1
+
+        if(char == "\""):
+            return self._scan_string(index, keep)
+
+        if(char in "[{"):
+            depth = 1
+            while True:
+                match = _CONTAINER_SPECIAL_RE.search(self.buffer, index)
+                if(match is None):
+                    index = self._more(len(self.buffer), keep)
+                    if(index is None):
+                        self._error("unterminated " + ("array" if char == "[" else "object"))
+                    continue
+
+                index = match.start()
+                special = self.buffer[index]
+                if(special == "\""):
+                    index = self._scan_string(index + 1, keep)
+                    continue
+
+                depth += 1 if special in "[{" else -1
+                index += 1
+                if(depth == 0):
+                    return index
+
+        # number, true, false or null
+        while True:
+            match = _SCALAR_END_RE.search(self.buffer, index)
+            if(match is not None):
+                return match.start()
+
+            end = len(self.buffer)
+            index = self._more(end, keep)
+            if(index is None):
+                return end
+
+
+    def read_value(self):
+        end = self._scan_value(True)
+
+        value, self.pos = _DECODER.raw_decode(self.buffer, self.pos)
+        if(self.pos != end):
+            self._error("invalid value")
+
+        return value
+
+
+    def skip_value(self):
+        self.pos = self._scan_value(False)
+
+        return
+
+
+    def read_object(self, fields=None):
+        #
+        # Decodes object at current position. If fields is given, values of other keys are skipped without decoding.
+        #
+        if(fields is None or self.peek() != "{"):
+            return self.read_value()
+
+        result = {}
+        for key in self.iter_keys():
+            if(key in fields):
+                result[key] = self.read_value()
+            else:
+                self.skip_value()
+
+        return result
+
+
+    def iter_keys(self):
+        #
+        # Iterates keys of object at current position. Caller must read or skip the value of each key before the next one.
+        #
+        self.expect("{")
+
+        if(self.peek() == "}"):
+            self.pos += 1
+            return
+
+        while True:
+            if(self.peek() != "\""):
+                self._error("expected object key")
+            key = self.read_value()
+            self.expect(":")
+
+            yield key
+
+            char = self.peek()
+            self.pos += 1
+            if(char == "}"):
+                return
+            if(char != ","):
+                self.pos -= 1
+                self._error("expected \",\" or \"}\"")
+
+
+    def iter_items(self, fields=None):
+        #
+        # Decodes items of array at current position one by one
+        #
+        self.expect("[")
+
+        if(self.peek() == "]"):
+            self.pos += 1
+            return
+
+        while True:
+            yield self.read_object(fields)
+
+            char = self.peek()
+            self.pos += 1
+            if(char == "]"):
+                return
+            if(char != ","):
+                self.pos -= 1
+                self._error("expected \",\" or \"]\"")
+
+
+def iter_json_items(chunks, path, fields=None):
+    #
+    # Yields items of array found at path (sequence of object keys) in JSON document, e.g. path ("output", "circuits") of job object.
+    # If fields is given, array items (objects) contain only these keys. Yields nothing if path doesn't exist.
+    #
+    reader = QJSONSTREAMREADER(chunks)
+
+    def walk(depth):
+        if(depth == len(path)):
+            if(reader.peek() == "["):
+                yield from reader.iter_items(fields)
+            else:
+                reader.skip_value()
+            return
+
+        if(reader.peek() != "{"):
+            reader.skip_value()
+            return
+
+        for key in reader.iter_keys():
+            if(key == path[depth]):
+                yield from walk(depth + 1)
+                # rest of the document is not needed
+                return
+            reader.skip_value()
+
+    yield from walk(0)
+
+    return
@@ -0,0 +1,230 @@
+import math
+import time
+import threading
+from collections import deque
+
+
+# request_start: { endpoint, url, attempt }
+# request_end: { endpoint, url, attempt, status_code, elapsed, bytes_out, bytes_in, error }
+# retry: { endpoint, url, attempt, reason }
+# backoff: { endpoint, url, attempt, delay }
+# job_state: { job_id, previous_status, status }
+# circuit_state: { previous_state, state }
+EVENTS = ("request_start", "request_end", "retry", "backoff", "job_state", "circuit_state")
+
+
+def _get_logger():
+    # logging is imported on first use (only retries and failures are logged), keeping package import fast
+    import logging
+
+    return logging.getLogger("quantastica.qps_api")
+
+
+def _percentile(sorted_values, fraction):
+    # nearest-rank percentile
+    if(len(sorted_values) == 0):
+        return None
+
+    rank = max(1, int(math.ceil(fraction * len(sorted_values))))
+
+    return sorted_values[rank - 1]
+
+
+def _sample_value(value):
+    if(isinstance(value, int)):
+        return str(value)
+
+    value = float(value)
+
+    return "NaN" if math.isnan(value) else repr(value)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class QHOOKS:
+    def __init__(self):
+        # event -> list of callbacks. Lists are replaced (never modified) so emit() doesn't need a lock.
+        self._callbacks = { event: [] for event in EVENTS }
+        self._lock = threading.Lock()
+
+        return
+
+
+    def on(self, event, callback):
+        #
+        # callback(data) receives dict with event fields plus "event" (name) and "time" (unix time)
+        #
+        if(event not in self._callbacks):
+            raise Exception("Unknown event \"" + str(event) + "\". Expected one of: " + ", ".join(EVENTS) + ".")
+
+        with self._lock:
+            self._callbacks[event] = self._callbacks[event] + [callback]
+
+        return callback
+
+
+    def off(self, event, callback):
+        with self._lock:
+            self._callbacks[event] = [c for c in self._callbacks.get(event, []) if c != callback]
+
+        return
+
+
+    def active(self, event):
+        return len(self._callbacks[event]) > 0
+
+
+    def emit(self, event, data):
+        callbacks = self._callbacks[event]
+        if(len(callbacks) == 0):
+            return
+
+        data["event"] = event
+        data["time"] = time.time()
+
+        for callback in callbacks:
+            try:
+                callback(data)
+            except Exception:
+                # instrumentation must never break requests
+                _get_logger().exception("Hook for \"" + event + "\" failed.")
+
+        return
+
+
+class QMETRICS:
+    def __init__(self, max_samples=1024):
+        # latency percentiles are computed from the last max_samples requests of each endpoint
+        self.max_samples = max_samples
+
+        self._lock = threading.Lock()
+
+        self.reset()
+
+        return
+
+
+    def attach(self, hooks):
+        hooks.on("request_end", self._on_request_end)
+        hooks.on("retry", self._on_retry)
+        hooks.on("job_state", self._on_job_state)
+
+        return self
+
+
+    def detach(self, hooks):
+        hooks.off("request_end", self._on_request_end)
+        hooks.off("retry", self._on_retry)
+        hooks.off("job_state", self._on_job_state)
+
+        return self
+
+
+    def reset(self):
+        with self._lock:
+            self._started = time.time()
+            self._endpoints = {}
+            self._job_states = {}
+
+        return
+
+
+    def _endpoint(self, endpoint):
+        stats = self._endpoints.get(endpoint)
+        if(stats is None):
+            stats = { "requests": 0, "errors": 0, "retries": 0, "bytes_out": 0, "bytes_in": 0, "time": 0.0, "latencies": deque(maxlen=self.max_samples) }
+            self._endpoints[endpoint] = stats
+
+        return stats
+
+
+    def _on_request_end(self, data):
+        with self._lock:
+            stats = self._endpoint(data["endpoint"])
+            stats["requests"] += 1
+            if(data["error"] is not None or (data["status_code"] or 0) >= 400):
+                stats["errors"] += 1
+            stats["bytes_out"] += data["bytes_out"]
+            stats["bytes_in"] += data["bytes_in"]
+            stats["time"] += data["elapsed"]
+            stats["latencies"].append(data["elapsed"])
+
+        return
+
+
+    def _on_retry(self, data):
+        with self._lock:
+            self._endpoint(data["endpoint"])["retries"] += 1
+
+        return
+
+
+    def _on_job_state(self, data):
+        with self._lock:
+            self._job_states[data["status"]] = self._job_states.get(data["status"], 0) + 1
+
+        return
+
+
+    def snapshot(self):
+        with self._lock:
+            uptime = time.time() - self._started
+
+            endpoints = {}
+            for endpoint, stats in self._endpoints.items():
+                latencies = sorted(stats["latencies"])
+                requests = stats["requests"]
+                endpoints[endpoint] = {
+                    "requests": requests,
+                    "errors": stats["errors"],
+                    "retries": stats["retries"],
+                    "error_rate": stats["errors"] / requests if requests else 0.0,
+                    "retry_ratio": stats["retries"] / requests if requests else 0.0,
+                    "throughput": requests / uptime if uptime > 0 else 0.0,
+                    "bytes_out": stats["bytes_out"],
+                    "bytes_in": stats["bytes_in"],
+                    "latency_sum": stats["time"],
+                    "latency_mean": stats["time"] / requests if requests else None,
+                    "latency_p50": _percentile(latencies, 0.50),
+                    "latency_p95": _percentile(latencies, 0.95),
+                    "latency_p99": _percentile(latencies, 0.99)
+                }
+
+            return { "uptime": uptime, "endpoints": endpoints, "job_states": dict(self._job_states) }
+
+
+    def to_prometheus(self, prefix="qps_api"):
+        #
+        # Prometheus text exposition format (version 0.0.4)
+        #
+        snapshot = self.snapshot()
+        endpoints = snapshot["endpoints"]
+
+        lines = []
+
+        def metric(name, metric_type, help_text, samples):
+            lines.append("# HELP " + prefix + "_" + name + " " + help_text)
+            lines.append("# TYPE " + prefix + "_" + name + " " + metric_type)
+            for suffix, labels, value in samples:
+                label_text = ",".join(key + "=\"" + _label(label_value) + "\"" for key, label_value in labels)
+                lines.append(prefix + "_" + name + suffix + ("{" + label_text + "}" if label_text else "") + " " + _sample_value(value))
+
+        metric("requests_total", "counter", "HTTP requests (each attempt counts).", [("", [("endpoint", endpoint)], stats["requests"]) for endpoint, stats in endpoints.items()])
+        metric("request_errors_total", "counter", "Failed HTTP requests (connection errors, timeouts and HTTP status >= 400).", [("", [("endpoint", endpoint)], stats["errors"]) for endpoint, stats in endpoints.items()])
+        metric("request_retries_total", "counter", "Retried HTTP requests.", [("", [("endpoint", endpoint)], stats["retries"]) for endpoint, stats in endpoints.items()])
+        metric("request_bytes_total", "counter", "Request and response body bytes.", [("", [("endpoint", endpoint), ("direction", direction)], stats["bytes_" + direction]) for endpoint, stats in endpoints.items() for direction in ("out", "in")])
+
+        samples = []
+        for endpoint, stats in endpoints.items():
+            for quantile, key in (("0.5", "latency_p50"), ("0.95", "latency_p95"), ("0.99", "latency_p99")):
+                value = stats[key]
+                samples.append(("", [("endpoint", endpoint), ("quantile", quantile)], value if value is not None else float("nan")))
+            samples.append(("_sum", [("endpoint", endpoint)], stats["latency_sum"]))
+            samples.append(("_count", [("endpoint", endpoint)], stats["requests"]))
+        metric("request_duration_seconds", "summary", "HTTP request duration in seconds.", samples)
+
+        metric("job_state_transitions_total", "counter", "Observed job status changes by new status.", [("", [("status", status)], count) for status, count in snapshot["job_states"].items()])
+
+        return "\n".join(lines) + "\n"
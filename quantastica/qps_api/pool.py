@@ -0,0 +1,487 @@
+import time
+import threading
+
+from .qps_api import QPSAPI, QGENAPI, QPOLLSTRATEGY, _apply_settings, _problem_key, _stored_job, _known_status, _job_alias_key, _job_cache_key
+from .singleflight import QSINGLEFLIGHT
+from .retry import QCIRCUITOPENERROR
+from .metrics import _get_logger
+
+
+# statuses counted as backend's queue depth
+_QUEUE_STATUSES = ("queued", "running")
+
+# remembered job owners and problem -> backend affinities
+_MAX_OWNERS = 100000
+_MAX_AFFINITIES = 10000
+
+
+def _http_status(error):
+    import requests
+
+    if(isinstance(error, requests.exceptions.HTTPError) and error.response is not None):
+        return error.response.status_code
+
+    return None
+
+
+def _backend_down(qps_api, error):
+    #
+    # True if error means that backend is unavailable (not that request was wrong)
+    #
+    import requests
+
+    # RetryError: retries exhausted
+    if(isinstance(error, (QCIRCUITOPENERROR, requests.exceptions.RetryError))):
+        return True
+
+    status_code = _http_status(error)
+    if(status_code is not None):
+        return qps_api.retry_policy.transient_status(status_code)
+
+    return qps_api.retry_policy.transient_error(error)
+
+
+def _can_fail_over(qps_api, error):
+    # job creation failed and job certainly wasn't created, so problem can be submitted to another backend without creating a duplicate
+    return isinstance(error, QCIRCUITOPENERROR) or not qps_api.retry_policy.ambiguous(error)
+
+
+def _remember(items, key, value, max_items):
+    items.pop(key, None)
+    items[key] = value
+
+    if(len(items) > max_items):
+        items.pop(next(iter(items)))
+
+    return
+
+
+class QPOOLGENAPI(QGENAPI):
+    #
+    # synth API of QPSPOOL: solve() creates the job on a backend chosen by the pool, calls with job ID go to the backend which owns the job.
+    # Problem builders (transpile(), state_preparation(), ...), solve_many(), wait_jobs(), as_completed() and solve_stream() are inherited.
+    #
+    def solve(self, problem, settings={}, start_job=True, use_cache=True):
+        _apply_settings(problem, settings)
+
+        problem_key = _problem_key(problem) if use_cache else None
+
+        # identical concurrent calls share one job (and start it once)
+        single_flight = self.qps_api.single_flight
+        if(problem_key is not None and single_flight is not None):
+            return single_flight.do(("solve", problem_key, start_job), lambda: self._solve(problem, start_job, use_cache, problem_key))
+
+        return self._solve(problem, start_job, use_cache, problem_key)
+
+
+    def _solve(self, problem, start_job, use_cache, problem_key):
+        #
+        # Job is created (without starting) on a backend chosen by the pool, failing over to another backend only if creation failed
+        # and job certainly wasn't created. Once created, the job stays on its backend: errors of starting it are raised.
+        #
+        pool = self.qps_api
+
+        tried = set()
+        error = None
+        while True:
+            index = pool._choose(problem_key, start_job, tried)
+            if(index is None):
+                if(error is not None):
+                    raise error
+                raise Exception("All QPS backends are down.")
+
+            backend = pool.backends[index]
+
+            # finished job of the same problem (backend's solve() doesn't look into its cache for jobs which are not started)
+            job_cache = backend.job_cache
+            cached_job = job_cache.get(_job_cache_key(backend, problem_key)) if start_job and problem_key is not None and job_cache is not None else None
+            if(cached_job is not None):
+                pool._release(index, start_job)
+                pool._own(cached_job["_id"], index, problem_key)
+                return cached_job["_id"]
+
+            try:
+                job_id = backend.synth.solve(problem, {}, False, use_cache)
+            except Exception as e:
+                pool._release(index, start_job)
+                if(not pool._failed(index, e) or not _can_fail_over(backend, e)):
+                    raise
+
+                _get_logger().warning(f"Job creation on {backend.api_url} failed with {e.__class__.__name__}. Failing over to another backend.")
+                tried.add(index)
+                error = e
+                continue
+
+            pool._own(job_id, index, problem_key)
+
+            if(start_job):
+                try:
+                    self._start_created(backend, job_id, problem_key)
+                except Exception as e:
+                    pool._release(index, start_job)
+                    pool._failed(index, e)
+                    raise
+
+            return job_id
+
+
+    def _start_created(self, backend, job_id, problem_key):
+        # finished job will be cached for the problem
+        if(problem_key is not None and backend.job_cache is not None):
+            backend.job_cache.put(_job_alias_key(job_id), _job_cache_key(backend, problem_key))
+
+        # job returned by backend's solve() can be a journaled or reconciled job which is already started
+        if(_known_status(backend, job_id) in (None, "draft")):
+            backend.synth.start_job(job_id)
+
+        return
+
+
+    def list_jobs(self, status_filter=None):
+        # jobs of all available backends
+        return { "list": self.qps_api._merged(lambda backend: backend.synth.list_jobs(status_filter), "list") }
+
+
+    def stop_all_jobs(self, status_filter=None):
+        return { "stopped": self.qps_api._merged(lambda backend: backend.synth.stop_all_jobs(status_filter), "stopped") }
+
+
+    def job_status(self, job_id):
+        return self.qps_api._backend(job_id).synth.job_status(job_id)
+
+
+    def stop_job(self, job_id):
+        return self.qps_api._backend(job_id).synth.stop_job(job_id)
+
+
+    def start_job(self, job_id):
+        pool = self.qps_api
+        index = pool._owner(job_id)
+
+        start_result = pool.backends[index].synth.start_job(job_id)
+        pool._dispatched(index)
+
+        return start_result
+
+
+    def reset_job(self, job_id):
+        return self.qps_api._backend(job_id).synth.reset_job(job_id)
+
+
+    def get_job(self, job_id, wait=True, timeout=None):
+        return self.qps_api._backend(job_id).synth.get_job(job_id, wait, timeout)
+
+
+    def iter_circuits(self, job, fields=None, wait=True, timeout=None):
+        if(isinstance(job, dict)):
+            return super().iter_circuits(job, fields, wait, timeout)
+
+        return self.qps_api._backend(job).synth.iter_circuits(job, fields, wait, timeout)
+
+
+    def _finished_job_ids(self, job_ids):
+        # one job/list request per backend which owns some of the jobs
+        pool = self.qps_api
+
+        groups = {}
+        for job_id in job_ids:
+            groups.setdefault(pool._owner(job_id), []).append(job_id)
+
+        finished = set()
+        for index, group in groups.items():
+            finished |= pool.backends[index].synth._finished_job_ids(group)
+
+        return finished
+
+
+class QPSPOOL:
+    #
+    # Spreads synth jobs across multiple QPS backends (api_url / api_token pairs). Each backend is a QPSAPI object with its own
+    # connection pool, retry policy, circuit breaker and caches. pool.synth has the same methods as QPSAPI.synth:
+    #   - new jobs go to the backend with the shortest queue (queued + running jobs, from job/list, per weight) or by weighted round robin
+    #   - the same problem goes to the backend which solved it before (its job cache, journal and pending creations)
+    #   - calls with job ID go to the backend which created (or listed) the job; unknown job IDs are looked up on all backends
+    #   - backend which fails with connection error or transient status is skipped for health_check_interval seconds, then probed again.
+    #     Job creation fails over to another backend if the failed backend certainly didn't create the job.
+    #
+    def __init__(self, accounts, weights=None, balancing="least_queued", queue_refresh_interval=2.0, health_check_interval=10.0):
+        if(balancing not in ("least_queued", "weighted")):
+            raise Exception("Unknown balancing \"" + str(balancing) + "\". Expected \"least_queued\" or \"weighted\".")
+
+        # accounts: QPSAPI objects (also package-level QPS), { "api_token": ..., "api_url": ... } dicts or (api_token, api_url) tuples
+        self.backends = []
+        for account in accounts:
+            # package-level QPS is a proxy of QPSAPI created on first use
+            get_qps_api = getattr(type(account), "_get_qps_api", None)
+            if(get_qps_api is not None):
+                account = get_qps_api(account)
+
+            if(isinstance(account, QPSAPI)):
+                backend = account
+            else:
+                backend = QPSAPI()
+                if(isinstance(account, dict)):
+                    backend.use_account(account["api_token"], account.get("api_url"))
+                else:
+                    backend.use_account(*account)
+            self.backends.append(backend)
+
+        if(len(self.backends) == 0):
+            raise Exception("At least one account is required.")
+
+        # relative capacity of backends (e.g. 2 for a backend twice as fast). Default: 1 each.
+        self.weights = list(weights) if weights is not None else [1] * len(self.backends)
+        if(len(self.weights) != len(self.backends) or min(self.weights) <= 0):
+            raise Exception("Expected one positive weight per account.")
+
+        self.balancing = balancing
+
+        # least_queued: seconds for which queue depth of a backend is reused. Jobs dispatched meanwhile are counted locally.
+        self.queue_refresh_interval = queue_refresh_interval
+
+        # seconds for which failed backend is skipped before it is probed (with job/list) again
+        self.health_check_interval = health_check_interval
+
+        # used by inherited batch methods (solve_many(), wait_jobs(), as_completed(), solve_stream())
+        self.batch_max_workers = 8
+        self.poll_strategy = QPOLLSTRATEGY()
+
+        # identical concurrent synth.solve() calls share one job. Set to None to disable.
+        self.single_flight = QSINGLEFLIGHT()
+
+        # caches and journals are per backend
+        self.job_cache = None
+        self.job_journal = None
+
+        self._lock = threading.Lock()
+        self._states = [{ "healthy": True, "down_until": 0.0, "error": None, "depth": 0, "dispatched": 0, "refreshed": None, "refresh_lock": threading.Lock() } for backend in self.backends]
+
+        # weighted round robin counters, next backend on ties
+        self._current = [0] * len(self.backends)
+        self._next = 0
+
+        # job_id -> backend index, problem_key -> backend index
+        self._owners = {}
+        self._affinities = {}
+
+        self.synth = QPOOLGENAPI(self)
+
+        return
+
+
+    def close(self):
+        for backend in self.backends:
+            backend.close()
+
+        return
+
+
+    def status(self):
+        # state of backends as last seen (without requests)
+        with self._lock:
+            return [{
+                "api_url": backend.api_url,
+                "weight": weight,
+                "healthy": state["healthy"],
+                "queue_depth": state["depth"],
+                "dispatched": state["dispatched"],
+                "error": state["error"]
+            } for backend, weight, state in zip(self.backends, self.weights, self._states)]
+
+
+    def check_health(self):
+        # probes all backends now (also those which are down) and returns status()
+        for index in range(len(self.backends)):
+            self._refresh(index, True)
+
+        return self.status()
+
+
+    #
+    # Backend state
+    #
+
+    def _refresh(self, index, force=False):
+        #
+        # Updates queue depth of backend if stale (or probes backend which is down and due). Returns True if backend is healthy.
+        #
+        state = self._states[index]
+        backend = self.backends[index]
+
+        with state["refresh_lock"]:
+            if(not force):
+                now = time.monotonic()
+                if(not state["healthy"]):
+                    if(now < state["down_until"]):
+                        return False
+                elif(state["refreshed"] is not None and (self.balancing != "least_queued" or now - state["refreshed"] < self.queue_refresh_interval)):
+                    return True
+
+            try:
+                depth = sum(len(backend.synth.list_jobs(status).get("list", [])) for status in _QUEUE_STATUSES)
+            except Exception as e:
+                self._failed(index, e, True)
+                return False
+
+            with self._lock:
+                if(not state["healthy"]):
+                    _get_logger().warning(f"QPS backend {backend.api_url} is up again.")
+                state["healthy"] = True
+                state["error"] = None
+                state["depth"] = depth
+                state["dispatched"] = 0
+                state["refreshed"] = time.monotonic()
+
+        return True
+
+
+    def _failed(self, index, error, any_error=False):
+        #
+        # Marks backend down if error means it is unavailable (any_error: for any error). Returns True if marked.
+        #
+        backend = self.backends[index]
+        if(not any_error and not _backend_down(backend, error)):
+            return False
+
+        state = self._states[index]
+        with self._lock:
+            was_healthy = state["healthy"]
+            state["healthy"] = False
+            state["down_until"] = time.monotonic() + self.health_check_interval
+            state["error"] = f"{error.__class__.__name__}: {error}"
+
+        if(was_healthy):
+            _get_logger().error(f"QPS backend {backend.api_url} is down ({error.__class__.__name__}). Skipping it for {self.health_check_interval} seconds.")
+
+        return True
+
+
+    def _choose(self, problem_key, start_job, exclude):
+        #
+        # Index of backend for the next job, or None if no backend (except excluded ones) is available
+        #
+        candidates = [index for index in range(len(self.backends)) if index not in exclude and self._refresh(index)]
+        if(len(candidates) == 0):
+            return None
+
+        with self._lock:
+            index = self._affinities.get(problem_key) if problem_key is not None else None
+
+            if(index not in candidates):
+                if(self.balancing == "weighted"):
+                    # smooth weighted round robin
+                    total = sum(self.weights[i] for i in candidates)
+                    for i in candidates:
+                        self._current[i] += self.weights[i]
+                    index = max(candidates, key=lambda i: self._current[i])
+                    self._current[index] -= total
+                else:
+                    count = len(self.backends)
+                    index = min(candidates, key=lambda i: ((self._states[i]["depth"] + self._states[i]["dispatched"]) / self.weights[i], (i - self._next) % count))
+                    self._next = (index + 1) % count
+
+            if(start_job):
+                self._states[index]["dispatched"] += 1
+
+        return index
+
+
+    def _release(self, index, start_job):
+        # job reserved by _choose() wasn't started
+        if(start_job):
+            with self._lock:
+                state = self._states[index]
+                state["dispatched"] = max(0, state["dispatched"] - 1)
+
+        return
+
+
+    def _dispatched(self, index):
+        with self._lock:
+            self._states[index]["dispatched"] += 1
+
+        return
+
+
+    #
+    # Job ownership
+    #
+
+    def _own(self, job_id, index, problem_key=None):
+        with self._lock:
+            _remember(self._owners, job_id, index, _MAX_OWNERS)
+            if(problem_key is not None):
+                _remember(self._affinities, problem_key, index, _MAX_AFFINITIES)
+
+        return
+
+
+    def _owner(self, job_id):
+        #
+        # Index of backend which owns the job. Unknown jobs are looked up in backends' caches and journals, then with job/status.
+        #
+        with self._lock:
+            index = self._owners.get(job_id)
+        if(index is not None):
+            return index
+
+        for index, backend in enumerate(self.backends):
+            if(_stored_job(backend, job_id)[1] is not None):
+                self._own(job_id, index)
+                return index
+
+        error = None
+        for index, backend in enumerate(self.backends):
+            try:
+                backend.synth.job_status(job_id)
+            except Exception as e:
+                status_code = _http_status(e)
+                if(status_code is None or status_code >= 500):
+                    self._failed(index, e)
+                    error = e
+                continue
+
+            self._own(job_id, index)
+            return index
+
+        if(error is not None):
+            raise error
+
+        raise Exception(f"Job {job_id} not found on any QPS backend.")
+
+
+    def _backend(self, job_id):
+        return self.backends[self._owner(job_id)]
+
+
+    def _merged(self, request, key):
+        #
+        # Concatenated request(backend)[key] of all available backends. Raises if no backend answered.
+        #
+        items = []
+        answered = 0
+        error = None
+        for index, backend in enumerate(self.backends):
+            if(not self._refresh(index)):
+                continue
+
+            try:
+                result = request(backend)
+            except Exception as e:
+                if(not self._failed(index, e)):
+                    raise
+                error = e
+                continue
+
+            answered += 1
+            for item in result.get(key, []):
+                if(item.get("_id") is not None):
+                    self._own(item["_id"], index)
+                items.append(item)
+
+        if(answered == 0):
+            if(error is not None):
+                raise error
+            raise Exception("All QPS backends are down.")
+
+        return items
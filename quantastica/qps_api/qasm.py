@@ -0,0 +1,370 @@
+import re
+
+
+# statement: gate definition with body in braces, or anything up to ";"
+_STATEMENT_RE = re.compile(r"\s*((?:gate|opaque)\b[^{;]*(?:\{[^}]*\}|;)|[^;]*;)", re.S)
+_COMMENT_RE = re.compile(r"//[^\n]*")
+_REGISTER_RE = re.compile(r"(qreg|creg)\s+([A-Za-z_][A-Za-z0-9_]*)\s*\[\s*(\d+)\s*\]$")
+_CONDITION_RE = re.compile(r"if\s*\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*==\s*(\d+)\s*\)\s*(.*)$", re.S)
+_GATE_RE = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)\s*(?:\((.*)\))?\s*(.*)$", re.S)
+_ARG_RE = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)\s*(?:\[\s*(\d+)\s*\])?$")
+
+# statements which are not gate applications
+_KEYWORDS = {"OPENQASM", "include", "qreg", "creg", "if", "measure", "gate", "opaque"}
+
+
+def _split_params(text):
+    #
+    # Split on top-level commas only (params can contain nested parentheses, e.g. "cos(pi/2)")
+    #
+    params = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(text):
+        if(char == "("):
+            depth += 1
+        elif(char == ")"):
+            depth -= 1
+        elif(char == "," and depth == 0):
+            params.append(text[start:index].strip())
+            start = index + 1
+
+    last = text[start:].strip()
+    if(last != "" or len(params) > 0):
+        params.append(last)
+
+    return params
+
+
+class QGATE:
+    __slots__ = ("name", "params", "qubits", "clbits", "condition")
+
+    def __init__(self, name, params=(), qubits=(), clbits=(), condition=None):
+        # params are kept as source text (e.g. "pi/2") so circuit is serialized back without loss
+        self.name = name
+        self.params = tuple(params)
+
+        # global qubit / classical bit indexes (registers are flattened in order of declaration)
+        self.qubits = tuple(qubits)
+        self.clbits = tuple(clbits)
+
+        # (creg name, value) for "if(creg==value) ..." or None
+        self.condition = condition
+
+        return
+
+
+    def __repr__(self):
+        return "QGATE(" + repr(self.name) + ", " + repr(self.params) + ", " + repr(self.qubits) + ", " + repr(self.clbits) + ", " + repr(self.condition) + ")"
+
+
+    def __eq__(self, other):
+        return isinstance(other, QGATE) and self.name == other.name and self.params == other.params and self.qubits == other.qubits and self.clbits == other.clbits and self.condition == other.condition
+
+
+class QCIRCUIT:
+    def __init__(self):
+        # [(name, size)] in order of declaration
+        self.qregs = []
+        self.cregs = []
+
+        self.includes = []
+
+        # custom "gate"/"opaque" definitions, kept as source text
+        self.definitions = []
+
+        self.gates = []
+
+        self._qreg_offsets = {}
+        self._creg_offsets = {}
+        self.num_qubits = 0
+        self.num_clbits = 0
+
+        return
+
+
+    def add_qreg(self, name, size):
+        if(name in self._qreg_offsets or name in self._creg_offsets):
+            raise Exception("Register \"" + name + "\" is already declared.")
+
+        self._qreg_offsets[name] = (self.num_qubits, size)
+        self.qregs.append((name, size))
+        self.num_qubits += size
+
+        return
+
+
+    def add_creg(self, name, size):
+        if(name in self._qreg_offsets or name in self._creg_offsets):
+            raise Exception("Register \"" + name + "\" is already declared.")
+
+        self._creg_offsets[name] = (self.num_clbits, size)
+        self.cregs.append((name, size))
+        self.num_clbits += size
+
+        return
+
+
+    def _bits(self, arg, offsets, line_text):
+        match = _ARG_RE.match(arg.strip())
+        if(match is None):
+            raise Exception("Invalid argument \"" + arg.strip() + "\" in: " + line_text)
+
+        name, index = match.groups()
+        if(name not in offsets):
+            raise Exception("Unknown register \"" + name + "\" in: " + line_text)
+
+        offset, size = offsets[name]
+        if(index is None):
+            # whole register
+            return list(range(offset, offset + size))
+
+        index = int(index)
+        if(index >= size):
+            raise Exception("Index " + str(index) + " out of range of register \"" + name + "\" in: " + line_text)
+
+        return [offset + index]
+
+
+    def _expand(self, name, args, line_text):
+        #
+        # Returns list of qubit tuples, one per gate record.
+        # Registers used as arguments are broadcast: "h q;" applies h to every qubit of q
+        #
+        arg_bits = [self._bits(arg, self._qreg_offsets, line_text) for arg in args]
+
+        if(name == "barrier"):
+            # barrier is a single record over all listed qubits
+            return [tuple(qubit for bits in arg_bits for qubit in bits)]
+
+        width = max(len(bits) for bits in arg_bits) if len(arg_bits) > 0 else 1
+        for bits in arg_bits:
+            if(len(bits) != 1 and len(bits) != width):
+                raise Exception("Register size mismatch in: " + line_text)
+
+        return [tuple(bits[0] if len(bits) == 1 else bits[i] for bits in arg_bits) for i in range(width)]
+
+
+    def _qubit_arg(self, qubit):
+        for name, (offset, size) in self._qreg_offsets.items():
+            if(offset <= qubit < offset + size):
+                return name + "[" + str(qubit - offset) + "]"
+
+        raise Exception("Qubit " + str(qubit) + " is not in any register.")
+
+
+    def _clbit_arg(self, clbit):
+        for name, (offset, size) in self._creg_offsets.items():
+            if(offset <= clbit < offset + size):
+                return name + "[" + str(clbit - offset) + "]"
+
+        raise Exception("Classical bit " + str(clbit) + " is not in any register.")
+
+
+    def stats(self):
+        #
+        # Gate counts, depth, per-qubit usage and two-qubit gate statistics in a single pass over gates
+        #
+        gate_counts = {}
+        qubit_gate_counts = [0] * self.num_qubits
+        two_qubit_pairs = {}
+        two_qubit_gates = 0
+        multi_qubit_gates = 0
+
+        qubit_depth = [0] * self.num_qubits
+        clbit_depth = [0] * self.num_clbits
+        creg_offsets = self._creg_offsets
+
+        for gate in self.gates:
+            name = gate.name
+            gate_counts[name] = gate_counts.get(name, 0) + 1
+
+            qubits = gate.qubits
+
+            if(name == "barrier"):
+                # barrier aligns qubits but doesn't add a layer
+                layer = max((qubit_depth[qubit] for qubit in qubits), default=0)
+                for qubit in qubits:
+                    qubit_depth[qubit] = layer
+                continue
+
+            for qubit in qubits:
+                qubit_gate_counts[qubit] += 1
+
+            if(len(qubits) == 2):
+                two_qubit_gates += 1
+                pair = (qubits[0], qubits[1]) if qubits[0] < qubits[1] else (qubits[1], qubits[0])
+                two_qubit_pairs[pair] = two_qubit_pairs.get(pair, 0) + 1
+            elif(len(qubits) > 2):
+                multi_qubit_gates += 1
+
+            clbits = gate.clbits
+            if(gate.condition is not None):
+                offset, size = creg_offsets[gate.condition[0]]
+                clbits = clbits + tuple(range(offset, offset + size))
+
+            layer = 0
+            for qubit in qubits:
+                if(qubit_depth[qubit] > layer):
+                    layer = qubit_depth[qubit]
+            for clbit in clbits:
+                if(clbit_depth[clbit] > layer):
+                    layer = clbit_depth[clbit]
+
+            layer += 1
+            for qubit in qubits:
+                qubit_depth[qubit] = layer
+            for clbit in clbits:
+                clbit_depth[clbit] = layer
+
+        return {
+            "num_qubits": self.num_qubits,
+            "num_clbits": self.num_clbits,
+            "num_gates": len(self.gates),
+            "gate_counts": gate_counts,
+            "depth": max(qubit_depth + clbit_depth, default=0),
+            "qubit_gate_counts": qubit_gate_counts,
+            "used_qubits": [qubit for qubit, count in enumerate(qubit_gate_counts) if count > 0],
+            "two_qubit_gates": two_qubit_gates,
+            "two_qubit_pairs": two_qubit_pairs,
+            "multi_qubit_gates": multi_qubit_gates
+        }
+
+
+    def to_qasm(self):
+        lines = ["OPENQASM 2.0;"]
+
+        for include in self.includes:
+            lines.append("include \"" + include + "\";")
+
+        for name, size in self.qregs:
+            lines.append("qreg " + name + "[" + str(size) + "];")
+
+        for name, size in self.cregs:
+            lines.append("creg " + name + "[" + str(size) + "];")
+
+        lines.extend(self.definitions)
+
+        qubit_args = [self._qubit_arg(qubit) for qubit in range(self.num_qubits)]
+        clbit_args = [self._clbit_arg(clbit) for clbit in range(self.num_clbits)]
+
+        for gate in self.gates:
+            prefix = ""
+            if(gate.condition is not None):
+                prefix = "if(" + gate.condition[0] + "==" + str(gate.condition[1]) + ") "
+
+            if(gate.name == "measure"):
+                lines.append(prefix + "measure " + qubit_args[gate.qubits[0]] + " -> " + clbit_args[gate.clbits[0]] + ";")
+                continue
+
+            text = prefix + gate.name
+            if(len(gate.params) > 0):
+                text += " (" + ", ".join(gate.params) + ")"
+            if(len(gate.qubits) > 0):
+                text += " " + ", ".join(qubit_args[qubit] for qubit in gate.qubits)
+
+            lines.append(text + ";")
+
+        return "\n".join(lines) + "\n"
+
+
+def parse_qasm(qasm):
+    #
+    # Parses OpenQASM 2.0 (including extended instruction set used in "qasmExt") into QCIRCUIT.
+    # Gate names are not checked against qelib1.inc, so any QPS gate (e.g. gpi2, ms) is accepted.
+    #
+    circuit = QCIRCUIT()
+    gates = circuit.gates
+
+    # large circuits repeat the same params and arguments many times, so they are parsed once
+    params_cache = {}
+    qubits_cache = {}
+
+    text = _COMMENT_RE.sub("", qasm)
+
+    end = 0
+    for match in _STATEMENT_RE.finditer(text):
+        end = match.end()
+        statement = match.group(1).strip()
+        body = statement[:-1].strip()
+        if(body == ""):
+            continue
+
+        gate = _GATE_RE.match(body)
+        if(gate is None):
+            raise Exception("Cannot parse: " + statement)
+
+        name, params, args = gate.groups()
+
+        condition = None
+        if(name == "if"):
+            conditional = _CONDITION_RE.match(body)
+            if(conditional is None):
+                raise Exception("Cannot parse: " + statement)
+
+            creg_name, value, body = conditional.groups()
+            if(creg_name not in circuit._creg_offsets):
+                raise Exception("Unknown register \"" + creg_name + "\" in: " + statement)
+            condition = (creg_name, int(value))
+
+            gate = _GATE_RE.match(body)
+            if(gate is None):
+                raise Exception("Cannot parse: " + statement)
+            name, params, args = gate.groups()
+
+        if(name not in _KEYWORDS):
+            gate_params = params_cache.get(params)
+            if(gate_params is None):
+                gate_params = tuple(_split_params(params)) if params is not None else ()
+                params_cache[params] = gate_params
+
+            qubits_key = (name == "barrier", args)
+            gate_qubits = qubits_cache.get(qubits_key)
+            if(gate_qubits is None):
+                gate_qubits = circuit._expand(name, [arg for arg in args.split(",") if arg.strip() != ""], statement)
+                qubits_cache[qubits_key] = gate_qubits
+
+            for qubits in gate_qubits:
+                gates.append(QGATE(name, gate_params, qubits, (), condition))
+            continue
+
+        if(name == "measure"):
+            if("->" not in body):
+                raise Exception("Cannot parse: " + statement)
+            source, destination = body[len("measure"):].split("->")
+            qubits = circuit._bits(source, circuit._qreg_offsets, statement)
+            clbits = circuit._bits(destination, circuit._creg_offsets, statement)
+            if(len(qubits) != len(clbits)):
+                raise Exception("Register size mismatch in: " + statement)
+            for qubit, clbit in zip(qubits, clbits):
+                gates.append(QGATE("measure", (), (qubit,), (clbit,), condition))
+            continue
+
+        if(condition is not None):
+            raise Exception("Cannot parse: " + statement)
+
+        if(name == "OPENQASM"):
+            continue
+
+        if(name == "include"):
+            circuit.includes.append(body[len("include"):].strip().strip("\""))
+            continue
+
+        if(name == "gate" or name == "opaque"):
+            circuit.definitions.append(" ".join(statement.split()))
+            continue
+
+        register = _REGISTER_RE.match(body)
+        if(register is None):
+            raise Exception("Cannot parse: " + statement)
+
+        kind, register_name, size = register.groups()
+        if(kind == "qreg"):
+            circuit.add_qreg(register_name, int(size))
+        else:
+            circuit.add_creg(register_name, int(size))
+
+    if(text[end:].strip() != ""):
+        raise Exception("Missing \";\" after: " + text[end:].strip())
+
+    return circuit
@@ -1,16 +1,648 @@
 import os
 import configparser
-import requests
+import random
+import threading
 import time
-import csv
 import json
-from io import StringIO
-from copy import deepcopy
+
+from .cache import QCACHE, cache_key
+from .encoding import encode_vectors, encode_matrix, basis_state_text
+from .truth_table import compile_truth_table
+from .qasm import QCIRCUIT
+from .converters import QLOCALCONVERTERS
+from .singleflight import QSINGLEFLIGHT
+from .metrics import QHOOKS, QMETRICS, _get_logger
+from .retry import QRETRYPOLICY, QCIRCUITBREAKER
+from .json_stream import iter_json_items
 
 
 def _urljoin(*args):
     return "/".join(map(lambda x: str(x).rstrip("/"), args))
 
+
+def _apply_settings(problem, settings):
+    if("settings" not in problem):
+        problem["settings"] = {}
+
+    if not settings:
+        settings = {}
+
+    for key in settings.keys():
+        if(key == "instruction_set"):
+            problem["settings"]["allowed_gates"] = ",".join(settings["instruction_set"])
+        else:
+            problem["settings"][key] = settings[key]
+
+    return problem
+
+
+def _job_finished(status_result):
+    return status_result["status"] in ("done", "draft", "error")
+
+
+# jobs which are not finished
+_ACTIVE_STATUSES = ("queued", "running")
+
+# Up to this many pending jobs are polled with one job/status request each. More jobs are polled with one (unfiltered)
+# job/list request, whose response grows with the number of jobs on the account, so it pays off only for several jobs.
+_STATUS_POLL_MAX_JOBS = 2
+
+
+def _active_job_ids(list_result):
+    return set(job["_id"] for job in list_result.get("list", []) if job.get("status") in _ACTIVE_STATUSES)
+
+
+def _normalize_job(job):
+    if("output" not in job):
+        job["output"] = {}
+
+    if("circuits" not in job["output"]):
+        job["output"]["circuits"] = []
+
+    return job
+
+
+def _problem_key(problem):
+    return cache_key(problem.get("type"), problem.get("source"), problem.get("settings"))
+
+
+def _shared_request_key(url, api_token, data):
+    return (url, api_token, json.dumps(data, sort_keys=True))
+
+
+def _shared_post(qps_api, url, headers, data):
+    #
+    # Identical concurrent requests (e.g. status of the same job from many threads) share one HTTP response.
+    # Each caller parses response.json() itself, so callers never share result objects.
+    #
+    single_flight = qps_api.single_flight
+    if(single_flight is None):
+        return qps_api.http_post(url = url, headers = headers, json = data)
+
+    return single_flight.do(_shared_request_key(url, qps_api.api_token, data), lambda: qps_api.http_post(url = url, headers = headers, json = data))
+
+
+def _observe_jobs(qps_api, list_result):
+    for job in list_result.get("list", []):
+        qps_api._observe_job_state(job.get("_id"), job.get("status"))
+
+    return
+
+
+def _job_alias_key(job_id):
+    return cache_key("job", job_id)
+
+
+def _job_cache_key(qps_api, problem_key):
+    # per account: finished job of another server or token is not visible to this one
+    return cache_key("solved", qps_api.api_url, cache_key("token", qps_api.api_token), problem_key)
+
+
+def _cached_job(job_cache, job_id):
+    #
+    # Returns (problem_key, finished_job). Both are None if job was not submitted through the cache.
+    #
+    if(job_cache is None):
+        return None, None
+
+    problem_key = job_cache.get(_job_alias_key(job_id), count_stats=False)
+    if(problem_key is None):
+        return None, None
+
+    cached_job = job_cache.get(problem_key, count_stats=False)
+    if(cached_job is None or cached_job.get("_id") != job_id):
+        return problem_key, None
+
+    return problem_key, cached_job
+
+
+def _cache_job(job_cache, problem_key, job):
+    if(job_cache is not None and problem_key is not None and job.get("status") == "done"):
+        job_cache.put(problem_key, job)
+
+    return
+
+
+def _forget_job(job_cache, job_id):
+    #
+    # Drops finished job cached for job_id (job was reset, started or stopped since). Alias is kept, so the job is cached again when it finishes.
+    #
+    problem_key, cached_job = _cached_job(job_cache, job_id)
+    if(cached_job is not None):
+        job_cache.delete(problem_key)
+
+    return
+
+
+def _known_status(qps_api, job_id):
+    # last status of a job seen by this client (or journaled), None if unknown
+    with qps_api._job_states_lock:
+        status = qps_api._job_states.get(job_id)
+
+    if(status is None and qps_api.job_journal is not None):
+        entry = qps_api.job_journal.job(job_id)
+        status = entry["status"] if entry is not None else None
+
+    return status
+
+
+def _stopped_status(qps_api, job_id):
+    # status of a job after job/stop: queued and running jobs go back to draft, other jobs don't change (None)
+    return "draft" if _known_status(qps_api, job_id) in ("queued", "running") else None
+
+
+def _stored_job(qps_api, job_id):
+    #
+    # The same as _cached_job(), also looking up finished jobs stored in the job journal
+    #
+    problem_key, stored_job = _cached_job(qps_api.job_cache, job_id)
+
+    if(stored_job is None and qps_api.job_journal is not None):
+        stored_job = qps_api.job_journal.result(job_id)
+
+    return problem_key, stored_job
+
+
+def _journal_result(qps_api, job_id, job):
+    if(qps_api.job_journal is not None and job.get("status") in ("done", "error")):
+        qps_api.job_journal.record_result(job_id, job)
+
+    return
+
+
+def _journal_resume(qps_api, problem_key):
+    #
+    # Job journaled for the problem which can be re-attached to (not failed), or None
+    #
+    if(problem_key is None or qps_api.job_journal is None):
+        return None
+
+    return qps_api.job_journal.resumable(problem_key)
+
+
+def _journal_record(qps_api, problem_key, job_id, status):
+    if(problem_key is not None and qps_api.job_journal is not None):
+        qps_api.job_journal.record(problem_key, job_id, status)
+
+    return
+
+
+# at most this many candidate jobs are fetched to find the job created by an ambiguous request
+_RECONCILE_MAX_CANDIDATES = 8
+
+
+def _timestamp(text):
+    #
+    # Server time (e.g. "2021-02-06T23:39:29.108Z") to unix time. None if missing or invalid.
+    #
+    from datetime import datetime
+
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _pending_key(qps_api, problem_key, start_job):
+    # per account: the same problem solved on another server or with another token is a different job
+    return cache_key("pending", qps_api.api_url, cache_key("token", qps_api.api_token), problem_key, start_job)
+
+
+def _pending_begin(qps_api, problem, problem_key, start_job):
+    #
+    # Returns record of job creation: { key, started, resumed }. key (sent as Idempotency-Key header) is derived from problem hash and a nonce.
+    # With problem_key (use_cache=True) the record is persisted until the job is known: if previous solve() of the same problem
+    # ended with ambiguous failure (or the process died), its record is resumed and the job it may have created is looked up first.
+    #
+    pending_jobs = qps_api.pending_jobs
+    if(problem_key is not None and pending_jobs is not None):
+        record = pending_jobs.get(_pending_key(qps_api, problem_key, start_job), count_stats=False)
+        if(record is not None):
+            record["resumed"] = True
+            return record
+
+    record = {
+        "key": cache_key("idempotency", _problem_key(problem), os.urandom(16).hex())[:32],
+        "started": time.time(),
+        "resumed": False
+    }
+
+    if(problem_key is not None and pending_jobs is not None):
+        try:
+            pending_jobs.put(_pending_key(qps_api, problem_key, start_job), record)
+        except OSError as e:
+            _get_logger().warning(f"Cannot persist pending job record: {e}")
+
+    return record
+
+
+def _pending_end(qps_api, problem_key, start_job):
+    pending_jobs = qps_api.pending_jobs
+    if(problem_key is not None and pending_jobs is not None):
+        pending_jobs.delete(_pending_key(qps_api, problem_key, start_job))
+
+    return
+
+
+def _known_job_ids(qps_api):
+    # jobs this client has already seen (they can't be the result of a create request in progress)
+    with qps_api._job_states_lock:
+        return set(qps_api._job_states)
+
+
+def _reconcile_candidates(list_result, problem, record, known_job_ids):
+    #
+    # Draft jobs from list_jobs() which may have been created by the request with record's idempotency key: jobs carrying the key
+    # (servers which store Idempotency-Key return it), or jobs unknown to the client with the same name and type, created
+    # after the request started. Without createdAt a job can't be told from an earlier identical job, so only the key is trusted.
+    # Returns list of (job_id, key_matched), oldest first.
+    #
+    candidates = []
+    for job in list_result.get("list", []):
+        if(job.get("idempotency_key") == record["key"]):
+            return [(job["_id"], True)]
+
+        if(job["_id"] in known_job_ids):
+            continue
+
+        if(job.get("type") != problem.get("type") or (job.get("name") or "") != (problem.get("name") or "")):
+            continue
+
+        # server time has millisecond precision
+        created_at = _timestamp(job.get("createdAt"))
+        if(created_at is None or created_at < int(record["started"] * 1000) / 1000.0):
+            continue
+
+        candidates.append((created_at, len(candidates), job["_id"]))
+
+    candidates.sort()
+
+    return [(job_id, False) for created_at, index, job_id in candidates[:_RECONCILE_MAX_CANDIDATES]]
+
+
+def _same_problem(job, problem):
+    return job.get("type") == problem.get("type") and job.get("source") is not None and job.get("source") == problem.get("source")
+
+
+def _transpile_problem(input_qasm, method, method_options, job_name):
+    if(isinstance(input_qasm, QCIRCUIT)):
+        input_qasm = input_qasm.to_qasm()
+
+    problem = {
+        "type": "circuit",
+        "source": {
+            "circuit": {
+                "qasm": input_qasm,
+                "method": method
+            }
+        },
+        "settings": {
+            "allowed_gates": "u3,cx",
+            "max_diff": 1e-3,
+            "diff_method": "distance",
+            "single_solution": True,
+            "pre_processing": "experimental1"
+        }
+    }
+
+    if(job_name is not None):
+        problem["name"] = job_name
+
+    if not method_options:
+        method_options = {}
+
+    for key in method_options.keys():
+        if(key != "qasm" and key != "method"):
+            problem["source"]["circuit"][key] = method_options[key]
+
+    return problem
+
+
+def _vectors_problem(vector_pairs, endianness, job_name):
+    text1, text2 = encode_vectors(vector_pairs)
+
+    problem = {
+        "type": "vectors",
+        "source": {
+            "vectors": {
+                "text1": text1,
+                "text2": text2,
+                "endianness1": endianness,
+                "endianness2": endianness
+            }
+        },
+        "settings": {
+            "allowed_gates": "u3,cx",
+            "max_diff": 1e-3,
+            "diff_method": "distance",
+            "single_solution": True,
+            "pre_processing": ""
+        }
+    }
+
+    if(job_name is not None):
+        problem["name"] = job_name
+
+    return problem
+
+
+def _state_preparation_pairs(final_vector):
+    return [ [basis_state_text(len(final_vector)), final_vector] ]
+
+
+def _unitary_problem(unitary, endianness, job_name):
+    text = encode_matrix(unitary)
+
+    problem = {
+        "type": "unitary",
+        "source": {
+            "unitary": {
+                "text": text,
+                "endianness": endianness
+            }
+        },
+        "settings": {
+            "allowed_gates": "u3,cx",
+            "max_diff": 1e-3,
+            "diff_method": "distance",
+            "single_solution": True,
+            "pre_processing": ""
+        }
+    }
+
+    if(job_name is not None):
+        problem["name"] = job_name
+
+    return problem
+
+
+def _truth_table_problem(truth_table_csv, column_defs, csv_delimiter, additional_qubits, job_name):
+    # parse and validate locally, send only used columns and unique rows
+    table = compile_truth_table(truth_table_csv, column_defs, csv_delimiter)
+
+    text = table.to_csv()
+    coldefs = table.payload_coldefs()
+
+    # create problem
+    problem = {
+        "type": "truth",
+        "source": {
+            "truth": {
+                "text": text,
+                "coldefs": coldefs,
+                "numNonOverlapingQubits": additional_qubits
+            }
+        },
+        "settings": {
+            "allowed_gates": "x,cx,ccx,swap",
+            "max_diff": 1e-3,
+            "diff_method": "distance",
+            "single_solution": True,
+            "pre_processing": ""
+        }
+    }
+
+    if(job_name is not None):
+        problem["name"] = job_name
+
+    return problem
+
+
+def _convert_input(input_data):
+    if isinstance(input_data, dict):
+        return json.dumps(input_data)
+
+    if isinstance(input_data, str):
+        return input_data
+
+    return str(input_data)
+
+
+def _convert_data(input_data, source_format, dest_format):
+    convert_data = {}
+    convert_data["input"] = _convert_input(input_data)
+    convert_data["source"] = str(source_format)
+    convert_data["dest"] = str(dest_format)
+
+    return convert_data
+
+
+def _local_convert(local_converters, input_data, source_format, dest_format, trace):
+    #
+    # Returns (True, output) if conversion was done in-process, (False, None) if it must be done by the server
+    #
+    converter = local_converters.get(source_format, dest_format) if local_converters is not None else None
+    if(converter is None):
+        return False, None
+
+    try:
+        output = converter(input_data)
+    except Exception as e:
+        # local converter doesn't support or doesn't accept input: server decides
+        local_converters.count("fallbacks")
+        if(trace is not None):
+            trace["local_error"] = e
+        return False, None
+
+    local_converters.count("local")
+
+    return True, output
+
+
+def _trace_path(trace, path, started):
+    if(trace is not None):
+        trace["path"] = path
+        trace["elapsed"] = time.perf_counter() - started
+
+    return
+
+
+def _random_circuit_data(num_qubits, output_format, options):
+    random_circuit_data = {}
+
+    random_circuit_data["num_qubits"] = int(num_qubits)
+    random_circuit_data["format"] = str(output_format)
+
+    if options:
+        for key in ("num_gates", "instruction_set", "mid_circuit_measurement", "mid_circuit_reset", "classic_control", "seed"):
+            if key in options:
+                random_circuit_data[key] = options[key]
+
+    return random_circuit_data
+
+
+class QPSTimeoutError(TimeoutError):
+    def __init__(self, message, polls=0, elapsed=0.0):
+        super().__init__(message)
+
+        self.polls = polls
+        self.elapsed = elapsed
+
+        return
+
+
+class QPOLLER:
+    def __init__(self, strategy, timeout=None):
+        self.strategy = strategy
+        self.timeout = timeout
+
+        self.polls = 0
+        self.wait_seconds = 0.0
+        self.started = time.monotonic()
+        self.deadline = None if timeout is None else self.started + timeout
+
+        return
+
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+
+    def next_delay(self, message="Job not finished"):
+        self.polls += 1
+
+        delay = self.strategy.interval(self.polls)
+
+        if(self.deadline is not None):
+            remaining = self.deadline - time.monotonic()
+            if(remaining <= 0):
+                self.strategy._record(self, timed_out=True)
+                raise QPSTimeoutError(f"{message} after {self.timeout} seconds ({self.polls} polls).", self.polls, self.elapsed())
+            delay = min(delay, remaining)
+
+        self.wait_seconds += delay
+
+        return delay
+
+
+    def sleep(self, message="Job not finished"):
+        time.sleep(self.next_delay(message))
+
+        return
+
+
+    def finish(self):
+        self.polls += 1
+        self.strategy._record(self, timed_out=False)
+
+        return
+
+
+class QPOLLSTRATEGY:
+    def __init__(self, initial_interval=0.25, max_interval=5.0, multiplier=1.5, jitter=0.1, timeout=None):
+        # First wait is initial_interval, each next one is multiplied by multiplier up to max_interval
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.multiplier = multiplier
+
+        # Relative random spread of each interval (0.1 means +/-10%)
+        self.jitter = jitter
+
+        # Default overall deadline in seconds for a single wait, None means wait forever
+        self.timeout = timeout
+
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+        return
+
+
+    def interval(self, poll_count):
+        interval = min(self.initial_interval * (self.multiplier ** (poll_count - 1)), self.max_interval)
+
+        if(self.jitter):
+            interval *= random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+        return max(interval, 0.0)
+
+
+    def start(self, timeout=None):
+        if(timeout is None):
+            timeout = self.timeout
+
+        return QPOLLER(self, timeout)
+
+
+    def _record(self, poller, timed_out):
+        with self._stats_lock:
+            self._stats["waits"] += 1
+            self._stats["polls"] += poller.polls
+            self._stats["wait_seconds"] += poller.elapsed()
+            if(timed_out):
+                self._stats["timeouts"] += 1
+
+        return
+
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = { "waits": 0, "polls": 0, "wait_seconds": 0.0, "timeouts": 0 }
+
+        return
+
+
+class QBATCHRESULT:
+    def __init__(self, size):
+        # results[i] is output of i-th item (None if it failed), errors[i] is exception raised by i-th item (None if it succeeded)
+        self.results = [None] * size
+        self.errors = [None] * size
+
+        return
+
+
+    def __len__(self):
+        return len(self.results)
+
+
+    def __getitem__(self, index):
+        return self.results[index]
+
+
+    def __iter__(self):
+        return iter(self.results)
+
+
+    def ok(self):
+        return all(error is None for error in self.errors)
+
+
+    def failed_indexes(self):
+        return [index for index, error in enumerate(self.errors) if error is not None]
+
+
+def _batch_map(function, items, max_workers, batch_result=None):
+    #
+    # Calls function(item) on a bounded worker pool and stores outputs and exceptions in QBATCHRESULT, in order of items.
+    # If batch_result from previous run is given, only its failed items are run again.
+    #
+    if(batch_result is None):
+        batch_result = QBATCHRESULT(len(items))
+        indexes = list(range(len(items)))
+    else:
+        indexes = batch_result.failed_indexes()
+
+    def run_item(index):
+        try:
+            return function(items[index]), None
+        except Exception as e:
+            return None, e
+
+    if(len(indexes) > 0):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(indexes)))) as executor:
+            for index, (output, error) in zip(indexes, executor.map(run_item, indexes)):
+                batch_result.results[index] = output
+                batch_result.errors[index] = error
+
+    return batch_result
+
+
 class QGENAPI:
     def __init__(self, qps_api):
         self.qps_api = qps_api
@@ -18,452 +650,779 @@ class QGENAPI:
         return
 
 
-    def solve(self, problem, settings={}, start_job=True):
-        if("settings" not in problem):
-            problem["settings"] = {}
+    def solve(self, problem, settings={}, start_job=True, use_cache=True):
+        _apply_settings(problem, settings)
+
+        problem_key = _problem_key(problem) if use_cache else None
+
+        #
+        # Identical concurrent calls share one job
+        #
+        single_flight = self.qps_api.single_flight
+        if(problem_key is not None and single_flight is not None):
+            return single_flight.do(("solve", self.qps_api.api_url, self.qps_api.api_token, problem_key, start_job), lambda: self._solve(problem, start_job, problem_key))
+
+        return self._solve(problem, start_job, problem_key)
+
+
+    def _solve(self, problem, start_job, problem_key):
+        #
+        # Return finished job from cache if the same problem was already solved
+        #
+        job_cache = self.qps_api.job_cache
+        cache_problem_key = None
+        if(problem_key is not None and job_cache is not None and start_job == True):
+            cache_problem_key = _job_cache_key(self.qps_api, problem_key)
+            cached_job = job_cache.get(cache_problem_key)
+            if(cached_job is not None):
+                return cached_job["_id"]
+
+        #
+        # Re-attach to job journaled for this problem (e.g. submitted by a run which crashed)
+        #
+        journaled = _journal_resume(self.qps_api, problem_key)
+        if(journaled is not None):
+            job_id = journaled["job_id"]
+            if(cache_problem_key is not None):
+                job_cache.put(_job_alias_key(job_id), cache_problem_key)
+            if(start_job == True and journaled["status"] == "draft"):
+                self.start_job(job_id)
+            return job_id
+
+        record = _pending_begin(self.qps_api, problem, problem_key, start_job)
+
+        try:
+            job = None
+            if(record["resumed"]):
+                # previous solve() of this problem ended with ambiguous failure: its job may exist
+                job = self._reconcile(problem, record)
+
+            if(job is None):
+                job = self._create(problem, record)
+        except Exception as e:
+            if(not self.qps_api.retry_policy.ambiguous(e)):
+                _pending_end(self.qps_api, problem_key, start_job)
+            raise
+
+        _pending_end(self.qps_api, problem_key, start_job)
+
+        job_id = job["_id"]
+
+        if(cache_problem_key is not None):
+            job_cache.put(_job_alias_key(job_id), cache_problem_key)
+
+        _journal_record(self.qps_api, problem_key, job_id, job.get("status", "draft"))
+
+        if(start_job == True and job.get("status", "draft") == "draft"):
+            #
+            # Start a job
+            #
+            self.start_job(job_id)
+
+        return job_id
+
+
+    def _create(self, problem, record):
+        #
+        # Create a job. If the request fails in a way which doesn't tell if the job was created (e.g. read timeout),
+        # look for it with list_jobs() before sending the request again, so one problem never creates two jobs.
+        #
+        headers = {"Authorization": "Bearer " + self.qps_api.api_token, "Idempotency-Key": record["key"] }
+
+        create_url = _urljoin(self.qps_api.api_url, "generator", "job", "create")
+
+        policy = self.qps_api.retry_policy
+
+        attempt = 0
+        while True:
+            try:
+                create_response = self.qps_api.http_post(url = create_url, headers = headers, json = problem)
+
+                create_response.raise_for_status()
+                return create_response.json()
+            except Exception as e:
+                if(not policy.ambiguous(e)):
+                    raise
+                error = e
+
+            job = self._reconcile(problem, record)
+            if(job is not None):
+                _get_logger().warning(f"Job creation failed with {error.__class__.__name__} but job {job['_id']} was created. Using it.")
+                return job
+
+            attempt += 1
+            if(attempt >= policy.max_attempts):
+                raise error
+
+            _get_logger().warning(f"Job creation failed with {error.__class__.__name__} and job was not created. Retrying.")
+            time.sleep(policy.delay(attempt - 1) or 0)
+
+
+    def _reconcile(self, problem, record):
+        #
+        # Returns job created by request with record's idempotency key, or None. Created jobs are drafts until started.
+        #
+        known_job_ids = _known_job_ids(self.qps_api)
+        list_result = self.list_jobs(status_filter="draft")
+
+        for job_id, key_matched in _reconcile_candidates(list_result, problem, record, known_job_ids):
+            job = self.get_job(job_id, wait=False)
+            if(key_matched or _same_problem(job, problem)):
+                return job
+
+        return None
+
+
+    def solve_many(self, problems, settings={}, start_job=True, max_in_flight=None, use_cache=True, previous_result=None):
+        #
+        # Submits problems concurrently. Returns QBATCHRESULT with job IDs in order of problems.
+        # Pass result of previous call as previous_result to resubmit only problems which failed.
+        #
+        if(max_in_flight is None):
+            max_in_flight = self.qps_api.batch_max_workers
+
+        return _batch_map(lambda problem: self.solve(problem, settings, start_job, use_cache), problems, max_in_flight, previous_result)
+
+
+    def start_many(self, job_ids, max_in_flight=None, previous_result=None):
+        if(max_in_flight is None):
+            max_in_flight = self.qps_api.batch_max_workers
+
+        return _batch_map(self.start_job, job_ids, max_in_flight, previous_result)
+
+
+    def list_jobs(self, status_filter=None):
+        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+
+        list_url = _urljoin(self.qps_api.api_url, "generator", "job", "list")
+        list_data = {}
+        if(status_filter is not None):
+            list_data["status"] = status_filter
+
+        list_response = self.qps_api.http_post(url = list_url, headers = headers, json = list_data)
+
+        list_response.raise_for_status()
+        list_result = list_response.json()
+
+        _observe_jobs(self.qps_api, list_result)
+
+        return list_result
+
+
+    def job_status(self, job_id):
+        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+
+        status_url = _urljoin(self.qps_api.api_url, "generator", "job", "status")
+        status_data = { "_id": job_id }
+
+        status_response = _shared_post(self.qps_api, status_url, headers, status_data)
+
+        status_response.raise_for_status()
+        status_result = status_response.json()
+
+        self.qps_api._observe_job_state(job_id, status_result.get("status"))
+
+        return status_result
+
+
+    def stop_job(self, job_id):
+        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+
+        stop_url = _urljoin(self.qps_api.api_url, "generator", "job", "stop")
+        stop_data = { "_id": job_id }
+
+        stop_response = self.qps_api.http_post(url = stop_url, headers = headers, json = stop_data)
+
+        stop_response.raise_for_status()
+        stop_result = stop_response.json()
+
+        self.qps_api._observe_job_state(job_id, _stopped_status(self.qps_api, job_id))
+
+        return stop_result
+
+
+    def stop_all_jobs(self, status_filter=None):
+        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+
+        stop_url = _urljoin(self.qps_api.api_url, "generator", "job", "stop_all")
+        stop_data = {}
+        if(status_filter is not None):
+            stop_data["status"] = status_filter
+
+        stop_response = self.qps_api.http_post(url = stop_url, headers = headers, json = stop_data)
+
+        stop_response.raise_for_status()
+        stop_result = stop_response.json()
+
+        return stop_result
+
+
+    def start_job(self, job_id):
+        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+
+        start_url = _urljoin(self.qps_api.api_url, "generator", "job", "start")
+        start_data = { "_id": job_id }
+
+        start_response = self.qps_api.http_post(url = start_url, headers = headers, json = start_data)
+
+        start_response.raise_for_status()
+        start_result = start_response.json()
+
+        self.qps_api._observe_job_state(job_id, "queued")
+
+        return start_result
+
+
+    def reset_job(self, job_id):
+        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+
+        reset_url = _urljoin(self.qps_api.api_url, "generator", "job", "reset")
+        reset_data = { "_id": job_id }
+
+        reset_response = self.qps_api.http_post(url = reset_url, headers = headers, json = reset_data)
+
+        reset_response.raise_for_status()
+        reset_result = reset_response.json()
+
+        self.qps_api._observe_job_state(job_id, "draft")
+
+        return reset_result
+
+
+    def get_job(self, job_id, wait=True, timeout=None):
+        problem_key, cached_job = _stored_job(self.qps_api, job_id)
+        if(cached_job is not None):
+            return cached_job
+
+        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+
+        if(wait == True):
+            self._wait_finished(job_id, headers, timeout)
+
+        #
+        # Get output
+        #
+        get_job_url = _urljoin(self.qps_api.api_url, "generator", "job", "get")
+        get_job_data = { "_id": job_id }
+        get_job_response = _shared_post(self.qps_api, get_job_url, headers, get_job_data)
+
+        get_job_response.raise_for_status()
+
+        get_job_result = _normalize_job(get_job_response.json())
+
+        self.qps_api._observe_job_state(job_id, get_job_result.get("status"))
+
+        _cache_job(self.qps_api.job_cache, problem_key, get_job_result)
+        _journal_result(self.qps_api, job_id, get_job_result)
+
+        return get_job_result
+
+
+    def _wait_finished(self, job_id, headers, timeout):
+        #
+        # Wait for status change
+        #
+        status_url = _urljoin(self.qps_api.api_url, "generator", "job", "status")
+        status_data = { "_id": job_id }
+
+        poller = self.qps_api.poll_strategy.start(timeout)
+
+        while True:
+            status_response = _shared_post(self.qps_api, status_url, headers, status_data)
+
+            status_response.raise_for_status()
+
+            status_result = status_response.json()
+            self.qps_api._observe_job_state(job_id, status_result.get("status"))
+            if(_job_finished(status_result)):
+                poller.finish()
+                break
+
+            poller.sleep(f"Job {job_id} not finished")
+
+        return status_result
+
+
+    def _finished_job_ids(self, job_ids):
+        #
+        # A few jobs: job/status of each. More jobs: one job/list request (all jobs of the account, one consistent
+        # snapshot). Jobs which are not listed as queued or running are finished.
+        #
+        if(len(job_ids) <= _STATUS_POLL_MAX_JOBS):
+            return set(job_id for job_id in job_ids if _job_finished(self.job_status(job_id)))
+
+        active = _active_job_ids(self.list_jobs())
+
+        return set(job_id for job_id in job_ids if job_id not in active)
+
+
+    def as_completed(self, job_ids, timeout=None):
+        #
+        # One job/list request per tick tells which pending jobs are finished (see _finished_job_ids()).
+        # job/get is called only for finished jobs, which are yielded in completion order.
+        #
+        pending = []
+        for job_id in dict.fromkeys(job_ids):
+            problem_key, cached_job = _stored_job(self.qps_api, job_id)
+            if(cached_job is not None):
+                yield cached_job
+            else:
+                pending.append(job_id)
+
+        if(len(pending) == 0):
+            return
+
+        poller = self.qps_api.poll_strategy.start(timeout)
+
+        while True:
+            finished = self._finished_job_ids(pending)
+            for job_id in finished:
+                yield self.get_job(job_id, wait=False)
+
+            pending = [job_id for job_id in pending if job_id not in finished]
+            if(len(pending) == 0):
+                poller.finish()
+                break
+
+            poller.sleep(f"{len(pending)} job(s) not finished: " + ", ".join(pending))
+
+        return
+
 
-        if not settings:
-            settings = {}
+    def wait_jobs(self, job_ids, timeout=None):
+        jobs = {}
+        for job in self.as_completed(job_ids, timeout):
+            jobs[job["_id"]] = job
 
-        for key in settings.keys():
-            if(key == "instruction_set"):
-                problem["settings"]["allowed_gates"] = ",".join(settings["instruction_set"])
-            else:
-                problem["settings"][key] = settings[key]
+        return [jobs[job_id] for job_id in job_ids]
 
-        #
-        # HTTP headers
-        #
-        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
 
+    def solve_stream(self, problems, settings={}, max_in_flight=None, timeout=None, use_cache=True):
         #
-        # Create a job
+        # Keeps at most max_in_flight jobs submitted and yields (problem, job) pairs in order of completion.
+        # problems can be any iterable (e.g. generator) and is consumed only as jobs finish.
+        # timeout is maximum number of seconds to wait for the next job to finish.
         #
-        create_url = _urljoin(self.qps_api.api_url, "generator", "job", "create")
+        if(max_in_flight is None):
+            max_in_flight = self.qps_api.batch_max_workers
 
-        create_response = self.qps_api.http_post(url = create_url, headers = headers, json = problem)
+        problems_iter = iter(problems)
+        problems_exhausted = False
 
-        create_response.raise_for_status()
-        create_result = create_response.json()
+        # job_id -> list of problems (identical cached problems can share one job)
+        in_flight = {}
+        in_flight_count = 0
 
-        job_id = create_result["_id"]
+        poller = None
 
-        if(start_job == True):
+        while True:
             #
-            # Start a job
+            # Refill
             #
-            self.start_job(job_id)
+            refill = []
+            while(not problems_exhausted and in_flight_count + len(refill) < max_in_flight):
+                try:
+                    refill.append(next(problems_iter))
+                except StopIteration:
+                    problems_exhausted = True
+
+            if(len(refill) > 0):
+                submitted = self.solve_many(refill, settings, True, max_in_flight, use_cache)
+                for problem, job_id, error in zip(refill, submitted.results, submitted.errors):
+                    if(error is not None):
+                        yield problem, _normalize_job({ "_id": None, "status": "error", "output": { "error_code": -1, "message": str(error) } })
+                        continue
+
+                    in_flight.setdefault(job_id, []).append(problem)
+                    in_flight_count += 1
+
+            if(in_flight_count == 0):
+                if(problems_exhausted):
+                    break
+                continue
 
-        return job_id
+            #
+            # Collect finished jobs
+            #
+            if(poller is None):
+                poller = self.qps_api.poll_strategy.start(timeout)
 
+            cached = [job_id for job_id in in_flight if _stored_job(self.qps_api, job_id)[1] is not None]
+            finished = set(cached) if len(cached) > 0 else self._finished_job_ids(list(in_flight.keys()))
 
-    def list_jobs(self, status_filter=None):
-        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+            for job_id in finished:
+                job = self.get_job(job_id, wait=False)
+                for problem in in_flight.pop(job_id):
+                    in_flight_count -= 1
+                    yield problem, job
 
-        list_url = _urljoin(self.qps_api.api_url, "generator", "job", "list")
-        list_data = {}
-        if(status_filter is not None):
-            list_data["status"] = status_filter
+            if(len(finished) > 0):
+                poller.finish()
+                poller = None
+            else:
+                poller.sleep(f"{in_flight_count} job(s) not finished")
 
-        list_response = self.qps_api.http_post(url = list_url, headers = headers, json = list_data)
+        return
 
-        list_response.raise_for_status()
-        list_result = list_response.json()
 
-        return list_result
+    def iter_circuits(self, job, fields=None, wait=True, timeout=None):
+        #
+        # Yields circuits of a job object (or job ID) one by one.
+        # For job ID, circuits are decoded from streamed job/get response as they arrive, so the whole job is never held in memory.
+        # fields: circuit keys to keep (e.g. ["qasm"]). Other values are skipped without decoding.
+        #
+        if(not isinstance(job, dict)):
+            job_id = job
+            problem_key, job = _stored_job(self.qps_api, job_id)
 
+        if(isinstance(job, dict)):
+            for circuit in job.get("output", {}).get("circuits", []):
+                yield circuit if fields is None else { key: circuit[key] for key in fields if key in circuit }
+            return
 
-    def job_status(self, job_id):
         headers = {"Authorization": "Bearer " + self.qps_api.api_token }
 
-        status_url = _urljoin(self.qps_api.api_url, "generator", "job", "status")
-        status_data = { "_id": job_id }
+        if(wait == True):
+            self._wait_finished(job_id, headers, timeout)
 
-        status_response = self.qps_api.http_post(url = status_url, headers = headers, json = status_data)
+        get_job_url = _urljoin(self.qps_api.api_url, "generator", "job", "get")
+        get_job_data = { "_id": job_id }
 
-        status_response.raise_for_status()
-        status_result = status_response.json()
+        # streamed responses can't be shared, so this request is never coalesced
+        get_job_response = self.qps_api.http_post(url = get_job_url, headers = headers, json = get_job_data, stream = True)
 
-        return status_result
+        try:
+            get_job_response.raise_for_status()
 
+            chunks = get_job_response.iter_content(chunk_size=self.qps_api.stream_chunk_size)
+            yield from iter_json_items(chunks, ("output", "circuits"), set(fields) if fields is not None else None)
+        finally:
+            get_job_response.close()
 
-    def stop_job(self, job_id):
-        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+        return
 
-        stop_url = _urljoin(self.qps_api.api_url, "generator", "job", "stop")
-        stop_data = { "_id": job_id }
 
-        stop_response = self.qps_api.http_post(url = stop_url, headers = headers, json = stop_data)
+    def verify_job(self, job, circuits=None, max_diff=None, diff_method=None, timeout=None):
+        #
+        # Recomputes diff of each circuit locally (requires NumPy). Job can be job object or job ID (job is fetched when finished).
+        #
+        from .verify import verify_job
 
-        stop_response.raise_for_status()
-        stop_result = stop_response.json()
+        if(not isinstance(job, dict)):
+            job = self.get_job(job, wait=True, timeout=timeout)
 
-        return stop_result
+        return verify_job(job, circuits, max_diff, diff_method)
 
 
-    def stop_all_jobs(self, status_filter=None):
-        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+    def transpile(self, input_qasm, method="replace_blocks", method_options={}, job_name=None, settings={}, start_job=True, use_cache=True):
+        problem = _transpile_problem(input_qasm, method, method_options, job_name)
 
-        stop_url = _urljoin(self.qps_api.api_url, "generator", "job", "stop_all")
-        stop_data = {}
-        if(status_filter is not None):
-            stop_data["status"] = status_filter
+        return self.solve(problem, settings, start_job, use_cache)
 
-        stop_response = self.qps_api.http_post(url = stop_url, headers = headers, json = stop_data)
 
-        stop_response.raise_for_status()
-        stop_result = stop_response.json()
+    def circuit_from_vectors(self, vector_pairs, endianness="little", job_name=None, settings={}, start_job=True, use_cache=True):
+        problem = _vectors_problem(vector_pairs, endianness, job_name)
 
-        return stop_result
+        return self.solve(problem, settings, start_job, use_cache)
 
 
-    def start_job(self, job_id):
-        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+    def state_preparation(self, final_vector, endianness="little", job_name=None, settings={}, start_job=True, use_cache=True):
+        return self.circuit_from_vectors(_state_preparation_pairs(final_vector), endianness, job_name, settings, start_job, use_cache)
 
-        start_url = _urljoin(self.qps_api.api_url, "generator", "job", "start")
-        start_data = { "_id": job_id }
 
-        start_response = self.qps_api.http_post(url = start_url, headers = headers, json = start_data)
+    def decompose_unitary(self, unitary, endianness="big", job_name=None, settings={}, start_job=True, use_cache=True):
+        problem = _unitary_problem(unitary, endianness, job_name)
 
-        start_response.raise_for_status()
-        start_result = start_response.json()
+        return self.solve(problem, settings, start_job, use_cache)
 
-        return start_result
 
+    def circuit_from_truth_table(self, truth_table_csv, column_defs, csv_delimiter=None, additional_qubits=1, job_name=None, settings={}, start_job=True, use_cache=True):
+        problem = _truth_table_problem(truth_table_csv, column_defs, csv_delimiter, additional_qubits, job_name)
 
-    def reset_job(self, job_id):
-        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+        return self.solve(problem, settings, start_job, use_cache)
 
-        reset_url = _urljoin(self.qps_api.api_url, "generator", "job", "reset")
-        reset_data = { "_id": job_id }
 
-        reset_response = self.qps_api.http_post(url = reset_url, headers = headers, json = reset_data)
+class QCONVERTAPI:
+    def __init__(self, qps_api):
+        self.qps_api = qps_api
 
-        reset_response.raise_for_status()
-        reset_result = reset_response.json()
+        return
 
-        return reset_result
 
+    def convert(self, input_data, source_format, dest_format, use_cache=True, use_local=True, trace=None):
+        #
+        # If trace is a dict, it receives "path" ("local", "cache" or "server"), "elapsed" seconds
+        # and "local_error" if local converter failed and conversion fell back to the server
+        #
+        started = time.perf_counter()
+
+        if(use_local):
+            converted, convert_result = _local_convert(self.qps_api.local_converters, input_data, source_format, dest_format, trace)
+            if(converted):
+                _trace_path(trace, "local", started)
+                return convert_result
 
-    def get_job(self, job_id, wait=True):
         headers = {"Authorization": "Bearer " + self.qps_api.api_token }
 
-        if(wait == True):
-            #
-            # Wait for status change
-            #
-            status_url = _urljoin(self.qps_api.api_url, "generator", "job", "status")
-            status_data = { "_id": job_id }
+        convert_url = _urljoin(self.qps_api.api_url, "qconvert")
+        convert_data = _convert_data(input_data, source_format, dest_format)
 
-            while True:
-                status_response = self.qps_api.http_post(url = status_url, headers = headers, json = status_data)
+        convert_cache = self.qps_api.convert_cache if use_cache else None
+        if(convert_cache is not None):
+            convert_key = cache_key("qconvert", convert_data)
+            convert_result = convert_cache.get(convert_key)
+            if(convert_result is not None):
+                _trace_path(trace, "cache", started)
+                return convert_result
 
-                status_response.raise_for_status()
+        convert_response = self.qps_api.http_post(url=convert_url, headers=headers, json=convert_data)
 
-                status_result = status_response.json()
-                if(status_result["status"] == "done"):
-                    break
-                if(status_result["status"] == "draft"):
-                    break
-                if(status_result["status"] == "error"):
-                    message = status_result["message"]
-                    if(message is None or message == ""):
-                        message = "Unknown error"
-                    break
+        convert_response.raise_for_status()
+        convert_result = convert_response.text
 
-                time.sleep(1)
+        if(convert_cache is not None):
+            convert_cache.put(convert_key, convert_result)
 
+        _trace_path(trace, "server", started)
+
+        return convert_result
+
+
+    def validate(self, input_data, source_format, use_local=True, trace=None):
         #
-        # Get output
+        # Returns True if input is valid program in source_format, raises Exception otherwise.
+        # Without local validator (or if it rejects input) the server checks input by converting it to "qasm".
         #
-        get_job_url = _urljoin(self.qps_api.api_url, "generator", "job", "get")
-        get_job_data = { "_id": job_id }
-        get_job_response = self.qps_api.http_post(url = get_job_url, headers = headers, json = get_job_data)
+        started = time.perf_counter()
 
-        get_job_response.raise_for_status()
+        local_converters = self.qps_api.local_converters
+        validator = local_converters.get_validator(source_format) if use_local and local_converters is not None else None
+        if(validator is not None):
+            try:
+                validator(input_data)
+                local_converters.count("local")
+                _trace_path(trace, "local", started)
+                return True
+            except Exception as e:
+                local_converters.count("fallbacks")
+                if(trace is not None):
+                    trace["local_error"] = e
 
-        get_job_result = get_job_response.json()
+        server_trace = {}
+        self.convert(input_data, source_format, "qasm", use_local=False, trace=server_trace)
 
-        if("output" not in get_job_result):
-            get_job_result["output"] = {}
+        _trace_path(trace, server_trace["path"], started)
 
-        if("circuits" not in get_job_result["output"]):
-            get_job_result["output"]["circuits"] = []
+        return True
 
-        return get_job_result
 
+    def convert_many(self, inputs, source_format, dest_formats, max_workers=None, use_cache=True):
+        #
+        # Each input is serialized once, then all (input, dest) pairs are converted on a bounded worker pool.
+        # If dest_formats is a string, results[i] is converted i-th input.
+        # If dest_formats is a list, results[i] and errors[i] are dicts keyed by dest format (only failed formats are in errors[i]).
+        #
+        single_dest = isinstance(dest_formats, str)
+        dests = [dest_formats] if single_dest else list(dest_formats)
 
-    def transpile(self, input_qasm, method="replace_blocks", method_options={}, job_name=None, settings={}, start_job=True):
-        problem = {
-            "type": "circuit",
-            "source": {
-                "circuit": {
-                    "qasm": input_qasm,
-                    "method": method
-                }
-            },
-            "settings": {
-                "allowed_gates": "u3,cx",
-                "max_diff": 1e-3,
-                "diff_method": "distance",
-                "single_solution": True,
-                "pre_processing": "experimental1"
-            }
-        }
+        input_strings = [_convert_input(input_data) for input_data in inputs]
 
-        if(job_name is not None):
-            problem["name"] = job_name
-
-        if not method_options:
-            method_options = {}
-
-        for key in method_options.keys():
-            if(key != "qasm" and key != "method"):
-                problem["source"]["circuit"][key] = method_options[key]
-
-        return self.solve(problem, settings, start_job)
-
-
-    def circuit_from_vectors(self, vector_pairs, endianness="little", job_name=None, settings={}, start_job=True):
-        text1 = ""
-        text2 = ""
-        for vector_pair in vector_pairs:
-            if(len(text1) > 0):
-                text1 += "\n"
-            if(len(text2) > 0):
-                text2 += "\n"
-            text1 += str(vector_pair[0])
-            text2 += str(vector_pair[1])
-
-        problem = {
-            "type": "vectors",
-            "source": {
-                "vectors": {
-                    "text1": text1,
-                    "text2": text2,
-                    "endianness1": endianness,
-                    "endianness2": endianness
-                }
-            },
-            "settings": {
-                "allowed_gates": "u3,cx",
-                "max_diff": 1e-3,
-                "diff_method": "distance",
-                "single_solution": True,
-                "pre_processing": ""
-            }
-        }
+        if(max_workers is None):
+            max_workers = self.qps_api.batch_max_workers
 
-        if(job_name is not None):
-            problem["name"] = job_name
+        tasks = [(input_index, dest) for input_index in range(len(input_strings)) for dest in dests]
 
-        return self.solve(problem, settings, start_job)
+        def convert_task(task):
+            input_index, dest = task
+            try:
+                return self.convert(input_strings[input_index], source_format, dest, use_cache), None
+            except Exception as e:
+                return None, e
+
+        batch_result = QBATCHRESULT(len(input_strings))
+        if(not single_dest):
+            batch_result.results = [{} for input_string in input_strings]
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks) or 1))) as executor:
+            for (input_index, dest), (output, error) in zip(tasks, executor.map(convert_task, tasks)):
+                if(single_dest):
+                    batch_result.results[input_index] = output
+                    batch_result.errors[input_index] = error
+                elif(error is None):
+                    batch_result.results[input_index][dest] = output
+                else:
+                    if(batch_result.errors[input_index] is None):
+                        batch_result.errors[input_index] = {}
+                    batch_result.errors[input_index][dest] = error
 
+        return batch_result
 
-    def state_preparation(self, final_vector, endianness="little", job_name=None, settings={}, start_job=True):
-        initial_vector = [0] * len(final_vector)
-        initial_vector[0] = 1
-        return self.circuit_from_vectors([ [initial_vector, final_vector] ], endianness, job_name, settings, start_job)
 
+class QUTILSAPI:
+    def __init__(self, qps_api):
+        self.qps_api = qps_api
 
-    def decompose_unitary(self, unitary, endianness="big", job_name=None, settings={}, start_job=True):
-        text = str(unitary)
+        return
 
-        problem = {
-            "type": "unitary",
-            "source": {
-                "unitary": {
-                    "text": text,
-                    "endianness": endianness
-                }
-            },
-            "settings": {
-                "allowed_gates": "u3,cx",
-                "max_diff": 1e-3,
-                "diff_method": "distance",
-                "single_solution": True,
-                "pre_processing": ""
-            }
-        }
 
-        if(job_name is not None):
-            problem["name"] = job_name
+    def random_circuit(self, num_qubits=5, output_format="quantum-circuit", options={}, use_cache=True):
+        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
 
-        return self.solve(problem, settings, start_job)
+        random_circuit_url = _urljoin(self.qps_api.api_url, "utils", "random_circuit")
 
+        random_circuit_data = _random_circuit_data(num_qubits, output_format, options)
 
-    def circuit_from_truth_table(self, truth_table_csv, column_defs, csv_delimiter=None, additional_qubits=1, job_name=None, settings={}, start_job=True):
-        # auto-detect delimiter
-        delimiter = csv_delimiter
-        if(delimiter is None or delimiter == ""):
-            count_commas = truth_table_csv.count(",")
-            count_tabs = truth_table_csv.count("\t")
-            delimiter = "," if count_commas > count_tabs else "\t"
+        # only seeded circuits are reproducible, so only they can be cached
+        random_circuit_cache = self.qps_api.convert_cache if use_cache and "seed" in random_circuit_data else None
+        if(random_circuit_cache is not None):
+            random_circuit_key = cache_key("random_circuit", random_circuit_data)
+            random_circuit_result = random_circuit_cache.get(random_circuit_key)
+            if(random_circuit_result is not None):
+                return random_circuit_result
 
-        # parse CSV string
-        f = StringIO(truth_table_csv.lstrip())
-        reader = csv.reader(f, delimiter=delimiter)
+        random_circuit_response = self.qps_api.http_post(url=random_circuit_url, headers=headers, json=random_circuit_data)
 
-        # read first line
-        first_line = next(reader)
+        random_circuit_response.raise_for_status()
+        random_circuit_result = random_circuit_response.text
 
-        # check if number of columns match number of column_defs
-        if(len(column_defs) != len(first_line)):
-            raise Exception("Number of columns (" + str(len(first_line)) + ") doesn't match number of column_defs (" + str(len(column_defs)) + ")")
+        if(random_circuit_cache is not None):
+            random_circuit_cache.put(random_circuit_key, random_circuit_result)
 
-        # check if first line is title
-        first_line_title = False
-        for cell in first_line:
-            if(not cell.isdigit()):
-                first_line_title = True
-                break
+        return random_circuit_result
 
-        # build proper coldefs
-        coldefs = []
-        col_index = 0
-        for column_def in column_defs:
-            coldef = {}
 
-            # column type
-            if(type(column_def) == str):
-                coldef["type"] = column_def
-            else:
-                coldef = deepcopy(column_def)
-
-            if("type" not in coldef):
-                raise Exception("Column " + str(col_index) + " (0-based) definition doesn't contain \"type\"")
-
-            if(type(coldef["type"]) == str):
-                if(coldef["type"] == "input"):
-                    coldef["type"] = 0
-                elif(coldef["type"] == "output"):
-                    coldef["type"] = 1
-                elif(coldef["type"] == "" or coldef["type"] == "ignore"):
-                    coldef["type"] = -1
-                else:
-                    raise Exception("Unknown column type \"" + coldef["type"] + "\"")
 
-            if(coldef["type"] > 1):
-                raise Exception("Unknown column type \"" + str(coldef["type"]) + "\"")
+def _response_bytes(response, stream):
+    if(response is None):
+        return 0
 
-            # column index
-            if("index" not in coldef):
-                coldef["index"] = col_index
+    # streamed body is not read yet: use its Content-Length (compressed size if response is compressed)
+    if(stream):
+        return int(response.headers.get("Content-Length") or 0)
 
-            #
-            # title
-            #
-            if("title" not in coldef):
-                if(first_line_title):
-                    coldef["title"] = first_line[col_index]
-                else:
-                    coldef["title"] = "Col" + str(col_index)
-
-            coldefs.append(coldef)
-            col_index += 1
-
-        # sort coldefs by index
-        coldefs.sort(key=lambda x: x["index"])
-
-        # check if col indexes are unique
-        col_indexes = list(o["index"] for o in coldefs)
-        if len(col_indexes) > len(set(col_indexes)):
-            raise Exception("Column indexes are not unique.")
-
-        # create problem
-        problem = {
-            "type": "truth",
-            "source": {
-                "truth": {
-                    "text": truth_table_csv,
-                    "coldefs": coldefs,
-                    "numNonOverlapingQubits": additional_qubits
-                }
-            },
-            "settings": {
-                "allowed_gates": "x,cx,ccx,swap",
-                "max_diff": 1e-3,
-                "diff_method": "distance",
-                "single_solution": True,
-                "pre_processing": ""
-            }
-        }
+    return len(response.content)
 
-        if(job_name is not None):
-            problem["name"] = job_name
 
-        return self.solve(problem, settings, start_job)
+def _json_body(data):
+    # the same as requests' json= parameter, without whitespace
+    return json.dumps(data, separators=(",", ":"), allow_nan=False).encode("utf-8")
 
 
-class QCONVERTAPI:
-    def __init__(self, qps_api):
-        self.qps_api = qps_api
+def _compress_body(body, compression, level):
+    import zlib
 
-        return
+    if(compression == "gzip"):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    elif(compression == "deflate"):
+        compressor = zlib.compressobj(level)
+    else:
+        raise Exception("Unsupported compression \"" + str(compression) + "\". Expected \"gzip\" or \"deflate\".")
 
+    return compressor.compress(body) + compressor.flush()
 
-    def convert(self, input_data, source_format, dest_format):
-        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
 
-        input_string = ""
-        if isinstance(input_data, dict):
-            input_string = json.dumps(input_data)
-        elif isinstance(input_data, str):
-            input_string = input_data
-        else:
-            input_string = str(data)
+def _origin(url):
+    # scheme://host[:port]
+    parts = url.split("/", 3)
 
-        convert_url = _urljoin(self.qps_api.api_url, "qconvert")
-        convert_data = {}
-        convert_data["input"] = input_string
-        convert_data["source"] = str(source_format)
-        convert_data["dest"] = str(dest_format)
+    return "/".join(parts[:3])
 
-        convert_response = self.qps_api.http_post(url=convert_url, headers=headers, json=convert_data)
 
-        convert_response.raise_for_status()
-        convert_result = convert_response.text
+class QHTTPTRANSPORT:
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, compress_threshold=None, compression="gzip", compression_level=6):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
 
-        return convert_result
+        # Request bodies of at least compress_threshold bytes are sent compressed ("gzip" or "deflate" Content-Encoding).
+        # None (default) disables compression: enable it only for servers known to accept compressed request bodies.
+        self.compress_threshold = compress_threshold
+        self.compression = compression
+        self.compression_level = compression_level
 
+        # servers which rejected compressed body (then it was sent again uncompressed)
+        self._uncompressed_origins = set()
 
-class QUTILSAPI:
-    def __init__(self, qps_api):
-        self.qps_api = qps_api
+        self._session = None
+        self._session_lock = threading.Lock()
 
         return
 
 
-    def random_circuit(self, num_qubits=5, output_format="quantum-circuit", options={}):
-        headers = {"Authorization": "Bearer " + self.qps_api.api_token }
+    def session(self):
+        #
+        # One keep-alive session per transport, created on first use.
+        # requests.Session delegates to urllib3 connection pools which are thread-safe.
+        #
+        session = self._session
+        if(session is not None):
+            return session
+
+        with self._session_lock:
+            if(self._session is None):
+                # requests is imported on first use to keep package import fast
+                import requests
+                import requests.adapters
+
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    pool_block=self.pool_block,
+                    max_retries=0
+                )
 
-        random_circuit_url = _urljoin(self.qps_api.api_url, "utils", "random_circuit")
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
 
-        random_circuit_data = {}
+                self._session = session
 
-        random_circuit_data["num_qubits"] = int(num_qubits)
-        random_circuit_data["format"] = str(output_format)
+            return self._session
 
-        if options:
-            if "num_gates" in options:
-                random_circuit_data["num_gates"] = options["num_gates"]
-            if "instruction_set" in options:
-                random_circuit_data["instruction_set"] = options["instruction_set"]
-            if "mid_circuit_measurement" in options:
-                random_circuit_data["mid_circuit_measurement"] = options["mid_circuit_measurement"]
-            if "mid_circuit_reset" in options:
-                random_circuit_data["mid_circuit_reset"] = options["mid_circuit_reset"]
-            if "classic_control" in options:
-                random_circuit_data["classic_control"] = options["classic_control"]
 
+    def post(self, url, headers, json, timeout, stream=False):
+        session = self.session()
 
-        random_circuit_response = self.qps_api.http_post(url=random_circuit_url, headers=headers, json=random_circuit_data)
+        body = _json_body(json)
+        headers = dict(headers)
+        headers["Content-Type"] = "application/json"
 
-        random_circuit_response.raise_for_status()
-        random_circuit_result = random_circuit_response.text
+        origin = _origin(url)
+        if(self.compress_threshold is None or len(body) < self.compress_threshold or origin in self._uncompressed_origins):
+            return session.post(url=url, headers=headers, data=body, timeout=timeout, stream=stream)
 
-        return random_circuit_result
+        compressed_headers = dict(headers)
+        compressed_headers["Content-Encoding"] = self.compression
+        response = session.post(url=url, headers=compressed_headers, data=_compress_body(body, self.compression, self.compression_level), timeout=timeout, stream=stream)
+
+        #
+        # Negotiation fallback: server which doesn't accept compressed bodies answers 415 (or 400 if it tried to parse it as JSON).
+        # Body is sent again uncompressed (server rejected the request, so this is safe for any endpoint).
+        #
+        if(response.status_code not in (400, 415)):
+            return response
 
+        response.close()
+
+        uncompressed_response = session.post(url=url, headers=headers, data=body, timeout=timeout, stream=stream)
+
+        # 400 for uncompressed body too means that the request itself is bad, not the encoding
+        if(response.status_code == 415 or uncompressed_response.status_code < 400):
+            with self._session_lock:
+                self._uncompressed_origins.add(origin)
+
+        return uncompressed_response
+
+
+    def close(self):
+        with self._session_lock:
+            if(self._session is not None):
+                self._session.close()
+                self._session = None
+
+        return
 
 
 class QPSAPI:
@@ -476,8 +1435,58 @@ class QPSAPI:
             self.load_account()
 
         self.http_timeout = 3
-        self.http_max_retries = 3
-        self.retry_delay_seconds = 1
+
+        # Which failed requests are retried, how many times and how long to wait.
+        # http_max_retries, retry_delay_seconds and retry_max_delay_seconds are shortcuts to its max_attempts, base_delay and max_delay.
+        self.retry_policy = QRETRYPOLICY()
+
+        # Fails fast while service is unhealthy. Can be shared by multiple QPSAPI objects. Set to None to disable.
+        self.circuit_breaker = QCIRCUITBREAKER()
+
+        # Default number of concurrent requests made by batch methods like converter.convert_many()
+        self.batch_max_workers = 8
+
+        # How often and for how long get_job(), wait_jobs() and as_completed() poll job status
+        self.poll_strategy = QPOLLSTRATEGY()
+
+        # Finished synth jobs by problem hash. Set to None to disable.
+        self.job_cache = QCACHE()
+
+        # Append-only record of submitted jobs (QJOBJOURNAL): solve() re-attaches to journaled jobs of the same problem
+        # and get_job() returns journaled finished jobs, so batch runs can be resumed after a crash. None (default) disables it.
+        self.job_journal = None
+
+        # Idempotency keys of job creations in progress, kept until the job is known: after ambiguous failure, a later solve()
+        # of the same problem finds the job instead of creating a second one. In memory by default: use QCACHE with path to keep
+        # the keys across processes (e.g. after a crash). Set to None to disable.
+        self.pending_jobs = QCACHE(max_entries=1024, max_age=7 * 24 * 3600)
+
+        # converter.convert() results and seeded utils.random_circuit() results. Set to None to disable.
+        self.convert_cache = QCACHE(max_entries=1024, max_bytes=32 * 1024 * 1024, compress_threshold=4096)
+
+        # Identical concurrent solve() calls, job status and get requests are coalesced into one request. Set to None to disable.
+        self.single_flight = QSINGLEFLIGHT()
+
+        # In-process converters used by converter.convert() and converter.validate() before calling the server. Set to None to disable.
+        self.local_converters = QLOCALCONVERTERS()
+
+        # Size of chunks in which streamed responses (synth.iter_circuits()) are read and decoded
+        self.stream_chunk_size = 64 * 1024
+
+        # pool_connections: number of hosts kept in the pool, pool_maxsize: connections kept per host
+        self.http_pool_connections = 10
+        self.http_pool_maxsize = 10
+        self.http_pool_block = False
+
+        self.transport = QHTTPTRANSPORT(self.http_pool_connections, self.http_pool_maxsize, self.http_pool_block)
+
+        # Request, retry, backoff and job state events. self.metrics collects per-endpoint statistics from them.
+        self.hooks = QHOOKS()
+        self.metrics = QMETRICS().attach(self.hooks)
+
+        # last observed status of jobs, for job_state events
+        self._job_states = {}
+        self._job_states_lock = threading.Lock()
 
         self.synth = QGENAPI(self)
 
@@ -491,53 +1500,288 @@ class QPSAPI:
         return
 
 
-    def http_post(self, url, headers, json):
-        RETRYABLE_STATUS_CODES = { 500, 502, 503, 504 }
+    def _endpoint(self, url):
+        # e.g. "generator/job/status"
+        if(url.startswith(self.api_url)):
+            return url[len(self.api_url):].strip("/")
 
-        for retry_count in range(self.http_max_retries):
-            try:
-                response = requests.post(
-                    url=url,
-                    headers=headers,
-                    json=json,
-                    timeout=self.http_timeout
-                )
+        return url
 
-                if response.status_code in RETRYABLE_STATUS_CODES:
-                    error_message = f"Server returned {response.status_code}. Retrying..."
-                    print(error_message)
-                else:
+
+    def _request_start(self, endpoint, url, attempt):
+        if(self.hooks.active("request_start")):
+            self.hooks.emit("request_start", { "endpoint": endpoint, "url": url, "attempt": attempt })
+
+        return time.perf_counter()
+
+
+    def _request_end(self, endpoint, url, attempt, started, response, error, stream=False):
+        elapsed = time.perf_counter() - started
+
+        if(self.hooks.active("request_end")):
+            request = response.request if response is not None else getattr(error, "request", None)
+            body = getattr(request, "body", None)
+
+            self.hooks.emit("request_end", {
+                "endpoint": endpoint,
+                "url": url,
+                "attempt": attempt,
+                "status_code": response.status_code if response is not None else None,
+                "elapsed": elapsed,
+                "bytes_out": len(body) if body is not None else 0,
+                "bytes_in": _response_bytes(response, stream),
+                "error": error
+            })
+
+        return
+
+
+    @property
+    def http_max_retries(self):
+        return self.retry_policy.max_attempts
+
+
+    @http_max_retries.setter
+    def http_max_retries(self, value):
+        self.retry_policy.max_attempts = value
+
+
+    @property
+    def retry_delay_seconds(self):
+        return self.retry_policy.base_delay
+
+
+    @retry_delay_seconds.setter
+    def retry_delay_seconds(self, value):
+        self.retry_policy.base_delay = value
+
+
+    @property
+    def retry_max_delay_seconds(self):
+        return self.retry_policy.max_delay
+
+
+    @retry_max_delay_seconds.setter
+    def retry_max_delay_seconds(self, value):
+        self.retry_policy.max_delay = value
+
+
+    def _circuit_allow(self):
+        circuit_breaker = self.circuit_breaker
+        if(circuit_breaker is None):
+            return
+
+        previous_state = circuit_breaker.state
+        try:
+            circuit_breaker.allow()
+        finally:
+            self._circuit_changed(previous_state)
+
+        return
+
+
+    def _circuit_record(self, healthy):
+        #
+        # healthy: True (service responded), False (transient failure) or None (request failed on the client side)
+        #
+        circuit_breaker = self.circuit_breaker
+        if(circuit_breaker is None):
+            return
+
+        previous_state = circuit_breaker.state
+        if(healthy is None):
+            circuit_breaker.release()
+        elif(healthy):
+            circuit_breaker.record_success()
+        else:
+            circuit_breaker.record_failure()
+
+        self._circuit_changed(previous_state)
+
+        return
+
+
+    def _circuit_changed(self, previous_state):
+        state = self.circuit_breaker.state
+        if(state == previous_state):
+            return
+
+        if(state == QCIRCUITBREAKER.OPEN):
+            _get_logger().error("Circuit breaker opened: service is unhealthy.")
+        else:
+            _get_logger().warning(f"Circuit breaker is {state}.")
+
+        self.hooks.emit("circuit_state", { "previous_state": previous_state, "state": state })
+
+        return
+
+
+    def _retry_or_raise(self, endpoint, url, attempt, max_attempts, response, error):
+        #
+        # Called after each attempt. Returns None if response is final, delay in seconds if request should be retried.
+        # Raises if request failed and must not be retried.
+        #
+        import requests
+
+        policy = self.retry_policy
+
+        if(error is not None):
+            if(not policy.transient_error(error)):
+                self._circuit_record(None)
+                _get_logger().error(f"An unexpected RequestException occurred: {error.__class__.__name__}. Giving up.")
+                raise error
+
+            self._circuit_record(False)
+
+            if(isinstance(error, requests.exceptions.ConnectionError)):
+                reason = f"Connection error occurred: {error.__class__.__name__}."
+            else:
+                reason = "Request timed out."
+
+        else:
+            if(not policy.transient_status(response.status_code)):
+                self._circuit_record(True)
+                try:
                     response.raise_for_status()
-                    return response
+                except requests.exceptions.HTTPError as e:
+                    _get_logger().error(f"Non-retryable HTTP Error: {e.response.status_code}. Giving up.")
+                    raise
+                return None
+
+            self._circuit_record(False)
+
+            reason = f"Server returned {response.status_code}."
+
+        if(not policy.retryable(endpoint, response, error)):
+            _get_logger().error(reason + f" Request to {endpoint} is not idempotent. Giving up.")
+            if(error is not None):
+                raise error
+            response.raise_for_status()
+
+        if(attempt == max_attempts - 1):
+            _get_logger().error(reason + f" Maximum retries ({max_attempts}) exceeded. Giving up.")
+            last_error = error
+            if(last_error is None):
+                try:
+                    response.raise_for_status()
+                except requests.exceptions.HTTPError as e:
+                    last_error = e
+            raise requests.exceptions.RetryError(f"Failed after {max_attempts} retries.", response=response) from last_error
+
+        delay = policy.delay(attempt, response)
+        if(delay is None):
+            _get_logger().error(reason + f" Server asked to retry in more than {policy.max_retry_after} seconds. Giving up.")
+            response.raise_for_status()
+
+        _get_logger().warning(reason + " Retrying...")
+
+        self.hooks.emit("retry", { "endpoint": endpoint, "url": url, "attempt": attempt, "reason": reason })
+        self.hooks.emit("backoff", { "endpoint": endpoint, "url": url, "attempt": attempt, "delay": delay })
+
+        _get_logger().info(f"Retrying in {delay:.2f} seconds...")
+
+        return delay
+
+
+    def _observe_job_state(self, job_id, status):
+        if(job_id is None or status is None):
+            return
+
+        with self._job_states_lock:
+            previous_status = self._job_states.get(job_id)
+            if(previous_status == status):
+                return
+
+            self._job_states.pop(job_id, None)
+            self._job_states[job_id] = status
+
+            # keep last 10000 jobs
+            if(len(self._job_states) > 10000):
+                self._job_states.pop(next(iter(self._job_states)))
+
+        # cached finished job is stale once the job is reset or started again
+        if(status != "done"):
+            _forget_job(self.job_cache, job_id)
 
-            except requests.exceptions.ConnectionError as e:
-                error_message = f"Connection error occurred: {e.__class__.__name__}. Retrying..."
-                print(error_message)
+        if(self.job_journal is not None):
+            self.job_journal.record_status(job_id, status)
 
-            except requests.exceptions.Timeout:
-                error_message = "Request timed out. Retrying..."
-                print(error_message)
+        self.hooks.emit("job_state", { "job_id": job_id, "previous_status": previous_status, "status": status })
 
-            except requests.exceptions.HTTPError as e:
-                print(f"Non-retryable HTTP Error: {e.response.status_code}. Giving up.")
-                raise
+        return
+
+
+    def http_post(self, url, headers, json, stream=False):
+        #
+        # With stream=True response body is not read: caller must consume response.iter_content() (or close the response)
+        #
+        import requests
 
-            except requests.exceptions.RequestException as e:
-                error_message = f"An unexpected RequestException occurred: {e.__class__.__name__}. Giving up."
-                print(error_message)
-                raise
+        endpoint = self._endpoint(url)
+        max_attempts = self.retry_policy.attempts(endpoint)
 
-            if retry_count == self.http_max_retries - 1:
-                print(f"Maximum retries ({self.http_max_retries}) exceeded. Giving up.")
-                raise requests.exceptions.RequestException(f"Failed after {self.http_max_retries} retries.")
+        for attempt in range(max_attempts):
+            self._circuit_allow()
 
+            # False until outcome of the request is reported to circuit breaker (by _retry_or_raise())
+            recorded = False
+            try:
+                started = self._request_start(endpoint, url, attempt)
+
+                try:
+                    response = self.transport.post(
+                        url=url,
+                        headers=headers,
+                        json=json,
+                        timeout=self.http_timeout,
+                        stream=stream
+                    )
+
+                except requests.exceptions.RequestException as e:
+                    self._request_end(endpoint, url, attempt, started, None, e)
+                    recorded = True
+                    delay = self._retry_or_raise(endpoint, url, attempt, max_attempts, None, e)
 
-            print(f"Retrying in {self.retry_delay_seconds} seconds...")
-            time.sleep(self.retry_delay_seconds)
+                else:
+                    self._request_end(endpoint, url, attempt, started, response, None, stream)
+                    recorded = True
+                    delay = self._retry_or_raise(endpoint, url, attempt, max_attempts, response, None)
+                    if(delay is None):
+                        return response
+                    if(stream):
+                        response.close()
+            finally:
+                # e.g. payload can't be serialized, hook raised or KeyboardInterrupt: nothing is known about service health,
+                # but half-open circuit breaker must let the next probe through
+                if(not recorded):
+                    self._circuit_record(None)
+
+            time.sleep(delay)
 
         return None
 
 
+    def set_http_pool(self, pool_connections=None, pool_maxsize=None, pool_block=None):
+        if(pool_connections is not None):
+            self.http_pool_connections = pool_connections
+        if(pool_maxsize is not None):
+            self.http_pool_maxsize = pool_maxsize
+        if(pool_block is not None):
+            self.http_pool_block = pool_block
+
+        old_transport = self.transport
+        self.transport = QHTTPTRANSPORT(self.http_pool_connections, self.http_pool_maxsize, self.http_pool_block, old_transport.compress_threshold, old_transport.compression, old_transport.compression_level)
+        old_transport.close()
+
+        return
+
+
+    def close(self):
+        self.transport.close()
+
+        return
+
+
     def config_path(self):
         config_path = os.path.join(os.path.expanduser("~"), ".quantastica", ".quantasticarc")
 
@@ -0,0 +1,220 @@
+import time
+import random
+import threading
+
+
+class QCIRCUITOPENERROR(Exception):
+    #
+    # Raised without contacting the server while circuit breaker is open (service considered unhealthy)
+    #
+    def __init__(self, message, retry_after=0.0):
+        super().__init__(message)
+
+        # seconds until circuit breaker lets a probe request through
+        self.retry_after = retry_after
+
+        return
+
+
+def _retry_after_seconds(response):
+    #
+    # Retry-After header: delay in seconds or HTTP date. Returns None if missing or invalid.
+    #
+    value = response.headers.get("Retry-After") if response is not None else None
+    if(value is None):
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def _connection_not_established(error):
+    #
+    # True if request certainly didn't reach the server (connection refused, DNS failure or connect timeout)
+    #
+    import requests
+
+    if(isinstance(error, requests.exceptions.ConnectTimeout)):
+        return True
+
+    if(not isinstance(error, requests.exceptions.ConnectionError)):
+        return False
+
+    reason = getattr(error.args[0] if len(error.args) > 0 else None, "reason", None)
+
+    return type(reason).__name__ in ("NewConnectionError", "ConnectTimeoutError", "NameResolutionError")
+
+
+class QRETRYPOLICY:
+    def __init__(self, max_attempts=3, non_idempotent_max_attempts=2, base_delay=1.0, max_delay=30.0, retry_status_codes=(429, 500, 502, 503, 504), non_idempotent_retry_status_codes=(429, 503), respect_retry_after=True, max_retry_after=120.0):
+        # Number of attempts (first request included) for idempotent and non-idempotent endpoints
+        self.max_attempts = max_attempts
+        self.non_idempotent_max_attempts = non_idempotent_max_attempts
+
+        # Delay before n-th retry is random between 0 and min(max_delay, base_delay * 2^n) ("full jitter")
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        # Non-idempotent requests (e.g. job/create) are retried only if server certainly didn't process them:
+        # on these status codes (request rejected) or if connection couldn't be established
+        self.retry_status_codes = set(retry_status_codes)
+        self.non_idempotent_retry_status_codes = set(non_idempotent_retry_status_codes)
+
+        # Wait at least as long as server asks in Retry-After header. Give up if it asks for more than max_retry_after seconds.
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+
+        # Endpoints (relative to api_url) which are safe to repeat
+        self.idempotent_endpoints = { "generator/job/status", "generator/job/get", "generator/job/list", "qconvert", "utils/random_circuit" }
+
+        return
+
+
+    def is_idempotent(self, endpoint):
+        return endpoint in self.idempotent_endpoints
+
+
+    def attempts(self, endpoint):
+        return self.max_attempts if self.is_idempotent(endpoint) else self.non_idempotent_max_attempts
+
+
+    def transient_status(self, status_code):
+        # server or gateway is (temporarily) unable to handle request
+        return status_code in self.retry_status_codes
+
+
+    def transient_error(self, error):
+        import requests
+
+        return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+    def retryable(self, endpoint, response=None, error=None):
+        if(error is not None):
+            if(not self.transient_error(error)):
+                return False
+            return self.is_idempotent(endpoint) or _connection_not_established(error)
+
+        if(self.is_idempotent(endpoint)):
+            return response.status_code in self.retry_status_codes
+
+        return response.status_code in self.non_idempotent_retry_status_codes
+
+
+    def ambiguous(self, error):
+        #
+        # True if failed non-idempotent request may still have been processed by the server
+        # (read timeout, connection dropped after request was sent or server error other than "rejected")
+        #
+        import requests
+
+        if(isinstance(error, requests.exceptions.HTTPError)):
+            status_code = error.response.status_code if error.response is not None else None
+            return status_code is not None and status_code >= 500 and status_code not in self.non_idempotent_retry_status_codes
+
+        return self.transient_error(error) and not _connection_not_established(error)
+
+
+    def delay(self, attempt, response=None):
+        #
+        # Seconds to wait before retrying after failed attempt (0-based), or None if server asks to wait longer than max_retry_after
+        #
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+        if(self.respect_retry_after):
+            retry_after = _retry_after_seconds(response)
+            if(retry_after is not None):
+                if(retry_after > self.max_retry_after):
+                    return None
+                # jitter is added on top, so clients told to wait the same time don't retry in lockstep
+                delay = retry_after + random.uniform(0, min(self.base_delay, self.max_delay))
+
+        return delay
+
+
+class QCIRCUITBREAKER:
+    #
+    # Shared by all threads using the same QPSAPI. After failure_threshold consecutive transient failures the circuit opens
+    # and requests fail fast with QCIRCUITOPENERROR. After reset_timeout seconds one probe request is let through:
+    # if it succeeds the circuit closes, otherwise it opens again.
+    #
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.failures = 0
+
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+        return
+
+
+    def allow(self):
+        #
+        # Raises QCIRCUITOPENERROR if request must not be sent
+        #
+        with self._lock:
+            if(self.state == self.CLOSED):
+                return
+
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if(self.state == self.OPEN and remaining <= 0):
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if(self.state == self.HALF_OPEN and not self._probe_in_flight):
+                self._probe_in_flight = True
+                return
+
+            raise QCIRCUITOPENERROR("Circuit breaker is open: service is unhealthy. Failing fast.", max(0.0, remaining))
+
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+        return
+
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if(self.state == self.HALF_OPEN or self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+        return
+
+
+    def release(self):
+        # request let through by allow() ended without telling anything about service health
+        with self._lock:
+            self._probe_in_flight = False
+
+        return
+
+
+    def reset(self):
+        self.record_success()
+
+        return
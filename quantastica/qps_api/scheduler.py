@@ -0,0 +1,471 @@
+import time
+import threading
+from collections import deque
+
+from .qps_api import QGENAPI, QPSTimeoutError, _apply_settings, _problem_key, _job_cache_key, _known_status
+from .pool import QPSPOOL, _http_status
+from .metrics import _get_logger, _percentile
+
+
+# wait samples kept per priority class
+_MAX_SAMPLES = 1024
+
+
+def _job_status(qps_api, job_id):
+    # last status of the job seen by the client (or journaled), None if unknown
+    if(isinstance(qps_api, QPSPOOL)):
+        qps_api = qps_api._backend(job_id)
+
+    return _known_status(qps_api, job_id)
+
+
+def _wait_stats(samples):
+    values = sorted(samples)
+
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if len(values) > 0 else None,
+        "p50": _percentile(values, 0.50),
+        "p90": _percentile(values, 0.90),
+        "max": values[-1] if len(values) > 0 else None
+    }
+
+
+class QSCHEDULEDGENAPI(QGENAPI):
+    #
+    # synth API whose jobs are started by QJOBSCHEDULER with given priority and tenant. Calls with job ID go to qps_api.synth,
+    # waiting methods (get_job(), wait_jobs(), as_completed(), solve_stream(), iter_circuits()) first wait until held jobs are started.
+    #
+    def __init__(self, scheduler, priority, tenant):
+        super().__init__(scheduler.qps_api)
+
+        self.scheduler = scheduler
+        self.priority = priority
+        self.tenant = tenant
+
+        return
+
+
+    def solve(self, problem, settings={}, start_job=True, use_cache=True):
+        if(start_job != True):
+            # drafts are not scheduled
+            return self.qps_api.synth.solve(problem, settings, start_job, use_cache)
+
+        return self.scheduler.submit(problem, self.priority, self.tenant, settings, use_cache)
+
+
+    def list_jobs(self, status_filter=None):
+        return self.qps_api.synth.list_jobs(status_filter)
+
+
+    def job_status(self, job_id):
+        return self.qps_api.synth.job_status(job_id)
+
+
+    def stop_job(self, job_id):
+        self.scheduler.cancel(job_id)
+
+        return self.qps_api.synth.stop_job(job_id)
+
+
+    def stop_all_jobs(self, status_filter=None):
+        return self.qps_api.synth.stop_all_jobs(status_filter)
+
+
+    def start_job(self, job_id):
+        # started manually: no longer held
+        self.scheduler.cancel(job_id)
+
+        return self.qps_api.synth.start_job(job_id)
+
+
+    def reset_job(self, job_id):
+        return self.qps_api.synth.reset_job(job_id)
+
+
+    def get_job(self, job_id, wait=True, timeout=None):
+        if(wait == True):
+            timeout = self.scheduler._wait_released([job_id], timeout)
+
+        return self.qps_api.synth.get_job(job_id, wait, timeout)
+
+
+    def iter_circuits(self, job, fields=None, wait=True, timeout=None):
+        if(not isinstance(job, dict) and wait == True):
+            timeout = self.scheduler._wait_released([job], timeout)
+
+        return self.qps_api.synth.iter_circuits(job, fields, wait, timeout)
+
+
+    def _finished_job_ids(self, job_ids):
+        # held jobs are drafts on the server, but not finished
+        held = self.scheduler._held(job_ids)
+        released = [job_id for job_id in job_ids if job_id not in held]
+        if(len(released) == 0):
+            return set()
+
+        return self.qps_api.synth._finished_job_ids(released)
+
+
+class QJOBSCHEDULER:
+    #
+    # Client-side admission control in front of the solver's single FIFO queue. Jobs are created as drafts and held locally;
+    # a background thread starts them one scheduling round at a time, while fewer than max_queued of its jobs are queued on the server:
+    #   - higher priority class first (lower rank), strictly
+    #   - within a class, tenants get fair share of starts in proportion to tenant_weights (then FIFO)
+    # So a latency-sensitive job waits for at most the running job and max_queued queued jobs of this scheduler (plus jobs queued by
+    # others), instead of the whole backlog.
+    # qps_api can be QPSAPI or QPSPOOL.
+    #
+    PRIORITIES = { "interactive": 0, "high": 1, "normal": 2, "low": 3, "bulk": 4 }
+
+    def __init__(self, qps_api, max_queued=1, poll_interval=1.0, tenant_weights=None):
+        if(max_queued < 1):
+            raise Exception("max_queued must be at least 1.")
+
+        self.qps_api = qps_api
+
+        # jobs started by this scheduler and still queued on the server, above which held jobs are not started (jobs queued by
+        # others are not counted, so they can't starve the scheduler)
+        self.max_queued = max_queued
+
+        # seconds between scheduling rounds (one job/list request each) while jobs are held or waiting in server queue
+        self.poll_interval = poll_interval
+
+        # tenant -> relative share of starts within a priority class. Default: 1 each.
+        self.tenant_weights = dict(tenant_weights) if tenant_weights is not None else {}
+
+        # last exception of a scheduling round (None if it succeeded)
+        self.last_error = None
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._wake = threading.Event()
+
+        # rank -> tenant -> deque of held entries, job_id -> held entry, job_id -> started entry not yet seen leaving server queue
+        self._pending = {}
+        self._entries = {}
+        self._released = {}
+
+        # job_id -> entry taken for starting, until start_job() returns (still a draft on the server, so still held)
+        self._starting = {}
+
+        # (rank, tenant) -> starts / weight
+        self._vtimes = {}
+
+        self._seq = 0
+        self._server_queued = None
+
+        self._thread = None
+        self._closed = False
+
+        self.reset_stats()
+
+        return
+
+
+    def synth(self, priority="normal", tenant=None):
+        # synth API (transpile(), solve_many(), wait_jobs(), ...) whose jobs are scheduled with priority and tenant
+        self._rank(priority)
+
+        return QSCHEDULEDGENAPI(self, priority, tenant)
+
+
+    def submit(self, problem, priority="normal", tenant=None, settings={}, use_cache=True):
+        #
+        # Creates a draft job and holds it until the scheduler starts it. Returns job ID.
+        #
+        rank = self._rank(priority)
+        if(self._closed):
+            raise Exception("Scheduler is closed.")
+
+        _apply_settings(problem, settings)
+
+        # problem already solved: nothing to wait for
+        job_cache = self.qps_api.job_cache
+        if(use_cache and job_cache is not None):
+            cached_job = job_cache.get(_job_cache_key(self.qps_api, _problem_key(problem)))
+            if(cached_job is not None):
+                return cached_job["_id"]
+
+        job_id = self.qps_api.synth.solve(problem, {}, False, use_cache)
+
+        # job re-attached from the journal (or reconciled) which was already started or finished: nothing to hold
+        if(_job_status(self.qps_api, job_id) not in (None, "draft")):
+            return job_id
+
+        with self._lock:
+            if(job_id in self._entries or job_id in self._starting or job_id in self._released):
+                return job_id
+
+            queue = self._pending.setdefault(rank, {})
+            if(tenant not in queue):
+                # tenant becomes active: it doesn't get credit for the time it was idle
+                active = [self._vtimes.get((rank, other), 0.0) for other in queue]
+                if(len(active) > 0):
+                    self._vtimes[(rank, tenant)] = max(self._vtimes.get((rank, tenant), 0.0), min(active))
+
+            entry = { "job_id": job_id, "priority": priority, "rank": rank, "tenant": tenant, "seq": self._seq, "submitted": time.monotonic(), "released": None }
+            self._seq += 1
+
+            queue.setdefault(tenant, deque()).append(entry)
+            self._entries[job_id] = entry
+            self._stats_of(priority)["submitted"] += 1
+
+            if(self._thread is None):
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+        self._wake.set()
+
+        return job_id
+
+
+    def cancel(self, job_id):
+        #
+        # Stops holding the job (it stays a draft on the server). Returns True if the job was held.
+        #
+        with self._lock:
+            entry = self._entries.pop(job_id, None)
+            if(entry is None):
+                return False
+
+            queue = self._pending[entry["rank"]]
+            queue[entry["tenant"]].remove(entry)
+            self._discard_empty(entry["rank"], entry["tenant"])
+            self._changed.notify_all()
+
+        return True
+
+
+    def held_jobs(self):
+        # IDs of held jobs, by priority class and submission order
+        with self._lock:
+            return [entry["job_id"] for entry in sorted(self._entries.values(), key=lambda entry: (entry["rank"], entry["seq"]))]
+
+
+    def close(self):
+        #
+        # Stops the scheduling thread. Held jobs stay drafts on the server (see held_jobs()).
+        #
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+
+        self._wake.set()
+        if(thread is not None):
+            thread.join()
+
+        with self._lock:
+            self._changed.notify_all()
+
+        return
+
+
+    def pump(self):
+        #
+        # One scheduling round: reads server queue and starts held jobs while fewer than max_queued of started jobs are queued.
+        # Called by the scheduling thread. Returns number of started jobs.
+        #
+        with self._lock:
+            if(len(self._entries) == 0 and len(self._released) == 0):
+                return 0
+
+        queued_ids = set(job["_id"] for job in self.qps_api.synth.list_jobs(status_filter="queued").get("list", []))
+
+        to_start = []
+        with self._lock:
+            now = time.monotonic()
+            self._server_queued = len(queued_ids)
+
+            # started jobs which left the queue are running (or finished)
+            for job_id in [job_id for job_id in self._released if job_id not in queued_ids]:
+                entry = self._released.pop(job_id)
+                stats = self._stats_of(entry["priority"])
+                stats["queue_wait"].append(now - entry["released"])
+                stats["total_wait"].append(now - entry["submitted"])
+
+            room = self.max_queued - len(self._released)
+            while(room > 0):
+                entry = self._next_entry()
+                if(entry is None):
+                    break
+                to_start.append(entry)
+                self._starting[entry["job_id"]] = entry
+                room -= 1
+
+        started = 0
+        for index, entry in enumerate(to_start):
+            try:
+                self.qps_api.synth.start_job(entry["job_id"])
+            except Exception as e:
+                status_code = _http_status(e)
+                if(status_code is not None and status_code < 500):
+                    # not a draft anymore (started, stopped or deleted elsewhere)
+                    _get_logger().warning(f"Scheduled job {entry['job_id']} could not be started (HTTP {status_code}). Dropping it.")
+                    with self._lock:
+                        del self._starting[entry["job_id"]]
+                        self._stats_of(entry["priority"])["dropped"] += 1
+                        self._changed.notify_all()
+                    continue
+
+                with self._lock:
+                    for failed_entry in reversed(to_start[index:]):
+                        del self._starting[failed_entry["job_id"]]
+                        self._requeue(failed_entry)
+                raise
+
+            with self._lock:
+                del self._starting[entry["job_id"]]
+                entry["released"] = time.monotonic()
+                self._released[entry["job_id"]] = entry
+
+                stats = self._stats_of(entry["priority"])
+                stats["released"] += 1
+                stats["local_wait"].append(entry["released"] - entry["submitted"])
+
+                self._changed.notify_all()
+            started += 1
+
+        return started
+
+
+    def stats(self):
+        #
+        # Held jobs by priority, started jobs still queued on server, server queue length (last seen) and per priority class:
+        # number of submitted / started / dropped jobs and wait statistics (seconds) of recent jobs:
+        # local_wait (held by scheduler), queue_wait (in server queue, measured per scheduling round) and total_wait (submit -> running)
+        #
+        with self._lock:
+            held = {}
+            for entry in self._entries.values():
+                held[entry["priority"]] = held.get(entry["priority"], 0) + 1
+
+            classes = {}
+            for priority, stats in self._stats.items():
+                classes[priority] = {
+                    "submitted": stats["submitted"],
+                    "released": stats["released"],
+                    "dropped": stats["dropped"],
+                    "local_wait": _wait_stats(stats["local_wait"]),
+                    "queue_wait": _wait_stats(stats["queue_wait"]),
+                    "total_wait": _wait_stats(stats["total_wait"])
+                }
+
+            return { "held": held, "released": len(self._released), "server_queued": self._server_queued, "classes": classes }
+
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {}
+
+        return
+
+
+    #
+    # Internals (called with lock held unless noted)
+    #
+
+    def _rank(self, priority):
+        # lock not required
+        if(isinstance(priority, int)):
+            return priority
+
+        if(priority not in self.PRIORITIES):
+            raise Exception("Unknown priority \"" + str(priority) + "\". Expected integer or one of: " + ", ".join(self.PRIORITIES) + ".")
+
+        return self.PRIORITIES[priority]
+
+
+    def _stats_of(self, priority):
+        stats = self._stats.get(priority)
+        if(stats is None):
+            stats = { "submitted": 0, "released": 0, "dropped": 0, "local_wait": deque(maxlen=_MAX_SAMPLES), "queue_wait": deque(maxlen=_MAX_SAMPLES), "total_wait": deque(maxlen=_MAX_SAMPLES) }
+            self._stats[priority] = stats
+
+        return stats
+
+
+    def _weight(self, tenant):
+        return self.tenant_weights.get(tenant, 1)
+
+
+    def _next_entry(self):
+        # highest priority class with held jobs, tenant with the least starts per weight, oldest job
+        for rank in sorted(self._pending):
+            queue = self._pending[rank]
+            tenant = min(queue, key=lambda tenant: (self._vtimes.get((rank, tenant), 0.0), queue[tenant][0]["seq"]))
+
+            entry = queue[tenant].popleft()
+            self._vtimes[(rank, tenant)] = self._vtimes.get((rank, tenant), 0.0) + 1.0 / self._weight(tenant)
+            self._discard_empty(rank, tenant)
+            del self._entries[entry["job_id"]]
+
+            return entry
+
+        return None
+
+
+    def _requeue(self, entry):
+        # entry taken by _next_entry() wasn't started: back to the front
+        rank = entry["rank"]
+        tenant = entry["tenant"]
+
+        self._vtimes[(rank, tenant)] = self._vtimes.get((rank, tenant), 0.0) - 1.0 / self._weight(tenant)
+        self._pending.setdefault(rank, {}).setdefault(tenant, deque()).appendleft(entry)
+        self._entries[entry["job_id"]] = entry
+
+        return
+
+
+    def _discard_empty(self, rank, tenant):
+        queue = self._pending[rank]
+        if(len(queue[tenant]) == 0):
+            del queue[tenant]
+        if(len(queue) == 0):
+            del self._pending[rank]
+
+        return
+
+
+    def _held(self, job_ids):
+        with self._lock:
+            return set(job_id for job_id in job_ids if job_id in self._entries or job_id in self._starting)
+
+
+    def _wait_released(self, job_ids, timeout=None):
+        #
+        # Waits until none of the jobs is held. Returns remaining timeout (None for no timeout).
+        #
+        started = time.monotonic()
+        with self._changed:
+            released = self._changed.wait_for(lambda: self._closed or all(job_id not in self._entries and job_id not in self._starting for job_id in job_ids), timeout)
+            held = [job_id for job_id in job_ids if job_id in self._entries or job_id in self._starting]
+
+        if(not released or len(held) > 0):
+            raise QPSTimeoutError(f"{len(held)} job(s) not started by scheduler: " + ", ".join(held), 0, time.monotonic() - started)
+
+        if(timeout is None):
+            return None
+
+        return max(0.0, timeout - (time.monotonic() - started))
+
+
+    def _run(self):
+        # scheduling thread (lock not held)
+        while True:
+            self._wake.clear()
+            if(self._closed):
+                return
+
+            try:
+                self.pump()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                _get_logger().warning(f"Scheduling round failed with {e.__class__.__name__}: {e}")
+
+            with self._lock:
+                busy = len(self._entries) > 0 or len(self._released) > 0
+
+            self._wake.wait(self.poll_interval if busy else None)
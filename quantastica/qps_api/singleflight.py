@@ -0,0 +1,111 @@
+import threading
+
+
+class _QCALL:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+        return
+
+
+class QSINGLEFLIGHT:
+    #
+    # Coalesces identical concurrent calls: while call with a key is in flight, other callers with the same key
+    # wait for it and receive its result (or exception) instead of making their own call
+    #
+    def __init__(self):
+        self._calls = {}
+        self._async_calls = {}
+        self._lock = threading.Lock()
+
+        self.reset_stats()
+
+        return
+
+
+    def do(self, key, function):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if(leader):
+                call = _QCALL()
+                self._calls[key] = call
+                self._stats["calls"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if(not leader):
+            call.event.wait()
+            if(call.error is not None):
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        return call.result
+
+
+    async def do_async(self, key, function):
+        #
+        # The same as do() for coroutines: function() returns awaitable. Calls are coalesced within one event loop.
+        #
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+
+        with self._lock:
+            future = self._async_calls.get(loop_key)
+            leader = future is None
+            if(leader):
+                future = loop.create_future()
+                self._async_calls[loop_key] = future
+                self._stats["calls"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if(not leader):
+            # shield: cancelling one waiting caller must not cancel the shared call
+            return await asyncio.shield(future)
+
+        try:
+            result = await function()
+        except BaseException as e:
+            if(isinstance(e, asyncio.CancelledError)):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # mark exception as retrieved: there may be no other callers
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._async_calls[loop_key]
+
+        return result
+
+
+    def stats(self):
+        # calls: calls actually made, coalesced: calls which shared result of a call in flight
+        with self._lock:
+            return dict(self._stats)
+
+
+    def reset_stats(self):
+        self._stats = { "calls": 0, "coalesced": 0 }
+
+        return
@@ -0,0 +1,580 @@
+import json
+import time
+import zlib
+import random
+import threading
+from collections import deque
+
+
+# job ID alphabet (the same as IDs issued by QPS)
+_ID_CHARACTERS = "23456789ABCDEFGHJKLMNPQRSTWXYZabcdefghijkmnopqrstuvwxyz"
+
+# list entry fields
+_LIST_FIELDS = ("_id", "name", "type", "status", "message", "createdAt", "modifiedAt", "queuedAt", "startedAt", "finishedAt")
+
+_JOB_ACTIONS = ("create", "start", "status", "get", "list", "stop", "stop_all", "reset")
+
+
+def _time_text(timestamp):
+    # e.g. "2021-02-06T23:39:29.108Z"
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(timestamp)) + ".%03dZ" % int((timestamp % 1) * 1000)
+
+
+def _decode_body(body, encoding):
+    if(encoding == "gzip"):
+        return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+
+    if(encoding == "deflate"):
+        return zlib.decompress(body)
+
+    return body
+
+
+def _make_handler():
+    from http.server import BaseHTTPRequestHandler
+
+    class QSTUBHANDLER(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        # send headers and body in one segment, otherwise keep-alive clients hit the delayed ACK timer
+        wbufsize = -1
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            self.server.stub._connection_opened(self.connection)
+
+        def finish(self):
+            self.server.stub._connection_closed(self.connection)
+            super().finish()
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            status_code, content_type, response, delay, headers = self.server.stub._request(self.path, self.headers, body)
+
+            if(delay > 0):
+                time.sleep(delay)
+
+            self.send_response(status_code)
+            self.send_header("Content-Type", content_type)
+            for name, value in headers.items():
+                self.send_header(name, value)
+
+            if(len(response) >= 1024 and self.server.stub.gzip_responses and "gzip" in self.headers.get("Accept-Encoding", "")):
+                compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+                response = compressor.compress(response) + compressor.flush()
+                self.send_header("Content-Encoding", "gzip")
+
+            self.server.stub._count_bytes_out(len(response))
+
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, format, *args):
+            return
+
+    return QSTUBHANDLER
+
+
+class QSTUBSERVER:
+    #
+    # In-process QPS server for tests and benchmarks: generator/job/*, qconvert and utils/random_circuit at http://127.0.0.1:<port>.
+    # Like the QPS solver, started jobs are queued and run one at a time, each for job_duration seconds.
+    # Latency, errors, timeouts and size of job output are configurable. Any token is accepted.
+    #
+    def __init__(self, latency=0.0, job_duration=0.1, num_circuits=1, circuit_gates=20, circuit_qubits=2, job_error_rate=0.0, error_rate=0.0, error_status=500, retry_after=None, timeout_rate=0.0, timeout_seconds=5.0, fault_endpoints=None, gzip_responses=True, seed=None, host="127.0.0.1", port=0):
+        # seconds added to each response
+        self.latency = latency
+
+        # seconds each job runs once it leaves the queue
+        self.job_duration = job_duration
+
+        # output of finished jobs: num_circuits circuits, each with circuit_gates gates on circuit_qubits qubits
+        self.num_circuits = num_circuits
+        self.circuit_gates = circuit_gates
+        self.circuit_qubits = circuit_qubits
+
+        # fraction of jobs which finish with status "error"
+        self.job_error_rate = job_error_rate
+
+        # fraction of requests answered with error_status (request is not processed)
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+        # Retry-After header (seconds) sent with injected errors and brownout responses. None: no header.
+        self.retry_after = retry_after
+
+        # fraction of requests which are processed but answered after timeout_seconds (client usually times out first)
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+
+        # endpoints (e.g. "generator/job/create") to which errors and timeouts are injected. None means all.
+        self.fault_endpoints = fault_endpoints
+
+        # large responses are gzipped if client accepts it
+        self.gzip_responses = gzip_responses
+
+        self.host = host
+        self.port = port
+        self.url = None
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self._jobs = {}
+        self._queue = deque()
+        self._running = None
+        self._running_until = None
+        self._brownout_until = 0.0
+        self._brownout_status = 503
+        self._output = None
+
+        self._server = None
+        self._thread = None
+        self._connections = set()
+
+        self.reset_stats()
+
+        return
+
+
+    def __enter__(self):
+        return self.start()
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+        return False
+
+
+    def start(self):
+        from http.server import ThreadingHTTPServer
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _make_handler())
+        self._server.daemon_threads = True
+        self._server.stub = self
+
+        self.url = "http://" + self.host + ":" + str(self._server.server_port)
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+        return self
+
+
+    def close(self):
+        import socket
+
+        if(self._server is not None):
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+        # also drop keep-alive connections, so clients see the server as down
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        return
+
+
+    def _connection_opened(self, connection):
+        with self._lock:
+            self._connections.add(connection)
+
+        return
+
+
+    def _connection_closed(self, connection):
+        with self._lock:
+            self._connections.discard(connection)
+
+        return
+
+
+    #
+    # Faults and statistics
+    #
+
+    def brownout(self, seconds, status=503):
+        # all requests fail with status for the next seconds
+        with self._lock:
+            self._brownout_until = time.monotonic() + seconds
+            self._brownout_status = status
+
+        return
+
+
+    def reset_stats(self):
+        # requests: by endpoint, bytes_in / bytes_out: request and response bodies as sent (compressed if compressed),
+        # errors / timeouts: injected faults, max_queue: longest queue of started jobs (including running job)
+        with self._lock:
+            self._stats = { "requests": {}, "bytes_in": 0, "bytes_out": 0, "errors": 0, "timeouts": 0, "jobs_created": 0, "jobs_finished": 0, "max_queue": 0 }
+
+        return
+
+
+    def stats(self):
+        with self._lock:
+            self._advance(time.time())
+
+            stats = dict(self._stats)
+            stats["requests"] = dict(stats["requests"])
+
+            statuses = {}
+            for job in self._jobs.values():
+                statuses[job["status"]] = statuses.get(job["status"], 0) + 1
+            stats["statuses"] = statuses
+
+        return stats
+
+
+    def _count_bytes_out(self, count):
+        with self._lock:
+            self._stats["bytes_out"] += count
+
+        return
+
+
+    #
+    # Jobs
+    #
+
+    def _new_id(self):
+        while True:
+            job_id = "".join(self._random.choice(_ID_CHARACTERS) for i in range(17))
+            if(job_id not in self._jobs):
+                return job_id
+
+
+    def add_job(self, job):
+        #
+        # Adds job directly (e.g. history of an account). Missing fields are filled in: status "done", timestamps.
+        # Added jobs are not run: their status changes only with update_job() (or stop/reset/start requests). Returns job ID.
+        #
+        with self._lock:
+            job = dict(job)
+            if("_id" not in job):
+                job["_id"] = self._new_id()
+
+            now = _time_text(time.time())
+            job.setdefault("status", "done")
+            job.setdefault("createdAt", now)
+            job.setdefault("modifiedAt", now)
+
+            self._jobs[job["_id"]] = job
+
+        return job["_id"]
+
+
+    def update_job(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields)
+            job["modifiedAt"] = _time_text(time.time())
+
+        return
+
+
+    def job(self, job_id):
+        with self._lock:
+            self._advance(time.time())
+            job = self._jobs.get(job_id)
+
+        return dict(job) if job is not None else None
+
+
+    def _job_output(self):
+        # the same output for all jobs, built once
+        if(self._output is None):
+            generator = random.Random(1)
+
+            circuits = []
+            for index in range(self.num_circuits):
+                program = []
+                lines = ["OPENQASM 2.0;", "include \"qelib1.inc\";", "qreg q[" + str(self.circuit_qubits) + "];"]
+                for gate_index in range(self.circuit_gates):
+                    if(self.circuit_qubits > 1 and gate_index % 3 == 2):
+                        wires = generator.sample(range(self.circuit_qubits), 2)
+                        program.append({ "name": "cx", "wires": wires, "options": {} })
+                        lines.append("cx q[" + str(wires[0]) + "], q[" + str(wires[1]) + "];")
+                    else:
+                        wire = generator.randrange(self.circuit_qubits)
+                        params = { "theta": generator.uniform(0, 3.14), "phi": generator.uniform(0, 3.14), "lambda": generator.uniform(0, 3.14) }
+                        program.append({ "name": "u3", "wires": [wire], "options": { "params": params } })
+                        lines.append("u3 (" + repr(params["theta"]) + ", " + repr(params["phi"]) + ", " + repr(params["lambda"]) + ") q[" + str(wire) + "];")
+
+                qasm = "\n".join(lines) + "\n"
+                circuits.append({ "qubits": self.circuit_qubits, "cregs": [], "program": program, "diff": 0, "index": index, "qasm": qasm, "qasmExt": qasm })
+
+            self._output = { "error_code": 0, "message": "", "time_taken": self.job_duration, "version": "stub", "circuits": circuits }
+
+        return self._output
+
+
+    def _finish(self, job, finished):
+        job["finishedAt"] = _time_text(finished)
+        job["modifiedAt"] = job["finishedAt"]
+        if(self._random.random() < self.job_error_rate):
+            job["status"] = "error"
+            job["message"] = "Injected job error"
+            job["output"] = { "error_code": 1, "message": "Injected job error", "circuits": [] }
+        else:
+            job["status"] = "done"
+            job["output"] = self._job_output()
+
+        self._stats["jobs_finished"] += 1
+
+        return
+
+
+    def _advance(self, now):
+        #
+        # Brings the queue up to now: finishes the running job when its time is up and starts the next one at that moment
+        #
+        while(self._running is not None and now >= self._running_until):
+            self._finish(self._jobs[self._running], self._running_until)
+
+            started = self._running_until
+            self._running = None
+            if(len(self._queue) > 0):
+                self._start_next(started)
+
+        if(self._running is None and len(self._queue) > 0):
+            self._start_next(now)
+
+        return
+
+
+    def _start_next(self, started):
+        job = self._jobs[self._queue.popleft()]
+        job["status"] = "running"
+        job["startedAt"] = _time_text(started)
+        job["modifiedAt"] = job["startedAt"]
+
+        self._running = job["_id"]
+        self._running_until = started + self.job_duration
+
+        return
+
+
+    def _unqueue(self, job):
+        # running or queued job back to draft
+        if(self._running == job["_id"]):
+            self._running = None
+        elif(job["_id"] in self._queue):
+            self._queue.remove(job["_id"])
+
+        job["status"] = "draft"
+        job["modifiedAt"] = _time_text(time.time())
+
+        return
+
+
+    #
+    # Requests
+    #
+
+    def _request(self, path, headers, body):
+        #
+        # Returns (status code, content type, response body, seconds to wait before responding, extra headers)
+        #
+        endpoint = path.split("?")[0].strip("/")
+        if(endpoint.startswith("api/")):
+            endpoint = endpoint[len("api/"):]
+
+        with self._lock:
+            requests = self._stats["requests"]
+            requests[endpoint] = requests.get(endpoint, 0) + 1
+            self._stats["bytes_in"] += len(body)
+
+            delay = self.latency
+            faulty = self.fault_endpoints is None or endpoint in self.fault_endpoints
+            draw = self._random.random() if faulty else 1.0
+
+            fault_headers = { "Retry-After": str(self.retry_after) } if self.retry_after is not None else {}
+
+            if(time.monotonic() < self._brownout_until):
+                self._stats["errors"] += 1
+                return self._brownout_status, "application/json", b"{\"message\": \"Service unavailable\"}", delay, fault_headers
+
+            if(draw < self.error_rate):
+                self._stats["errors"] += 1
+                return self.error_status, "application/json", b"{\"message\": \"Injected error\"}", delay, fault_headers
+
+            if(draw < self.error_rate + self.timeout_rate):
+                self._stats["timeouts"] += 1
+                delay += self.timeout_seconds
+
+        if(not headers.get("Authorization", "").startswith("Bearer ")):
+            return 401, "application/json", b"{\"message\": \"Unauthorized\"}", delay, {}
+
+        try:
+            data = json.loads(_decode_body(body, headers.get("Content-Encoding")) or b"{}")
+        except (ValueError, zlib.error):
+            return 400, "application/json", b"{\"message\": \"Invalid request body\"}", delay, {}
+
+        status_code, content_type, response = self._handle(endpoint, data)
+
+        return status_code, content_type, response, delay, {}
+
+
+    def _handle(self, endpoint, data):
+        #
+        # Returns (status code, content type, response body)
+        #
+        parts = endpoint.split("/")
+
+        if(endpoint == "qconvert"):
+            status_code, result = self._convert(data)
+            return status_code, "text/plain", result.encode("utf-8")
+
+        if(endpoint == "utils/random_circuit"):
+            status_code, result = self._random_circuit(data)
+            return status_code, "text/plain", result.encode("utf-8")
+
+        if(len(parts) == 3 and parts[0] == "generator" and parts[1] == "job" and parts[2] in _JOB_ACTIONS):
+            with self._lock:
+                now = time.time()
+                self._advance(now)
+                status_code, result = getattr(self, "_job_" + parts[2])(data, now)
+
+                # queue includes running job
+                self._stats["max_queue"] = max(self._stats["max_queue"], len(self._queue) + (self._running is not None))
+
+                # serialized while locked: result can be a stored job
+                return status_code, "application/json", json.dumps(result).encode("utf-8")
+
+        return 404, "application/json", b"{\"message\": \"Not found\"}"
+
+
+    def _find(self, data):
+        return self._jobs.get(data.get("_id"))
+
+
+    def _job_create(self, data, now):
+        job = dict(data)
+        job["_id"] = self._new_id()
+        job["status"] = "draft"
+        job["createdAt"] = _time_text(now)
+        job["modifiedAt"] = job["createdAt"]
+        job.setdefault("name", "")
+
+        self._jobs[job["_id"]] = job
+        self._stats["jobs_created"] += 1
+
+        return 200, { "_id": job["_id"], "status": "draft" }
+
+
+    def _job_start(self, data, now):
+        job = self._find(data)
+        if(job is None):
+            return 404, { "message": "Job not found" }
+        if(job["status"] != "draft"):
+            return 400, { "message": "Job is not in draft state" }
+
+        job["status"] = "queued"
+        job["queuedAt"] = _time_text(now)
+        job["modifiedAt"] = job["queuedAt"]
+        self._queue.append(job["_id"])
+        self._advance(now)
+
+        return 200, { "_id": job["_id"], "message": "OK" }
+
+
+    def _job_status(self, data, now):
+        job = self._find(data)
+        if(job is None):
+            return 404, { "message": "Job not found" }
+
+        return 200, { key: job[key] for key in ("_id", "name", "type", "status", "message") if key in job }
+
+
+    def _job_get(self, data, now):
+        job = self._find(data)
+        if(job is None):
+            return 404, { "message": "Job not found" }
+
+        return 200, job
+
+
+    def _job_list(self, data, now):
+        status = data.get("status")
+
+        return 200, { "list": [{ key: job[key] for key in _LIST_FIELDS if key in job } for job in self._jobs.values() if status is None or job["status"] == status] }
+
+
+    def _job_stop(self, data, now):
+        job = self._find(data)
+        if(job is None):
+            return 404, { "message": "Job not found" }
+        if(job["status"] in ("queued", "running")):
+            self._unqueue(job)
+            self._advance(now)
+
+        return 200, { "_id": job["_id"], "message": "OK" }
+
+
+    def _job_stop_all(self, data, now):
+        status = data.get("status")
+        statuses = (status,) if status is not None else ("running", "queued")
+
+        stopped = []
+        for job in list(self._jobs.values()):
+            if(job["status"] in statuses):
+                self._unqueue(job)
+                stopped.append({ "_id": job["_id"], "name": job.get("name"), "type": job.get("type") })
+        self._advance(now)
+
+        return 200, { "stopped": stopped }
+
+
+    def _job_reset(self, data, now):
+        job = self._find(data)
+        if(job is None):
+            return 404, { "message": "Job not found" }
+        if(job["status"] not in ("done", "error")):
+            return 400, { "message": "Job is not finished" }
+
+        job["status"] = "draft"
+        job["modifiedAt"] = _time_text(now)
+        for key in ("output", "message", "queuedAt", "startedAt", "finishedAt"):
+            job.pop(key, None)
+
+        return 200, { "_id": job["_id"], "message": "OK" }
+
+
+    def _convert(self, data):
+        for key in ("input", "source", "dest"):
+            if(key not in data):
+                return 400, "Missing \"" + key + "\""
+
+        # not a real conversion: output has the size of input
+        return 200, "// converted from " + data["source"] + " to " + data["dest"] + "\n" + data["input"]
+
+
+    def _random_circuit(self, data):
+        num_qubits = int(data.get("num_qubits", 5))
+        num_gates = int(data.get("num_gates", num_qubits * 5))
+        generator = random.Random(data.get("seed"))
+
+        lines = ["OPENQASM 2.0;", "include \"qelib1.inc\";", "qreg q[" + str(num_qubits) + "];"]
+        for gate_index in range(num_gates):
+            if(num_qubits > 1 and generator.random() < 0.3):
+                control, target = generator.sample(range(num_qubits), 2)
+                lines.append("cx q[" + str(control) + "], q[" + str(target) + "];")
+            else:
+                lines.append("u3 (" + repr(generator.uniform(0, 3.14)) + ", " + repr(generator.uniform(0, 3.14)) + ", " + repr(generator.uniform(0, 3.14)) + ") q[" + str(generator.randrange(num_qubits)) + "];")
+
+        qasm = "\n".join(lines) + "\n"
+        if(data.get("format") == "qasm"):
+            return 200, qasm
+
+        return 200, json.dumps({ "numQubits": num_qubits, "qasm": qasm })
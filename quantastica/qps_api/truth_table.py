@@ -0,0 +1,307 @@
+import csv
+from io import StringIO
+from copy import deepcopy
+from operator import itemgetter
+
+
+def _detect_delimiter(text):
+    count_commas = text.count(",")
+    count_tabs = text.count("\t")
+
+    return "," if count_commas > count_tabs else "\t"
+
+
+def _read_rows(truth_table, csv_delimiter):
+    #
+    # Yields (line_number, cells). Accepts CSV string, file object / iterable of CSV lines, 2D NumPy array or list of rows.
+    #
+    if(isinstance(truth_table, str)):
+        delimiter = csv_delimiter
+        if(delimiter is None or delimiter == ""):
+            delimiter = _detect_delimiter(truth_table)
+
+        reader = csv.reader(StringIO(truth_table.lstrip()), delimiter=delimiter)
+        for row in reader:
+            yield reader.line_num, row
+
+        return
+
+    if(hasattr(truth_table, "tolist") and hasattr(truth_table, "ndim")):
+        truth_table = truth_table.tolist()
+
+    line_number = 0
+    for row in truth_table:
+        line_number += 1
+
+        if(isinstance(row, str)):
+            # streaming CSV lines (e.g. open file)
+            delimiter = csv_delimiter
+            if(delimiter is None or delimiter == ""):
+                delimiter = _detect_delimiter(row)
+                csv_delimiter = delimiter
+
+            if(line_number == 1):
+                row = row.lstrip()
+            cells = next(csv.reader([row], delimiter=delimiter), [])
+        else:
+            cells = [str(int(cell)) if isinstance(cell, (bool, int, float)) else str(cell) for cell in row]
+
+        yield line_number, cells
+
+    return
+
+
+def _column_ignored(column_def):
+    column_type = column_def.get("type") if isinstance(column_def, dict) else column_def
+
+    return column_type in ("", "ignore", -1)
+
+
+def _compile_array(table, array):
+    #
+    # Vectorized path for numeric 2D NumPy arrays: validate and bit-pack all rows at once
+    #
+    import numpy
+
+    if(array.ndim != 2 or array.shape[1] != table.num_columns):
+        raise Exception("Truth table array must have shape (rows, " + str(table.num_columns) + "), got " + str(array.shape) + ".")
+
+    used = array[:, table.input_positions + table.output_positions]
+    binary = (used == 0) | (used == 1)
+    if(not binary.all()):
+        row, column = numpy.argwhere(~binary)[0]
+        position = (table.input_positions + table.output_positions)[column]
+        raise Exception("Line " + str(row + 1) + ", column " + str(position) + " (0-based): value \"" + str(used[row, column]) + "\" is not binary (0 or 1).")
+
+    def pack(positions):
+        weights = numpy.left_shift(numpy.int64(1), numpy.arange(len(positions) - 1, -1, -1, dtype=numpy.int64))
+        return (array[:, positions].astype(numpy.int64) @ weights).tolist()
+
+    for line_number, (input_bits, output_bits) in enumerate(zip(pack(table.input_positions), pack(table.output_positions)), 1):
+        table.add_bits(input_bits, output_bits, line_number)
+
+    return table
+
+
+def _build_coldefs(column_defs, first_line, first_line_title):
+    #
+    # Returns list of (column_position, coldef) sorted by coldef index
+    #
+    coldefs = []
+    col_index = 0
+    for column_def in column_defs:
+        coldef = {}
+
+        # column type
+        if(type(column_def) == str):
+            coldef["type"] = column_def
+        else:
+            coldef = deepcopy(column_def)
+
+        if("type" not in coldef):
+            raise Exception("Column " + str(col_index) + " (0-based) definition doesn't contain \"type\"")
+
+        if(type(coldef["type"]) == str):
+            if(coldef["type"] == "input"):
+                coldef["type"] = 0
+            elif(coldef["type"] == "output"):
+                coldef["type"] = 1
+            elif(coldef["type"] == "" or coldef["type"] == "ignore"):
+                coldef["type"] = -1
+            else:
+                raise Exception("Unknown column type \"" + coldef["type"] + "\"")
+
+        if(coldef["type"] > 1):
+            raise Exception("Unknown column type \"" + str(coldef["type"]) + "\"")
+
+        # column index
+        if("index" not in coldef):
+            coldef["index"] = col_index
+
+        #
+        # title
+        #
+        if("title" not in coldef):
+            if(first_line_title):
+                coldef["title"] = first_line[col_index]
+            else:
+                coldef["title"] = "Col" + str(col_index)
+
+        coldefs.append((col_index, coldef))
+        col_index += 1
+
+    # sort coldefs by index
+    coldefs.sort(key=lambda x: x[1]["index"])
+
+    # check if col indexes are unique
+    col_indexes = list(o[1]["index"] for o in coldefs)
+    if len(col_indexes) > len(set(col_indexes)):
+        raise Exception("Column indexes are not unique.")
+
+    return coldefs
+
+
+class QTRUTHTABLE:
+    def __init__(self, coldefs, has_header=False):
+        # (column_position, coldef) pairs sorted by coldef index, including ignored columns
+        self.all_coldefs = coldefs
+        self.has_header = has_header
+
+        # ignored columns are dropped
+        self.coldefs = [(position, coldef) for position, coldef in coldefs if coldef["type"] != -1]
+
+        self.input_positions = [position for position, coldef in self.coldefs if coldef["type"] == 0]
+        self.output_positions = [position for position, coldef in self.coldefs if coldef["type"] == 1]
+
+        # bit-packed table: input bits -> (output bits, line number). First input column is the most significant bit.
+        self.rows = {}
+
+        self.num_columns = len(coldefs)
+        self.num_duplicates = 0
+
+        return
+
+
+    def _pack(self, cells, positions, line_number):
+        bits = 0
+        for position in positions:
+            cell = cells[position].strip()
+            if(cell == "1"):
+                bits = (bits << 1) | 1
+            elif(cell == "0"):
+                bits = bits << 1
+            else:
+                raise Exception("Line " + str(line_number) + ", column " + str(position) + " (0-based): value \"" + cell + "\" is not binary (0 or 1).")
+
+        return bits
+
+
+    def add_row(self, cells, line_number=None):
+        if(len(cells) == 0 or (len(cells) == 1 and cells[0].strip() == "")):
+            # empty line
+            return
+
+        if(len(cells) != self.num_columns):
+            raise Exception("Line " + str(line_number) + " has " + str(len(cells)) + " columns, expected " + str(self.num_columns) + ".")
+
+        input_bits = self._pack(cells, self.input_positions, line_number)
+        output_bits = self._pack(cells, self.output_positions, line_number)
+
+        self.add_bits(input_bits, output_bits, line_number)
+
+        return
+
+
+    def add_bits(self, input_bits, output_bits, line_number=None):
+        existing = self.rows.get(input_bits)
+        if(existing is None):
+            self.rows[input_bits] = (output_bits, line_number)
+            return
+
+        if(existing[0] != output_bits):
+            raise Exception("Conflicting rows: line " + str(existing[1]) + " and line " + str(line_number) + " have the same inputs but different outputs.")
+
+        # duplicate row is merged
+        self.num_duplicates += 1
+
+        return
+
+
+    def num_rows(self):
+        return len(self.rows)
+
+
+    def num_inputs(self):
+        return len(self.input_positions)
+
+
+    def num_outputs(self):
+        return len(self.output_positions)
+
+
+    def payload_coldefs(self):
+        #
+        # coldefs of kept columns, renumbered to their position in to_csv() output
+        #
+        coldefs = []
+        for new_index, (position, coldef) in enumerate(self.coldefs):
+            coldef = dict(coldef)
+            coldef["index"] = new_index
+            coldefs.append(coldef)
+
+        return coldefs
+
+
+    def to_csv(self, delimiter=","):
+        #
+        # Rows sorted by inputs, ignored columns dropped, duplicates merged
+        #
+        num_inputs = self.num_inputs()
+        num_outputs = self.num_outputs()
+
+        # position of each output column's bit in concatenated "input bits + output bits" string
+        order = []
+        input_bit = 0
+        output_bit = 0
+        for position, coldef in self.coldefs:
+            if(coldef["type"] == 0):
+                order.append(input_bit)
+                input_bit += 1
+            else:
+                order.append(num_inputs + output_bit)
+                output_bit += 1
+
+        lines = []
+        if(self.has_header):
+            lines.append(delimiter.join(str(coldef["title"]) for position, coldef in self.coldefs))
+
+        if(len(order) > 0):
+            getter = itemgetter(*order)
+            input_format = "0" + str(num_inputs) + "b"
+            output_format = "0" + str(num_outputs) + "b"
+            for input_bits in sorted(self.rows):
+                output_bits = self.rows[input_bits][0]
+                bits = (format(input_bits, input_format) if num_inputs else "") + (format(output_bits, output_format) if num_outputs else "")
+                lines.append(delimiter.join(getter(bits)))
+
+        return "\n".join(lines) + "\n"
+
+
+def compile_truth_table(truth_table, column_defs, csv_delimiter=None):
+    #
+    # Parses and validates truth table locally. Raises Exception on malformed or conflicting rows.
+    #
+    if(getattr(getattr(truth_table, "dtype", None), "kind", None) in ("b", "i", "u", "f") and getattr(truth_table, "ndim", 0) == 2 and len(column_defs) <= 62):
+        table = QTRUTHTABLE(_build_coldefs(column_defs, [], False), False)
+        return _compile_array(table, truth_table)
+
+    rows = _read_rows(truth_table, csv_delimiter)
+
+    first = next(rows, None)
+    if(first is None):
+        raise Exception("Truth table is empty.")
+
+    first_line_number, first_line = first
+
+    # check if number of columns match number of column_defs
+    if(len(column_defs) != len(first_line)):
+        raise Exception("Number of columns (" + str(len(first_line)) + ") doesn't match number of column_defs (" + str(len(column_defs)) + ")")
+
+    # check if first line is title (text in ignored columns doesn't count)
+    first_line_title = False
+    for cell, column_def in zip(first_line, column_defs):
+        if(_column_ignored(column_def)):
+            continue
+        if(not cell.strip().isdigit()):
+            first_line_title = True
+            break
+
+    table = QTRUTHTABLE(_build_coldefs(column_defs, first_line, first_line_title), first_line_title)
+
+    if(not first_line_title):
+        table.add_row(first_line, first_line_number)
+
+    for line_number, cells in rows:
+        table.add_row(cells, line_number)
+
+    return table
@@ -0,0 +1,674 @@
+import ast
+import math
+import cmath
+
+from .qasm import QCIRCUIT, parse_qasm
+
+
+# Circuits are simulated in batches of at most this many complex amplitudes (circuits x vectors/columns x 2^num_qubits),
+# small enough to stay in CPU cache. Larger problems (e.g. 12-qubit unitary) are split into chunks of columns, so the full unitary is never built.
+MAX_BATCH_ELEMENTS = 1 << 17
+
+DIFF_METHODS = ("distance", "ignorephase", "abs", "hs")
+
+_CONSTANTS = { "pi": math.pi, "e": math.e, "i": 1j, "j": 1j }
+
+_FUNCTIONS = {
+    "sin": cmath.sin,
+    "cos": cmath.cos,
+    "tan": cmath.tan,
+    "asin": cmath.asin,
+    "acos": cmath.acos,
+    "atan": cmath.atan,
+    "exp": cmath.exp,
+    "ln": cmath.log,
+    "log": cmath.log,
+    "sqrt": cmath.sqrt
+}
+
+_OPERATORS = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: a / b,
+    ast.Pow: lambda a, b: a ** b
+}
+
+
+def _evaluate_node(node, text):
+    if(isinstance(node, ast.Constant) and type(node.value) in (int, float, complex)):
+        return node.value
+
+    if(isinstance(node, ast.Name) and node.id in _CONSTANTS):
+        return _CONSTANTS[node.id]
+
+    if(isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd))):
+        value = _evaluate_node(node.operand, text)
+        return -value if isinstance(node.op, ast.USub) else value
+
+    if(isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS):
+        return _OPERATORS[type(node.op)](_evaluate_node(node.left, text), _evaluate_node(node.right, text))
+
+    if(isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS and len(node.args) == 1 and len(node.keywords) == 0):
+        return _FUNCTIONS[node.func.id](_evaluate_node(node.args[0], text))
+
+    if(isinstance(node, (ast.List, ast.Tuple))):
+        return [_evaluate_node(element, text) for element in node.elts]
+
+    raise Exception("Cannot evaluate \"" + text + "\".")
+
+
+def _evaluate(text):
+    #
+    # Numeric value of expression used in QASM params and vector/matrix text (e.g. "pi/2", "1/sqrt(2)", "(0.5+0.5j)", "[1, 0]").
+    # Only numbers, pi, e, i, arithmetic and elementary functions are allowed (nothing is executed).
+    #
+    if(not isinstance(text, str)):
+        return text
+
+    try:
+        tree = ast.parse(text.strip().replace("^", "**"), mode="eval")
+    except SyntaxError:
+        raise Exception("Cannot evaluate \"" + text + "\".")
+
+    return _evaluate_node(tree.body, text)
+
+
+def _real(value, text):
+    if(isinstance(value, str)):
+        try:
+            # most params in server output are plain numbers
+            return float(value)
+        except ValueError:
+            value = _evaluate(value)
+
+    if(isinstance(value, complex)):
+        if(abs(value.imag) > 1e-12):
+            raise Exception("Gate parameter \"" + str(text) + "\" is not real.")
+        value = value.real
+
+    return float(value)
+
+
+#
+# Gate matrices (rows of Python numbers). Multi-qubit gates: first argument is the most significant qubit.
+#
+
+_SQRT1_2 = math.sqrt(0.5)
+
+_IDENTITY = [[1, 0], [0, 1]]
+_X = [[0, 1], [1, 0]]
+_Y = [[0, -1j], [1j, 0]]
+_Z = [[1, 0], [0, -1]]
+_H = [[_SQRT1_2, _SQRT1_2], [_SQRT1_2, -_SQRT1_2]]
+_SX = [[(1 + 1j) / 2, (1 - 1j) / 2], [(1 - 1j) / 2, (1 + 1j) / 2]]
+_SXDG = [[(1 - 1j) / 2, (1 + 1j) / 2], [(1 + 1j) / 2, (1 - 1j) / 2]]
+_SWAP = [[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]]
+_ISWAP = [[1, 0, 0, 0], [0, 0, 1j, 0], [0, 1j, 0, 0], [0, 0, 0, 1]]
+
+
+def _u3(theta, phi, lam):
+    c = math.cos(theta / 2)
+    s = math.sin(theta / 2)
+
+    return [[c, -cmath.exp(1j * lam) * s], [cmath.exp(1j * phi) * s, cmath.exp(1j * (phi + lam)) * c]]
+
+
+def _phase(lam):
+    return [[1, 0], [0, cmath.exp(1j * lam)]]
+
+
+def _rx(theta):
+    c = math.cos(theta / 2)
+    s = math.sin(theta / 2)
+
+    return [[c, -1j * s], [-1j * s, c]]
+
+
+def _ry(theta):
+    c = math.cos(theta / 2)
+    s = math.sin(theta / 2)
+
+    return [[c, -s], [s, c]]
+
+
+def _rz(phi):
+    return [[cmath.exp(-0.5j * phi), 0], [0, cmath.exp(0.5j * phi)]]
+
+
+def _gpi(phi):
+    return [[0, cmath.exp(-1j * phi)], [cmath.exp(1j * phi), 0]]
+
+
+def _gpi2(phi):
+    return [[_SQRT1_2, -1j * _SQRT1_2 * cmath.exp(-1j * phi)], [-1j * _SQRT1_2 * cmath.exp(1j * phi), _SQRT1_2]]
+
+
+def _rxx(theta):
+    c = math.cos(theta / 2)
+    s = -1j * math.sin(theta / 2)
+
+    return [[c, 0, 0, s], [0, c, s, 0], [0, s, c, 0], [s, 0, 0, c]]
+
+
+def _ryy(theta):
+    c = math.cos(theta / 2)
+    s = 1j * math.sin(theta / 2)
+
+    return [[c, 0, 0, s], [0, c, -s, 0], [0, -s, c, 0], [s, 0, 0, c]]
+
+
+def _rzz(theta):
+    a = cmath.exp(-0.5j * theta)
+    b = cmath.exp(0.5j * theta)
+
+    return [[a, 0, 0, 0], [0, b, 0, 0], [0, 0, b, 0], [0, 0, 0, a]]
+
+
+def _controlled(matrix, controls=1):
+    # matrix acts on the last qubits when all (leading) control qubits are 1
+    size = len(matrix)
+    total = size << controls
+    offset = total - size
+
+    rows = [[1 if column == row else 0 for column in range(total)] for row in range(offset)]
+    for row in matrix:
+        rows.append([0] * offset + list(row))
+
+    return rows
+
+
+# name -> (number of params, function(*params) returning matrix rows)
+_GATES = {
+    "id": (0, lambda: _IDENTITY),
+    "u0": (1, lambda gamma: _IDENTITY),
+    "x": (0, lambda: _X),
+    "y": (0, lambda: _Y),
+    "z": (0, lambda: _Z),
+    "h": (0, lambda: _H),
+    "s": (0, lambda: _phase(math.pi / 2)),
+    "sdg": (0, lambda: _phase(-math.pi / 2)),
+    "t": (0, lambda: _phase(math.pi / 4)),
+    "tdg": (0, lambda: _phase(-math.pi / 4)),
+    "sx": (0, lambda: _SX),
+    "sxdg": (0, lambda: _SXDG),
+    "srn": (0, lambda: _SX),
+    "srndg": (0, lambda: _SXDG),
+    "r2": (0, lambda: _phase(math.pi / 2)),
+    "r4": (0, lambda: _phase(math.pi / 4)),
+    "r8": (0, lambda: _phase(math.pi / 8)),
+    "rx": (1, _rx),
+    "ry": (1, _ry),
+    "rz": (1, _rz),
+    "p": (1, _phase),
+    "u1": (1, _phase),
+    "u2": (2, lambda phi, lam: _u3(math.pi / 2, phi, lam)),
+    "u3": (3, _u3),
+    "u": (3, _u3),
+    "U": (3, _u3),
+    "gpi": (1, _gpi),
+    "gpi2": (1, _gpi2),
+    "cx": (0, lambda: _controlled(_X)),
+    "CX": (0, lambda: _controlled(_X)),
+    "cy": (0, lambda: _controlled(_Y)),
+    "cz": (0, lambda: _controlled(_Z)),
+    "ch": (0, lambda: _controlled(_H)),
+    "csx": (0, lambda: _controlled(_SX)),
+    "crx": (1, lambda theta: _controlled(_rx(theta))),
+    "cry": (1, lambda theta: _controlled(_ry(theta))),
+    "crz": (1, lambda phi: _controlled(_rz(phi))),
+    "cp": (1, lambda lam: _controlled(_phase(lam))),
+    "cu1": (1, lambda lam: _controlled(_phase(lam))),
+    "cr2": (0, lambda: _controlled(_phase(math.pi / 2))),
+    "cr4": (0, lambda: _controlled(_phase(math.pi / 4))),
+    "cr8": (0, lambda: _controlled(_phase(math.pi / 8))),
+    "cu3": (3, lambda theta, phi, lam: _controlled(_u3(theta, phi, lam))),
+    "cu": (4, lambda theta, phi, lam, gamma: _controlled([[cmath.exp(1j * gamma) * value for value in row] for row in _u3(theta, phi, lam)])),
+    "swap": (0, lambda: _SWAP),
+    "iswap": (0, lambda: _ISWAP),
+    "rxx": (1, _rxx),
+    "ryy": (1, _ryy),
+    "rzz": (1, _rzz),
+    "ccx": (0, lambda: _controlled(_X, 2)),
+    "cswap": (0, lambda: _controlled(_SWAP)),
+    "c3x": (0, lambda: _controlled(_X, 3)),
+    "c4x": (0, lambda: _controlled(_X, 4))
+}
+
+
+#
+# Circuits
+#
+
+def _circuit_gates(circuit):
+    #
+    # Returns (num_qubits, [(name, params, qubits)]) of QCIRCUIT, QASM string or circuit object from job output
+    # ("qasm" is used if present, then "qasmExt", then "program").
+    #
+    if(isinstance(circuit, dict)):
+        qasm = circuit.get("qasm") or circuit.get("qasmExt")
+        if(qasm is None):
+            if("program" not in circuit):
+                raise Exception("Circuit has no \"qasm\", \"qasmExt\" or \"program\".")
+
+            gates = []
+            for gate in circuit["program"]:
+                params = (gate.get("options") or {}).get("params") or {}
+                gates.append((gate["name"], list(params.values()), tuple(gate["wires"])))
+
+            num_qubits = circuit.get("qubits")
+            if(num_qubits is None):
+                num_qubits = max((max(qubits) + 1 for name, params, qubits in gates if len(qubits) > 0), default=0)
+
+            return num_qubits, gates
+
+        circuit = qasm
+
+    if(isinstance(circuit, str)):
+        circuit = parse_qasm(circuit)
+
+    if(not isinstance(circuit, QCIRCUIT)):
+        raise Exception("Expected QCIRCUIT, QASM string or circuit object, got " + type(circuit).__name__ + ".")
+
+    gates = []
+    for gate in circuit.gates:
+        if(gate.condition is not None or len(gate.clbits) > 0):
+            raise Exception("Circuit is not unitary: it contains \"" + gate.name + "\" with classical bits.")
+        gates.append((gate.name, gate.params, gate.qubits))
+
+    return circuit.num_qubits, gates
+
+
+def _embed(np, matrix, qubits, block_qubits):
+    # matrix of gate on qubits as matrix of op on block_qubits (superset)
+    if(len(qubits) == 1 and len(block_qubits) == 2):
+        # the same as kron(matrix, I) / kron(I, matrix), without kron's overhead (this runs for most gates)
+        embedded = np.zeros((2, 2, 2, 2), dtype=complex)
+        if(qubits[0] == block_qubits[0]):
+            embedded[:, 0, :, 0] = matrix
+            embedded[:, 1, :, 1] = matrix
+        else:
+            embedded[0, :, 0, :] = matrix
+            embedded[1, :, 1, :] = matrix
+        return embedded.reshape(4, 4)
+
+    size = 1 << len(block_qubits)
+    identity = np.eye(size, dtype=complex).reshape((1, size) + (2,) * len(block_qubits))
+    positions = [block_qubits.index(qubit) for qubit in qubits]
+
+    return _apply(np, identity, positions, matrix[None]).reshape(size, size).T
+
+
+def _compile(np, circuit):
+    #
+    # Returns (num_qubits, [(qubits, matrix)]). Gates are fused, so each op is one pass over the state:
+    #   - single-qubit gate is merged into the last op on its qubit
+    #   - single-qubit ops which are the last ops on qubits of a multi-qubit gate are merged into it
+    #   - gate on the same qubits as the last op on all of them is merged into it
+    # Fusion depends only on gate qubits, so circuits with the same structure are still compiled to the same structure.
+    #
+    num_qubits, gates = _circuit_gates(circuit)
+
+    # fused ops are replaced with None
+    ops = []
+
+    # qubit -> index in ops of the last op on it
+    last_op = {}
+
+    # the same gate with the same params is repeated many times in large circuits
+    matrices = {}
+
+    for name, params, qubits in gates:
+        if(name == "barrier"):
+            continue
+
+        if(name not in _GATES):
+            raise Exception("Gate \"" + name + "\" is not supported by local verifier.")
+
+        num_params, function = _GATES[name]
+        if(len(params) != num_params):
+            raise Exception("Gate \"" + name + "\" expects " + str(num_params) + " parameter(s), got " + str(len(params)) + ".")
+
+        matrix_key = (name, tuple(params))
+        matrix = matrices.get(matrix_key)
+        if(matrix is None):
+            matrix = np.array(function(*[_real(param, param) for param in params]), dtype=complex)
+            matrices[matrix_key] = matrix
+
+        qubits = tuple(qubits)
+        if(matrix.shape[0] != 1 << len(qubits) or len(set(qubits)) != len(qubits) or min(qubits, default=0) < 0 or max(qubits, default=0) >= num_qubits):
+            raise Exception("Gate \"" + name + "\" applied to invalid qubits " + str(list(qubits)) + ".")
+
+        previous = set(last_op.get(qubit) for qubit in qubits)
+        if(len(previous) == 1 and None not in previous):
+            index = previous.pop()
+            block_qubits, block_matrix = ops[index]
+            if(block_qubits == qubits):
+                ops[index] = (qubits, matrix @ block_matrix)
+                continue
+            if(set(qubits) <= set(block_qubits)):
+                ops[index] = (block_qubits, _embed(np, matrix, qubits, block_qubits) @ block_matrix)
+                continue
+
+        if(len(qubits) > 1):
+            for qubit in qubits:
+                index = last_op.get(qubit)
+                if(index is not None and ops[index][0] == (qubit,)):
+                    matrix = matrix @ _embed(np, ops[index][1], (qubit,), qubits)
+                    ops[index] = None
+
+        for qubit in qubits:
+            last_op[qubit] = len(ops)
+        ops.append((qubits, matrix))
+
+    return num_qubits, [op for op in ops if op is not None]
+
+
+def _apply(np, state, qubits, matrices):
+    #
+    # state: (circuits, vectors, 2, ..., 2) with one axis per qubit (qubit 0 is the most significant).
+    # matrices: (circuits, d, d) - one matrix per circuit, applied with a single batched contraction over gate qubits only.
+    #
+    count = len(qubits)
+    axes = [2 + qubit for qubit in qubits]
+    targets = list(range(state.ndim - count, state.ndim))
+
+    moved = np.moveaxis(state, axes, targets)
+    shape = moved.shape
+    result = np.matmul(moved.reshape(shape[0], -1, 1 << count), matrices.transpose(0, 2, 1))
+
+    return np.moveaxis(result.reshape(shape), targets, axes)
+
+
+def _simulate(np, ops_batch, num_qubits, inputs):
+    #
+    # ops_batch: list of op lists with the same structure (one per circuit). inputs: (vectors, 2^num_qubits).
+    # Returns (circuits, vectors, 2^num_qubits).
+    #
+    state = np.broadcast_to(inputs.reshape((1, inputs.shape[0]) + (2,) * num_qubits), (len(ops_batch), inputs.shape[0]) + (2,) * num_qubits)
+
+    for position, (qubits, matrix) in enumerate(ops_batch[0]):
+        matrices = np.stack([ops[position][1] for ops in ops_batch]) if len(ops_batch) > 1 else matrix[None]
+        state = _apply(np, state, qubits, matrices)
+
+    if(len(ops_batch[0]) == 0):
+        state = np.array(state)
+
+    return state.reshape(len(ops_batch), inputs.shape[0], 1 << num_qubits)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise Exception("Local circuit verification requires NumPy (pip install numpy).")
+
+    return numpy
+
+
+def _endianness_order(np, num_qubits, endianness):
+    #
+    # Index permutation from external vector/matrix order to internal (big endian) order, or None if the same
+    #
+    if(endianness == "big"):
+        return None
+
+    if(endianness != "little"):
+        raise Exception("Unknown endianness \"" + str(endianness) + "\". Expected \"little\" or \"big\".")
+
+    return np.arange(1 << num_qubits).reshape((2,) * num_qubits).transpose().reshape(-1)
+
+
+def _num_qubits(length, what):
+    if(length == 0 or length & (length - 1) != 0):
+        raise Exception(what + " length must be a power of 2, got " + str(length) + ".")
+
+    return length.bit_length() - 1
+
+
+#
+# Distance
+#
+
+def _column_stats(np, output, target):
+    # per circuit and vector/column: <target|output>, |output|^2, |target|^2, |output - target|^2, ||output| - |target||^2
+    return (
+        np.einsum("cbn,bn->cb", output, target.conj()),
+        np.einsum("cbn,cbn->cb", output.conj(), output).real,
+        np.einsum("bn,bn->b", target.conj(), target).real,
+        (abs(output - target) ** 2).sum(axis=2),
+        ((abs(output) - abs(target)) ** 2).sum(axis=2)
+    )
+
+
+def _diffs(np, stats, diff_method, per_vector):
+    #
+    # Vectors: distance of each pair, maximum over pairs. Unitary: root mean square over columns (ignorephase: one global phase).
+    #
+    inner, output_norm, target_norm, distance, abs_distance = stats
+
+    if(per_vector):
+        if(diff_method == "distance"):
+            diffs = np.sqrt(distance)
+        elif(diff_method == "ignorephase"):
+            diffs = np.sqrt(np.maximum(output_norm + target_norm - 2 * abs(inner), 0.0))
+        elif(diff_method == "abs"):
+            diffs = np.sqrt(abs_distance)
+        else:
+            diffs = 1.0 - abs(inner) / np.sqrt(output_norm * target_norm)
+
+        return diffs.max(axis=1)
+
+    dimension = inner.shape[1]
+    if(diff_method == "distance"):
+        return np.sqrt(distance.sum(axis=1) / dimension)
+    if(diff_method == "ignorephase"):
+        return np.sqrt(np.maximum(output_norm.sum(axis=1) + target_norm.sum() - 2 * abs(inner.sum(axis=1)), 0.0) / dimension)
+    if(diff_method == "abs"):
+        return np.sqrt(abs_distance.sum(axis=1) / dimension)
+
+    return 1.0 - abs(inner.sum(axis=1)) / dimension
+
+
+def _verify(np, compiled, num_qubits, count, inputs, targets, per_vector, diff_method):
+    #
+    # compiled: [(num_qubits, ops)] of circuits.
+    # inputs(start, stop), targets(start, stop): internal-order (stop - start, 2^num_qubits) arrays of vectors/columns.
+    # Circuits with the same structure (gate qubits) are simulated together, one batched contraction per gate.
+    # Returns list of diffs in order of circuits.
+    #
+    groups = {}
+    for index, (circuit_qubits, ops) in enumerate(compiled):
+        if(circuit_qubits > num_qubits):
+            raise Exception("Circuit has " + str(circuit_qubits) + " qubits but problem has " + str(num_qubits) + ".")
+
+        structure = tuple(qubits for qubits, matrix in ops)
+        groups.setdefault(structure, []).append((index, ops))
+
+    dimension = 1 << num_qubits
+    chunk = max(1, min(count, MAX_BATCH_ELEMENTS // dimension))
+
+    diffs = [None] * len(compiled)
+    for members in groups.values():
+        circuits_per_batch = max(1, MAX_BATCH_ELEMENTS // (dimension * chunk))
+        for batch_start in range(0, len(members), circuits_per_batch):
+            batch = members[batch_start:batch_start + circuits_per_batch]
+            ops_batch = [ops for index, ops in batch]
+
+            chunks = []
+            for start in range(0, count, chunk):
+                stop = min(count, start + chunk)
+                output = _simulate(np, ops_batch, num_qubits, inputs(start, stop))
+                chunks.append(_column_stats(np, output, targets(start, stop)))
+            stats = tuple(np.concatenate(parts, axis=-1) for parts in zip(*chunks))
+
+            for (index, ops), diff in zip(batch, _diffs(np, stats, diff_method, per_vector).tolist()):
+                diffs[index] = diff
+
+    return diffs
+
+
+def _basis(np, dimension):
+    def inputs(start, stop):
+        columns = np.zeros((stop - start, dimension), dtype=complex)
+        columns[np.arange(stop - start), np.arange(start, stop)] = 1
+        return columns
+
+    return inputs
+
+
+def _results(circuits, diffs, max_diff):
+    results = []
+    for index, (circuit, diff) in enumerate(zip(circuits, diffs)):
+        circuit_index = circuit.get("index", index) if isinstance(circuit, dict) else index
+        reported_diff = circuit.get("diff") if isinstance(circuit, dict) else None
+        results.append({ "index": circuit_index, "diff": diff, "reported_diff": reported_diff, "valid": diff <= max_diff })
+
+    return results
+
+
+def _array(np, rows):
+    #
+    # 2D complex array of matrix or list of vectors. Rows (and the whole matrix) can be text, elements can be expressions.
+    #
+    if(isinstance(rows, str)):
+        rows = _evaluate(rows)
+
+    if(hasattr(rows, "ndim")):
+        return np.array(rows, dtype=complex)
+
+    values = []
+    for row in rows:
+        if(isinstance(row, str)):
+            row = _evaluate(row)
+        if(not hasattr(row, "ndim")):
+            row = [_evaluate(element) for element in row]
+        values.append(row)
+
+    return np.array(values, dtype=complex)
+
+
+def circuit_unitary(circuit, endianness="big"):
+    #
+    # Unitary matrix of QCIRCUIT, QASM string or circuit object from job output, as NumPy array
+    #
+    np = _numpy()
+
+    num_qubits, ops = _compile(np, circuit)
+    dimension = 1 << num_qubits
+
+    unitary = _simulate(np, [ops], num_qubits, np.eye(dimension, dtype=complex))[0].T
+    order = _endianness_order(np, num_qubits, endianness)
+    if(order is not None):
+        inverse = np.argsort(order)
+        unitary = unitary[np.ix_(inverse, inverse)]
+
+    return unitary
+
+
+def verify_circuits(circuits, unitary=None, vector_pairs=None, source_circuit=None, endianness="big", max_diff=1e-3, diff_method="distance"):
+    #
+    # Checks circuits (QCIRCUIT, QASM strings or circuit objects from job output) against exactly one of:
+    #   - unitary: matrix
+    #   - vector_pairs: [(input, output)]. endianness can be a pair (input endianness, output endianness).
+    #   - source_circuit: circuit which should be equivalent (e.g. input of transpile)
+    # Returns [{ "index", "diff", "reported_diff", "valid" }] in order of circuits.
+    #
+    np = _numpy()
+
+    if(sum(value is not None for value in (unitary, vector_pairs, source_circuit)) != 1):
+        raise Exception("Exactly one of unitary, vector_pairs or source_circuit is required.")
+
+    if(diff_method not in DIFF_METHODS):
+        raise Exception("Unknown diff_method \"" + str(diff_method) + "\". Expected one of: " + ", ".join(DIFF_METHODS) + ".")
+
+    circuits = list(circuits)
+    compiled = [_compile(np, circuit) for circuit in circuits]
+
+    if(vector_pairs is not None):
+        vector_pairs = list(vector_pairs)
+        input_vectors = _array(np, [pair[0] for pair in vector_pairs])
+        output_vectors = _array(np, [pair[1] for pair in vector_pairs])
+        if(input_vectors.ndim != 2 or output_vectors.shape != input_vectors.shape):
+            raise Exception("All vectors must be of the same length.")
+
+        num_qubits = _num_qubits(input_vectors.shape[1], "Vector")
+
+        endianness1, endianness2 = endianness if isinstance(endianness, (list, tuple)) else (endianness, endianness)
+        order = _endianness_order(np, num_qubits, endianness1)
+        if(order is not None):
+            input_vectors = input_vectors[:, order]
+        order = _endianness_order(np, num_qubits, endianness2)
+        if(order is not None):
+            output_vectors = output_vectors[:, order]
+
+        diffs = _verify(np, compiled, num_qubits, len(input_vectors), lambda start, stop: input_vectors[start:stop], lambda start, stop: output_vectors[start:stop], True, diff_method)
+
+        return _results(circuits, diffs, max_diff)
+
+    if(unitary is not None):
+        matrix = _array(np, unitary)
+        num_qubits = _num_qubits(matrix.shape[0], "Matrix")
+        if(matrix.shape != (1 << num_qubits, 1 << num_qubits)):
+            raise Exception("Matrix must be square.")
+
+        order = _endianness_order(np, num_qubits, endianness)
+        if(order is not None):
+            matrix = matrix[np.ix_(order, order)]
+
+        basis = _basis(np, 1 << num_qubits)
+
+        # columns as rows
+        columns = matrix.T
+        targets = lambda start, stop: columns[start:stop]
+    else:
+        # expected columns are computed chunk by chunk from source circuit, the same way as columns of the circuits
+        source_qubits, source_ops = _compile(np, source_circuit)
+        num_qubits = max([source_qubits] + [circuit_qubits for circuit_qubits, ops in compiled])
+
+        basis = _basis(np, 1 << num_qubits)
+        targets = lambda start, stop: _simulate(np, [source_ops], num_qubits, basis(start, stop))[0]
+
+    diffs = _verify(np, compiled, num_qubits, 1 << num_qubits, basis, targets, False, diff_method)
+
+    return _results(circuits, diffs, max_diff)
+
+
+def _text_lines(text):
+    return [line for line in text.splitlines() if line.strip() != ""]
+
+
+def verify_job(job, circuits=None, max_diff=None, diff_method=None):
+    #
+    # Recomputes diff of circuits in job output (or given circuits, e.g. from iter_circuits()) against the job's problem.
+    # max_diff and diff_method default to the job's settings.
+    #
+    settings = job.get("settings") or {}
+    if(max_diff is None):
+        max_diff = settings.get("max_diff", 1e-3)
+    if(diff_method is None):
+        diff_method = settings.get("diff_method", "distance")
+    if(circuits is None):
+        circuits = job.get("output", {}).get("circuits", [])
+
+    source = job.get("source") or {}
+    job_type = job.get("type")
+
+    if(job_type == "vectors"):
+        problem = job.get("problem")
+        if(problem):
+            vector_pairs = [(pair["input"], pair["output"]) for pair in problem]
+        else:
+            vector_pairs = list(zip(_text_lines(source["vectors"]["text1"]), _text_lines(source["vectors"]["text2"])))
+
+        endianness = (source.get("vectors", {}).get("endianness1", "little"), source.get("vectors", {}).get("endianness2", "little"))
+
+        return verify_circuits(circuits, vector_pairs=vector_pairs, endianness=endianness, max_diff=max_diff, diff_method=diff_method)
+
+    if(job_type == "unitary"):
+        return verify_circuits(circuits, unitary=source["unitary"]["text"], endianness=source["unitary"].get("endianness", "big"), max_diff=max_diff, diff_method=diff_method)
+
+    if(job_type == "circuit"):
+        return verify_circuits(circuits, source_circuit=source["circuit"]["qasm"], max_diff=max_diff, diff_method=diff_method)
+
+    raise Exception("Jobs of type \"" + str(job_type) + "\" cannot be verified locally.")
@@ -39,7 +39,7 @@ setup(
         ],
 
     namespace_packages=["quantastica"],
-    packages=find_namespace_packages(),
+    packages=find_namespace_packages(include=["quantastica.*"]),
     include_package_data=True,
     install_requires=["requests"],
     entry_points={}
@@ -0,0 +1,94 @@
+#
+# Shared fixtures: in-process stub servers (QSTUBSERVER) and QPSAPI clients talking to them. Everything is closed after the test.
+#
+
+import pytest
+
+from quantastica.qps_api import QPSAPI, AsyncQPSAPI, QRETRYPOLICY
+from quantastica.qps_api.stub_server import QSTUBSERVER
+
+
+def vectors_problem(seed=None, name=None):
+    problem = { "type": "vectors", "source": { "vectors": { "text1": "[1, 0]", "text2": "[0, 1]" } } }
+    if(seed is not None):
+        problem["settings"] = { "seed": seed }
+    if(name is not None):
+        problem["name"] = name
+
+    return problem
+
+
+@pytest.fixture
+def problem():
+    # vectors problem, distinct for each seed
+    return vectors_problem
+
+
+@pytest.fixture
+def make_stub():
+    # QSTUBSERVER(**options), started. Jobs finish immediately unless job_duration is given.
+    stubs = []
+
+    def make(**options):
+        options.setdefault("job_duration", 0.0)
+        options.setdefault("seed", len(stubs) + 1)
+        stub = QSTUBSERVER(**options).start()
+        stubs.append(stub)
+        return stub
+
+    yield make
+
+    for stub in stubs:
+        stub.close()
+
+
+@pytest.fixture
+def stub(make_stub):
+    return make_stub()
+
+
+@pytest.fixture
+def make_client():
+    # QPSAPI using the stub with fast retries and polling, no pending job records. attributes override QPSAPI attributes.
+    clients = []
+
+    def make(stub, **attributes):
+        api = QPSAPI()
+        api.use_account("stub-token", stub.url)
+        api.pending_jobs = None
+        api.retry_policy = QRETRYPOLICY(base_delay=0.001, max_delay=0.001)
+        api.poll_strategy.initial_interval = 0.01
+        api.poll_strategy.max_interval = 0.05
+        for name, value in attributes.items():
+            setattr(api, name, value)
+        clients.append(api)
+        return api
+
+    yield make
+
+    for api in clients:
+        api.close()
+
+
+@pytest.fixture
+def client(stub, make_client):
+    return make_client(stub)
+
+
+@pytest.fixture
+def async_client(stub):
+    # AsyncQPSAPI using the stub, configured like make_client(). One request at a time.
+    api = AsyncQPSAPI(max_concurrency=1)
+    api.use_account("stub-token", stub.url)
+    api.pending_jobs = None
+    api.retry_policy = QRETRYPOLICY(base_delay=0.001, max_delay=0.001)
+    api.poll_strategy.initial_interval = 0.01
+    api.poll_strategy.max_interval = 0.05
+    yield api
+    api.close()
+
+
+@pytest.fixture
+def requests_to():
+    # number of requests stub received for endpoint (e.g. "generator/job/create")
+    return lambda stub, endpoint: stub.stats()["requests"].get(endpoint, 0)
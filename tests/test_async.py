@@ -0,0 +1,27 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_client_can_be_used_by_consecutive_event_loops(stub, async_client, problem):
+    stub.latency = 0.01
+
+    async def solve(seeds):
+        # more requests than max_concurrency: requests wait on the semaphore of this loop
+        job_ids = await asyncio.gather(*[async_client.synth.solve(problem(seed)) for seed in seeds])
+        return await asyncio.gather(*[async_client.synth.get_job(job_id) for job_id in job_ids])
+
+    for seeds in ([1, 2, 3], [4, 5, 6]):
+        jobs = asyncio.run(solve(seeds))
+        assert [job["status"] for job in jobs] == ["done"] * 3
+
+
+def test_client_can_be_used_by_loops_in_threads(stub, async_client, problem):
+    stub.latency = 0.01
+
+    async def solve(seeds):
+        return await asyncio.gather(*[async_client.synth.solve(problem(seed)) for seed in seeds])
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(lambda seeds: asyncio.run(solve(seeds)), [[1, 2, 3], [4, 5, 6]]))
+
+    assert len(set(results[0] + results[1])) == 6
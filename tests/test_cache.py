@@ -0,0 +1,72 @@
+import os
+
+from quantastica.qps_api import QCACHE
+
+
+def disk_bytes(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, dirs, names in os.walk(path) for name in names if ".tmp" not in name)
+
+
+def test_memory_tier_is_lru():
+    cache = QCACHE(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1 and cache.get("b") is None and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_tier_is_shared(tmp_path):
+    QCACHE(path=str(tmp_path)).put("a", { "x": [1, 2] })
+
+    cache = QCACHE(path=str(tmp_path))
+    assert cache.get("a") == { "x": [1, 2] }
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_bytes_are_counted_on_overwrite_and_delete(tmp_path):
+    cache = QCACHE(path=str(tmp_path))
+    cache.put("a", "x" * 100)
+    cache.put("b", "y" * 100)
+
+    # overwrite with a smaller and a larger value
+    cache.put("a", "x" * 10)
+    assert cache._disk_bytes == disk_bytes(tmp_path)
+    cache.put("a", "x" * 1000)
+    assert cache._disk_bytes == disk_bytes(tmp_path)
+
+    cache.delete("b")
+    assert cache._disk_bytes == disk_bytes(tmp_path)
+
+    # already removed (e.g. by another process)
+    cache.delete("b")
+    assert cache._disk_bytes == disk_bytes(tmp_path)
+
+
+def test_overwrites_dont_evict_other_entries(tmp_path):
+    cache = QCACHE(path=str(tmp_path), max_disk_bytes=1000)
+    cache.put("a", "x" * 300)
+    for i in range(20):
+        cache.put("b", "y" * 300)
+
+    assert QCACHE(path=str(tmp_path)).get("a") == "x" * 300
+    assert cache.stats()["evictions"] == 0
+
+
+def test_temporary_files_are_not_counted(tmp_path):
+    QCACHE(path=str(tmp_path), max_disk_bytes=1000).put("a", "x" * 300)
+
+    # entry being written by another process
+    temp_path = str(tmp_path / "ab" / "abc.tmp1-1")
+    os.makedirs(os.path.dirname(temp_path))
+    with open(temp_path, "wb") as f:
+        f.write(b"t" * 5000)
+
+    cache = QCACHE(path=str(tmp_path), max_disk_bytes=1000)
+    cache.put("b", "y" * 300)
+
+    assert cache._disk_bytes == disk_bytes(tmp_path)
+    assert cache.get("a") == "x" * 300
+    assert os.path.exists(temp_path)
@@ -0,0 +1,43 @@
+from quantastica.qps_api import QCACHE
+
+
+QASM = "OPENQASM 2.0;\ninclude \"qelib1.inc\";\nqreg q[2];\nh q[0];\ncx q[0], q[1];\n"
+
+
+def test_conversions_are_memoized(stub, client, requests_to):
+    trace = {}
+    first = client.converter.convert(QASM, "qasm", "quil", trace=trace)
+    assert trace["path"] == "server"
+
+    trace = {}
+    assert client.converter.convert(QASM, "qasm", "quil", trace=trace) == first
+    assert trace["path"] == "cache"
+    assert requests_to(stub, "qconvert") == 1
+
+    # other destination, use_cache=False
+    client.converter.convert(QASM, "qasm", "pyquil")
+    client.converter.convert(QASM, "qasm", "quil", use_cache=False)
+    assert requests_to(stub, "qconvert") == 3
+
+
+def test_convert_cache_can_be_disabled_or_shared(stub, make_client, requests_to):
+    client = make_client(stub, convert_cache=None)
+    client.converter.convert(QASM, "qasm", "quil")
+    client.converter.convert(QASM, "qasm", "quil")
+    assert requests_to(stub, "qconvert") == 2
+
+    convert_cache = QCACHE(compress_threshold=16)
+    make_client(stub, convert_cache=convert_cache).converter.convert(QASM, "qasm", "quil")
+    make_client(stub, convert_cache=convert_cache).converter.convert(QASM, "qasm", "quil")
+    assert requests_to(stub, "qconvert") == 3
+
+
+def test_only_seeded_random_circuits_are_memoized(stub, client, requests_to):
+    first = client.utils.random_circuit(3, "qasm", { "seed": 1 })
+    assert client.utils.random_circuit(3, "qasm", { "seed": 1 }) == first
+    assert requests_to(stub, "utils/random_circuit") == 1
+
+    assert client.utils.random_circuit(3, "qasm", { "seed": 2 }) != first
+    client.utils.random_circuit(3, "qasm")
+    client.utils.random_circuit(3, "qasm")
+    assert requests_to(stub, "utils/random_circuit") == 4
@@ -0,0 +1,36 @@
+QASM = "OPENQASM 2.0;\ninclude \"qelib1.inc\";\nqreg q[1];\nh q[0];\n"
+
+
+def programs(count):
+    return [QASM + "x q[0];\n" * i for i in range(count)]
+
+
+def test_many_programs_to_one_format(stub, client):
+    batch_result = client.converter.convert_many(programs(5), "qasm", "quil")
+
+    assert batch_result.ok()
+    assert len(batch_result) == 5
+    assert [result.endswith("x q[0];\n" * i) for i, result in enumerate(batch_result)] == [True] * 5
+
+
+def test_one_program_to_many_formats(stub, client, requests_to):
+    batch_result = client.converter.convert_many([QASM], "qasm", ["quil", "pyquil", "qiskit"])
+
+    assert batch_result.ok()
+    assert sorted(batch_result[0]) == ["pyquil", "qiskit", "quil"]
+    assert batch_result[0]["qiskit"].startswith("// converted from qasm to qiskit")
+    assert requests_to(stub, "qconvert") == 3
+
+
+def test_failed_conversions_are_collected(make_stub, make_client):
+    stub = make_stub(error_rate=1.0, error_status=400, fault_endpoints=["qconvert"])
+    client = make_client(stub)
+
+    single = client.converter.convert_many(programs(2), "qasm", "quil")
+    assert not single.ok()
+    assert single.results == [None, None]
+    assert all(error is not None for error in single.errors)
+
+    many = client.converter.convert_many(programs(1), "qasm", ["quil", "qiskit"])
+    assert many.results == [{}]
+    assert sorted(many.errors[0]) == ["qiskit", "quil"]
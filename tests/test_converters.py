@@ -0,0 +1,74 @@
+import pytest
+
+from quantastica.qps_api import QLOCALCONVERTERS, QLOCALCONVERTUNSUPPORTED
+from quantastica.qps_api.converters import qasm_to_qasm, validate_qasm, quantum_circuit_to_qasm, validate_quantum_circuit
+
+
+HEADER = "OPENQASM 2.0;\ninclude \"qelib1.inc\";\nqreg q[3];\ncreg c[3];\n"
+
+
+def test_qelib1_and_declared_gates_are_converted_locally():
+    qasm = HEADER + "gate my(a) x, y { cx x, y; rz(a) y; }\nh q;\ncu3(0.1, 0.2, 0.3) q[0], q[1];\nmy(pi) q[0], q[2];\nbarrier q;\nmeasure q -> c;\n"
+
+    assert validate_qasm(qasm)
+    assert "my (pi) q[0], q[2];" in qasm_to_qasm(qasm)
+
+
+@pytest.mark.parametrize("body", [
+    "cx q[0];\n",
+    "rx q[0];\n",
+    "u2(0.1) q[0];\n",
+    "gpi2(0.1) q[0];\n",
+    "gate my(a) x { rz(a) x; }\nmy q[0];\n"
+])
+def test_unknown_gates_and_wrong_arity_fall_back_to_server(body):
+    with pytest.raises(QLOCALCONVERTUNSUPPORTED):
+        validate_qasm(HEADER + body)
+
+    with pytest.raises(QLOCALCONVERTUNSUPPORTED):
+        qasm_to_qasm(HEADER + body)
+
+
+def test_qelib1_gates_need_include():
+    with pytest.raises(QLOCALCONVERTUNSUPPORTED):
+        validate_qasm("OPENQASM 2.0;\nqreg q[1];\nh q[0];\n")
+
+    assert validate_qasm("OPENQASM 2.0;\nqreg q[2];\nU(0, 0, 0) q[0];\nCX q[0], q[1];\n")
+
+
+def test_qasm_ext_is_converted_by_server():
+    assert QLOCALCONVERTERS().get("qasm", "qasm-ext") is None
+
+
+@pytest.mark.parametrize("circuit", [
+    # gates without "id" in the same column are separate gates
+    { "gates": [[{ "name": "h" }], [{ "name": "h" }]] },
+    { "gates": [[{ "name": "h", "id": "a" }], [{ "name": "h", "id": "b" }]] }
+])
+def test_quantum_circuit_gates_without_id_are_not_merged(circuit):
+    assert quantum_circuit_to_qasm(circuit).endswith("h q[0];\nh q[1];\n")
+    assert validate_quantum_circuit(circuit)
+
+
+@pytest.mark.parametrize("circuit", [
+    # cx with a missing connector
+    { "numQubits": 2, "gates": [[{ "name": "cx", "id": "a", "connector": 0 }], []] },
+    { "gates": [[{ "name": "u2", "id": "a", "options": { "params": { "phi": "0", "lambda": "0" } } }], [{ "name": "u2", "id": "a", "connector": 1, "options": { "params": { "phi": "0", "lambda": "0" } } }]] },
+    { "cregs": { "c": 2 }, "gates": [[{ "name": "measure", "id": "a", "options": { "creg": { "name": "c", "bit": 0 } } }], [{ "name": "measure", "id": "a", "connector": 1 }]] }
+])
+def test_quantum_circuit_with_wrong_arity_falls_back_to_server(circuit):
+    with pytest.raises(QLOCALCONVERTUNSUPPORTED):
+        quantum_circuit_to_qasm(circuit)
+
+    with pytest.raises(QLOCALCONVERTUNSUPPORTED):
+        validate_quantum_circuit(circuit)
+
+
+def test_unsupported_quantum_circuit_is_converted_by_server(client):
+    circuit = { "numQubits": 2, "gates": [[{ "name": "cx", "id": "a", "connector": 0 }], []] }
+
+    trace = {}
+    client.converter.convert(circuit, "quantum-circuit", "qasm", use_cache=False, trace=trace)
+
+    assert trace["path"] == "server"
+    assert isinstance(trace["local_error"], QLOCALCONVERTUNSUPPORTED)
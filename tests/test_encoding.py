@@ -0,0 +1,43 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from quantastica.qps_api.encoding import encode_vector, encode_vectors, encode_matrix
+
+
+def test_arrays_are_encoded_like_lists_with_full_precision():
+    rng = np.random.default_rng(1)
+    state = rng.normal(size=1024) + 1j * rng.normal(size=1024)
+    state = state / np.linalg.norm(state)
+
+    text = encode_vector(state)
+
+    assert text == str(state.tolist())
+    assert "..." not in text
+    assert np.array_equal(np.array([complex(x) for x in text[1:-1].split(", ")]), state)
+
+
+def test_numpy_scalars_and_lists_are_encoded_as_python_numbers():
+    assert encode_vector([np.float64(0.6), np.float32(0.5), 0, np.int64(0)], check_norm=False) == "[0.6, 0.5, 0, 0]"
+    assert encode_vector(np.array([0, 1])) == "[0, 1]"
+    assert encode_vectors([[[1, 0], np.array([0.0, 1.0])]]) == ("[1, 0]", "[0.0, 1.0]")
+    assert encode_matrix(np.eye(2)) == "[[1.0, 0.0], [0.0, 1.0]]"
+
+
+@pytest.mark.parametrize("vector, message", [
+    ("[0.1, 0.2, ..., 0.3]", "truncated"),
+    ([1, 0, 0], "power of 2"),
+    ([1, 1], "not normalized"),
+    (np.zeros((2, 2)), "1-dimensional")
+])
+def test_invalid_vectors_are_rejected(vector, message):
+    with pytest.raises(Exception, match=message):
+        encode_vector(vector)
+
+
+def test_invalid_matrices_are_rejected():
+    with pytest.raises(Exception, match="not unitary"):
+        encode_matrix(np.ones((2, 2)))
+
+    with pytest.raises(Exception, match="square"):
+        encode_matrix([[1, 0], [0]])
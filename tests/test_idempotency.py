@@ -0,0 +1,82 @@
+import time
+
+import pytest
+import requests
+
+from quantastica.qps_api import QPSAPI
+from quantastica.qps_api import stub_server
+from quantastica.qps_api.qps_api import _problem_key, _pending_begin, _reconcile_candidates
+
+
+PROBLEM = { "type": "vectors", "name": "", "source": { "vectors": { "text1": "[1, 0]", "text2": "[0, 1]" } } }
+
+
+def test_failed_create_does_not_adopt_earlier_identical_job(make_stub, make_client):
+    stub = make_stub(error_rate=1.0, error_status=502, fault_endpoints=["generator/job/create"])
+    earlier_job_id = stub.add_job(dict(PROBLEM, status="draft"))
+    api = make_client(stub, job_cache=None, circuit_breaker=None)
+    time.sleep(0.01)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        api.synth.solve(dict(PROBLEM), start_job=False)
+
+    assert stub.job(earlier_job_id)["status"] == "draft"
+
+
+def test_ambiguous_create_adopts_created_job(make_stub, make_client):
+    stub = make_stub(timeout_rate=1.0, timeout_seconds=0.5, fault_endpoints=["generator/job/create"])
+    stub.add_job(dict(PROBLEM, status="draft"))
+    api = make_client(stub, job_cache=None, circuit_breaker=None)
+    api.http_timeout = 0.2
+
+    job_id = api.synth.solve(dict(PROBLEM), start_job=False)
+
+    assert stub.stats()["jobs_created"] == 1
+    assert stub.job(job_id)["status"] == "draft"
+
+
+def test_job_listed_without_created_at_is_not_adopted(make_stub, make_client, monkeypatch):
+    # documented job/list response has no createdAt: earlier identical job can't be told from the created one
+    monkeypatch.setattr(stub_server, "_LIST_FIELDS", tuple(field for field in stub_server._LIST_FIELDS if field != "createdAt"))
+    stub = make_stub(error_rate=1.0, error_status=502, fault_endpoints=["generator/job/create"])
+    earlier_job_id = stub.add_job(dict(PROBLEM, status="draft"))
+    api = make_client(stub, job_cache=None, circuit_breaker=None)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        api.synth.solve(dict(PROBLEM), start_job=False)
+
+    assert stub.job(earlier_job_id)["status"] == "draft"
+    assert "createdAt" not in api.synth.list_jobs()["list"][0]
+
+
+def test_reconcile_candidates_without_created_at():
+    record = { "key": "key-1", "started": time.time() }
+    list_result = { "list": [
+        { "_id": "a", "type": "vectors", "name": "" },
+        { "_id": "b", "type": "vectors", "name": "", "createdAt": "2999-01-01T00:00:00.000Z" },
+        { "_id": "c", "type": "vectors", "name": "", "idempotency_key": "key-1" }
+    ] }
+
+    assert _reconcile_candidates(list_result, PROBLEM, record, set()) == [("c", True)]
+    assert _reconcile_candidates({ "list": list_result["list"][:2] }, PROBLEM, record, set()) == [("b", False)]
+    assert _reconcile_candidates({ "list": list_result["list"][:1] }, PROBLEM, record, set()) == []
+
+
+def test_pending_jobs_are_in_memory_and_per_account():
+    api = QPSAPI()
+    assert api.pending_jobs.path is None
+
+    problem_key = _problem_key(PROBLEM)
+
+    api.use_account("token-a", "http://127.0.0.1:1")
+    record = _pending_begin(api, PROBLEM, problem_key, True)
+    assert _pending_begin(api, PROBLEM, problem_key, True)["resumed"]
+
+    # another token or server doesn't resume the record
+    api.use_account("token-b", "http://127.0.0.1:1")
+    assert not _pending_begin(api, PROBLEM, problem_key, True)["resumed"]
+    api.use_account("token-a", "http://127.0.0.1:2")
+    assert not _pending_begin(api, PROBLEM, problem_key, True)["resumed"]
+
+    api.use_account("token-a", "http://127.0.0.1:1")
+    assert _pending_begin(api, PROBLEM, problem_key, True)["key"] == record["key"]
@@ -0,0 +1,59 @@
+from quantastica.qps_api import QCACHE
+
+
+def test_solved_problem_is_served_from_cache(stub, client, problem, requests_to):
+    job_id = client.synth.solve(problem(1))
+    assert client.synth.get_job(job_id)["status"] == "done"
+
+    assert client.synth.solve(problem(1)) == job_id
+    assert client.synth.get_job(job_id)["_id"] == job_id
+    assert requests_to(stub, "generator/job/create") == 1
+    assert requests_to(stub, "generator/job/get") == 1
+    assert client.job_cache.stats()["hits"] >= 1
+
+
+def test_other_problem_or_use_cache_false_is_a_miss(stub, client, problem, requests_to):
+    job_id = client.synth.solve(problem(1))
+    client.synth.get_job(job_id)
+
+    assert client.synth.solve(problem(2)) != job_id
+    assert client.synth.solve(problem(1), use_cache=False) != job_id
+    assert requests_to(stub, "generator/job/create") == 3
+
+
+def test_cache_is_per_account(make_stub, make_client, problem, requests_to):
+    stub1 = make_stub()
+    stub2 = make_stub(seed=100)
+    client = make_client(stub1)
+
+    job_id = client.synth.solve(problem(1))
+    client.synth.get_job(job_id)
+
+    # another token on the same server
+    client.use_account("other-token", stub1.url)
+    client.synth.solve(problem(1))
+    assert requests_to(stub1, "generator/job/create") == 2
+
+    # another server
+    client.use_account("stub-token", stub2.url)
+    client.synth.solve(problem(1))
+    assert requests_to(stub2, "generator/job/create") == 1
+
+    # back to the first account: cached job again
+    client.use_account("stub-token", stub1.url)
+    assert client.synth.solve(problem(1)) == job_id
+    assert requests_to(stub1, "generator/job/create") == 2
+
+
+def test_shared_cache_is_per_account(make_stub, make_client, problem, requests_to):
+    stub1 = make_stub()
+    stub2 = make_stub(seed=100)
+    job_cache = QCACHE()
+    client1 = make_client(stub1, job_cache=job_cache)
+    client2 = make_client(stub2, job_cache=job_cache)
+
+    client1.synth.get_job(client1.synth.solve(problem(1)))
+    client2.synth.get_job(client2.synth.solve(problem(1)))
+
+    assert requests_to(stub1, "generator/job/create") == 1
+    assert requests_to(stub2, "generator/job/create") == 1
@@ -0,0 +1,57 @@
+from quantastica.qps_api import QJOBINDEX
+
+
+def test_incremental_sync_checks_jobs_which_left_active_lists(stub, client):
+    job_id = stub.add_job({ "type": "vectors", "status": "draft" })
+    index = QJOBINDEX(client).sync()
+
+    # finished between syncs
+    stub.update_job(job_id, status="done")
+    index.sync()
+
+    assert index.get(job_id)["status"] == "done"
+    assert index.stats()["full_syncs"] == 1
+    assert index.stats()["incremental_syncs"] == 1
+    assert index.stats()["status_requests"] == 1
+    index.close()
+
+
+def test_jobs_submitted_through_client_are_tracked_between_syncs(stub, client, problem):
+    index = QJOBINDEX(client).sync()
+
+    job_id = client.synth.solve(problem(1))
+    assert index.get(job_id)["status"] == "queued"
+
+    # finishes before the next sync, so it is never in active lists
+    stub.job(job_id)
+    index.sync()
+
+    assert index.get(job_id)["status"] == "done"
+    assert index.count(status="done") == 1
+    assert index.stats()["full_syncs"] == 1
+    index.close()
+
+
+def test_jobs_created_elsewhere_appear_with_full_sync(stub, client):
+    index = QJOBINDEX(client).sync()
+
+    job_id = stub.add_job({ "type": "vectors", "name": "elsewhere", "status": "done" })
+    index.sync()
+    assert index.get(job_id) is None
+
+    index.sync(full=True)
+    assert index.get(job_id)["name"] == "elsewhere"
+    index.close()
+
+
+def test_incremental_sync_updates_listed_entries(stub, client):
+    job_id = stub.add_job({ "type": "vectors", "status": "queued" })
+    index = QJOBINDEX(client).sync()
+
+    stub.update_job(job_id, status="running", name="renamed")
+    index.sync()
+
+    assert index.get(job_id)["status"] == "running"
+    assert index.jobs(name="renamed")[0]["_id"] == job_id
+    assert index.stats()["status_requests"] == 0
+    index.close()
@@ -0,0 +1,45 @@
+def test_get_job_after_reset_is_not_served_from_cache(stub, client, problem):
+    job_id = client.synth.solve(problem(1))
+    assert client.synth.get_job(job_id)["status"] == "done"
+    assert client.synth.solve(problem(1)) == job_id
+
+    client.synth.reset_job(job_id)
+    assert client.synth.get_job(job_id, wait=False)["status"] == "draft"
+
+    # finished job is cached again
+    client.synth.start_job(job_id)
+    assert client.synth.get_job(job_id)["status"] == "done"
+    requests_before = stub.stats()["requests"].get("generator/job/get", 0)
+    assert client.synth.get_job(job_id)["status"] == "done"
+    assert stub.stats()["requests"].get("generator/job/get", 0) == requests_before
+
+
+def test_stop_job_drops_cached_job(stub, client, problem):
+    job_id = client.synth.solve(problem(2))
+    client.synth.get_job(job_id)
+    client.synth.reset_job(job_id)
+
+    stub.job_duration = 60.0
+    client.synth.start_job(job_id)
+    assert client.synth.job_status(job_id)["status"] in ("queued", "running")
+
+    client.synth.stop_job(job_id)
+    assert client.synth.get_job(job_id, wait=False)["status"] == "draft"
+
+
+def test_wait_jobs_lists_all_jobs_once_per_poll(stub, client, problem):
+    stub.job_duration = 0.02
+
+    for i in range(50):
+        stub.add_job({ "type": "vectors", "status": "done" })
+
+    filters = []
+    list_jobs = client.synth.list_jobs
+    client.synth.list_jobs = lambda status_filter=None: filters.append(status_filter) or list_jobs(status_filter)
+
+    job_ids = client.synth.solve_many([problem(100 + i) for i in range(5)]).results
+    jobs = client.synth.wait_jobs(job_ids)
+
+    assert [job["status"] for job in jobs] == ["done"] * 5
+    # one unfiltered job/list per poll (last one or two pending jobs are polled with job/status)
+    assert len(filters) > 0 and set(filters) == { None }
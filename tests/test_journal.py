@@ -0,0 +1,45 @@
+from quantastica.qps_api import QJOBJOURNAL
+
+
+def test_result_is_stale_after_status_change(tmp_path):
+    journal = QJOBJOURNAL(str(tmp_path / "journal.db"))
+
+    journal.record("problem", "job1", "queued")
+    journal.record_status("job1", "done")
+    journal.record_result("job1", { "_id": "job1", "status": "done", "output": { "circuits": ["first"] } })
+    assert journal.result("job1")["output"]["circuits"] == ["first"]
+
+    # reset and run again: old result must not be returned, also not once the job is done again
+    journal.record_status("job1", "draft")
+    assert journal.result("job1") is None
+    journal.record_status("job1", "queued")
+    journal.record_status("job1", "done")
+    assert journal.result("job1") is None
+
+    journal.record_result("job1", { "_id": "job1", "status": "done", "output": { "circuits": ["second"] } })
+    assert journal.result("job1")["output"]["circuits"] == ["second"]
+
+    journal.compact()
+    assert journal.result("job1")["output"]["circuits"] == ["second"]
+
+    journal.close()
+
+
+def test_reset_job_is_journaled(tmp_path, stub, make_client, problem):
+    api = make_client(stub, job_cache=None, job_journal=QJOBJOURNAL(str(tmp_path / "journal.db")))
+
+    job_id = api.synth.solve(problem())
+    api.synth.get_job(job_id)
+    assert api.job_journal.result(job_id) is not None
+
+    api.synth.reset_job(job_id)
+    assert api.job_journal.job(job_id)["status"] == "draft"
+    assert api.job_journal.result(job_id) is None
+    assert api.synth.get_job(job_id, wait=False)["status"] == "draft"
+
+    api.synth.start_job(job_id)
+    assert api.job_journal.job(job_id)["status"] == "queued"
+    assert api.synth.get_job(job_id)["status"] == "done"
+    assert api.job_journal.result(job_id)["status"] == "done"
+
+    api.job_journal.close()
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from quantastica.qps_api.json_stream import iter_json_items
+
+
+JOB = {
+    "_id": "job",
+    "input": { "circuits": [{ "qasm": "skipped" }] },
+    "note": "brace } and \"quote\" in string",
+    "output": {
+        "time": 1.5e-3,
+        "circuits": [
+            { "qasm": "h q[0];\n", "program": [{ "name": "h", "wires": [0] }], "diff": 0 },
+            { "qasm": "x q[0]; // é", "program": [], "diff": -1.25e-10, "extra": [True, False, None] }
+        ]
+    }
+}
+
+
+def _chunks(document, size):
+    text = json.dumps(document)
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 7, 100000])
+def test_items_are_decoded_from_any_chunking(size):
+    assert list(iter_json_items(_chunks(JOB, size), ("output", "circuits"))) == JOB["output"]["circuits"]
+
+
+def test_bytes_chunks_are_decoded():
+    chunks = [chunk.encode("utf-8") for chunk in _chunks(JOB, 3)]
+
+    assert list(iter_json_items(chunks, ("output", "circuits"))) == JOB["output"]["circuits"]
+
+
+def test_fields_filter_items():
+    items = list(iter_json_items(_chunks(JOB, 5), ("output", "circuits"), {"qasm", "diff"}))
+
+    assert items == [{ "qasm": circuit["qasm"], "diff": circuit["diff"] } for circuit in JOB["output"]["circuits"]]
+
+
+def test_missing_path_yields_nothing():
+    assert list(iter_json_items(_chunks(JOB, 5), ("output", "missing"))) == []
+    assert list(iter_json_items(_chunks({ "output": None }, 5), ("output", "circuits"))) == []
+
+
+def test_circuits_are_streamed_from_job_get(make_stub, make_client, problem, requests_to):
+    stub = make_stub(num_circuits=20)
+    client = make_client(stub, stream_chunk_size=64)
+    job_id = client.synth.solve(problem(1))
+    circuits = client.synth.get_job(job_id)["output"]["circuits"]
+
+    # without cached job object circuits are read from the streamed job/get response
+    client.job_cache = None
+    before = requests_to(stub, "generator/job/get")
+    assert list(client.synth.iter_circuits(job_id)) == circuits
+    assert list(client.synth.iter_circuits(job_id, fields=["qasm"])) == [{ "qasm": circuit["qasm"] } for circuit in circuits]
+    assert requests_to(stub, "generator/job/get") - before == 2
+
+
+def test_large_responses_are_gzipped(make_stub, make_client, problem):
+    plain = make_stub(num_circuits=50, gzip_responses=False)
+    gzipped = make_stub(num_circuits=50)
+
+    jobs = []
+    for stub in (plain, gzipped):
+        client = make_client(stub)
+        jobs.append(client.synth.get_job(client.synth.solve(problem(1))))
+
+    assert jobs[0]["output"] == jobs[1]["output"]
+    assert gzipped.stats()["bytes_out"] < plain.stats()["bytes_out"] / 2
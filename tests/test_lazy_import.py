@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+
+CHECK_SCRIPT = """
+import sys
+import quantastica.qps_api as qps_api
+print(",".join(name for name in ("requests", "urllib3", "asyncio", "numpy", "sqlite3", "http.server") if name in sys.modules))
+print(repr(qps_api.QPS))
+qps_api.QPS.api_url
+print(type(object.__getattribute__(qps_api.QPS, "_qps_api")).__name__)
+qps_api.AsyncQPSAPI
+print("asyncio" in sys.modules)
+"""
+
+
+def test_package_import_is_lazy(tmp_path):
+    # no ~/.quantastica config and no environment: QPS is still created (with defaults) on first use
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = { "HOME": str(tmp_path), "PYTHONPATH": root }
+    output = subprocess.run([sys.executable, "-c", CHECK_SCRIPT], capture_output=True, text=True, env=env, check=True).stdout
+
+    heavy, qps_repr, qps_type, asyncio_loaded = output.splitlines()
+    assert heavy == ""
+    assert qps_repr == "<QPSAPI (not loaded)>"
+    assert qps_type == "QPSAPI"
+    assert asyncio_loaded == "True"
+
+
+def test_qps_proxy_forwards_attributes():
+    from quantastica.qps_api import QPSAPI, QPSAPIPROXY
+
+    proxy = QPSAPIPROXY()
+    proxy.batch_max_workers = 3
+
+    assert isinstance(proxy._get_qps_api(), QPSAPI)
+    assert proxy._get_qps_api().batch_max_workers == 3
+    assert proxy.batch_max_workers == 3
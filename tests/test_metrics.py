@@ -0,0 +1,70 @@
+import pytest
+
+from quantastica.qps_api.metrics import QHOOKS
+
+
+def test_request_hooks_receive_every_attempt(stub, client, problem):
+    events = []
+    client.hooks.on("request_start", lambda data: events.append(("start", data["endpoint"], data["attempt"])))
+    client.hooks.on("request_end", lambda data: events.append(("end", data["endpoint"], data["status_code"], data["bytes_in"] > 0)))
+
+    client.synth.solve(problem(1), start_job=False)
+
+    assert events == [("start", "generator/job/create", 0), ("end", "generator/job/create", 200, True)]
+
+
+def test_retries_and_job_states_are_emitted(make_stub, make_client, problem):
+    stub = make_stub(error_rate=1.0, error_status=503, fault_endpoints=["generator/job/status"])
+    client = make_client(stub)
+    events = []
+    for event in ("retry", "backoff", "job_state"):
+        client.hooks.on(event, lambda data: events.append((data["event"], data.get("status") or data.get("endpoint"))))
+
+    job_id = client.synth.solve(problem(1))
+    with pytest.raises(Exception):
+        client.synth.job_status(job_id)
+
+    assert ("retry", "generator/job/status") in events and ("backoff", "generator/job/status") in events
+    stats = client.metrics.snapshot()["endpoints"]["generator/job/status"]
+    assert stats["errors"] == stats["requests"] and stats["retries"] == stats["requests"] - 1
+
+    stub.fault_endpoints = ["none"]
+    client.synth.get_job(job_id)
+    assert ("job_state", "done") in events
+
+
+def test_failing_hook_doesnt_break_requests(stub, client, problem):
+    client.hooks.on("request_end", lambda data: 1 / 0)
+
+    assert client.synth.solve(problem(1), start_job=False) is not None
+
+
+def test_hooks_can_be_removed():
+    hooks = QHOOKS()
+    received = []
+    callback = hooks.on("retry", received.append)
+    hooks.emit("retry", {})
+    hooks.off("retry", callback)
+    hooks.emit("retry", {})
+
+    assert len(received) == 1 and not hooks.active("retry")
+    with pytest.raises(Exception, match="Unknown event"):
+        hooks.on("request", print)
+
+
+def test_metrics_are_exported_in_prometheus_format(stub, client, problem):
+    for seed in range(4):
+        client.synth.solve(problem(seed), start_job=False)
+
+    snapshot = client.metrics.snapshot()["endpoints"]["generator/job/create"]
+    assert snapshot["requests"] == 4 and snapshot["errors"] == 0
+    assert snapshot["latency_p50"] <= snapshot["latency_p95"] <= snapshot["latency_p99"]
+
+    text = client.metrics.to_prometheus()
+    assert "# TYPE qps_api_requests_total counter" in text
+    assert "qps_api_requests_total{endpoint=\"generator/job/create\"} 4" in text
+    assert "qps_api_request_duration_seconds_count{endpoint=\"generator/job/create\"} 4" in text
+    assert "qps_api_request_duration_seconds{endpoint=\"generator/job/create\",quantile=\"0.5\"} " in text
+
+    client.metrics.reset()
+    assert client.metrics.snapshot()["endpoints"] == {}
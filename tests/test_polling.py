@@ -0,0 +1,44 @@
+import pytest
+
+from quantastica.qps_api import QPOLLSTRATEGY, QPSTimeoutError
+
+
+def test_intervals_grow_exponentially_up_to_max_interval():
+    strategy = QPOLLSTRATEGY(initial_interval=0.1, max_interval=1.0, multiplier=2.0, jitter=0)
+
+    assert [strategy.interval(poll_count) for poll_count in range(1, 7)] == pytest.approx([0.1, 0.2, 0.4, 0.8, 1.0, 1.0])
+
+
+def test_jitter_spreads_intervals():
+    strategy = QPOLLSTRATEGY(initial_interval=1.0, max_interval=1.0, jitter=0.1)
+
+    intervals = [strategy.interval(1) for i in range(200)]
+    assert all(0.9 <= interval <= 1.1 for interval in intervals)
+    assert len(set(intervals)) > 1
+
+
+def test_delay_is_capped_by_deadline():
+    poller = QPOLLSTRATEGY(initial_interval=10.0, max_interval=10.0, jitter=0).start(timeout=0.5)
+
+    assert poller.next_delay() <= 0.5
+
+
+def test_get_job_times_out(stub, client, problem):
+    stub.job_duration = 60.0
+    job_id = client.synth.solve(problem(1))
+
+    with pytest.raises(QPSTimeoutError) as error_info:
+        client.synth.get_job(job_id, timeout=0.2)
+
+    assert error_info.value.polls > 0
+    assert client.poll_strategy.stats()["timeouts"] == 1
+
+
+def test_get_job_polls_until_finished(stub, client, problem):
+    stub.job_duration = 0.1
+    job_id = client.synth.solve(problem(1))
+
+    assert client.synth.get_job(job_id)["status"] == "done"
+
+    stats = client.poll_strategy.stats()
+    assert stats["waits"] == 1 and stats["polls"] >= 2 and stats["timeouts"] == 0
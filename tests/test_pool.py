@@ -0,0 +1,72 @@
+import pytest
+import requests
+
+from quantastica.qps_api import QPSAPI, QPSPOOL
+
+
+@pytest.fixture
+def make_pool(make_client):
+    pools = []
+
+    def make(stubs):
+        pool = QPSPOOL([make_client(stub) for stub in stubs], queue_refresh_interval=0.0)
+        pool.poll_strategy.initial_interval = 0.01
+        pools.append(pool)
+        return pool
+
+    yield make
+
+    for pool in pools:
+        pool.close()
+
+
+def test_create_fails_over_to_another_backend(make_stub, make_pool, problem):
+    down = make_stub(error_rate=1.0, error_status=503, fault_endpoints=["generator/job/create"])
+    up = make_stub()
+    pool = make_pool([down, up])
+
+    job_id = pool.synth.solve(problem())
+
+    assert pool.synth.get_job(job_id)["status"] == "done"
+    assert up.stats()["jobs_created"] == 1
+    assert down.stats()["jobs_created"] == 0
+
+
+def test_failed_start_does_not_fail_over(make_stub, make_pool, problem):
+    first = make_stub(error_rate=1.0, error_status=503, fault_endpoints=["generator/job/start"])
+    second = make_stub()
+    pool = make_pool([first, second])
+
+    with pytest.raises(requests.exceptions.RequestException):
+        pool.synth.solve(problem())
+
+    # job was created on the first backend and is not duplicated on the second one
+    assert first.stats()["jobs_created"] == 1
+    assert second.stats()["jobs_created"] == 0
+    assert first.stats()["statuses"] == { "draft": 1 }
+
+
+def test_finished_job_is_reused(stub, make_pool, problem):
+    pool = make_pool([stub])
+
+    job_id = pool.synth.solve(problem())
+    pool.synth.get_job(job_id)
+
+    assert pool.synth.solve(problem()) == job_id
+    assert stub.stats()["jobs_created"] == 1
+
+
+def test_package_level_qps_is_accepted(make_stub, make_client):
+    from quantastica.qps_api import QPS
+
+    first = make_stub()
+    second = make_stub()
+    QPS.use_account("stub-token", first.url)
+
+    pool = QPSPOOL([QPS, make_client(second)])
+
+    assert isinstance(pool.backends[0], QPSAPI)
+    assert pool.backends[0] is QPS._get_qps_api()
+    assert [backend["api_url"] for backend in pool.status()] == [first.url, second.url]
+
+    pool.close()
@@ -0,0 +1,78 @@
+import pytest
+
+from quantastica.qps_api import parse_qasm, QGATE
+
+
+QASM = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[3];
+creg c[2];
+// entangle
+h q[0];
+cx q[0], q[1];
+u3 (cos(pi/2), 0, pi/4) q[2];
+barrier q;
+gpi2 (0.25) q[1];
+measure q[0] -> c[0];
+if(c==1) x q[2];
+"""
+
+
+def test_gates_are_flattened_records():
+    circuit = parse_qasm(QASM)
+
+    assert circuit.qregs == [("q", 3)] and circuit.cregs == [("c", 2)]
+    assert circuit.includes == ["qelib1.inc"]
+    assert circuit.gates[1] == QGATE("cx", (), (0, 1))
+    assert circuit.gates[2].params == ("cos(pi/2)", "0", "pi/4")
+    assert circuit.gates[3] == QGATE("barrier", (), (0, 1, 2))
+    assert circuit.gates[5] == QGATE("measure", (), (0,), (0,))
+    assert circuit.gates[6].condition == ("c", 1)
+
+
+def test_stats_are_collected_in_one_pass():
+    stats = parse_qasm(QASM).stats()
+
+    assert stats["num_gates"] == 7
+    assert stats["gate_counts"] == {"h": 1, "cx": 1, "u3": 1, "barrier": 1, "gpi2": 1, "measure": 1, "x": 1}
+    assert stats["qubit_gate_counts"] == [3, 2, 2]
+    assert stats["two_qubit_gates"] == 1 and stats["two_qubit_pairs"] == {(0, 1): 1}
+    # h, cx, barrier, gpi2 / measure, conditional x waits for measure through "c"
+    assert stats["depth"] == 4
+
+
+def test_registers_are_broadcast_and_indexed_globally():
+    circuit = parse_qasm("qreg a[2]; qreg b[2]; h a; cx a, b; cx a[1], b;")
+
+    assert [gate.qubits for gate in circuit.gates] == [(0,), (1,), (0, 2), (1, 3), (1, 2), (1, 3)]
+    assert circuit.stats()["used_qubits"] == [0, 1, 2, 3]
+
+
+def test_to_qasm_round_trips():
+    circuit = parse_qasm(QASM + "gate my(t) a, b { cx a, b; rz(t) b; }\nmy(0.5) q[0], q[2];\n")
+    text = circuit.to_qasm()
+
+    again = parse_qasm(text)
+    assert again.gates == circuit.gates
+    assert again.definitions == circuit.definitions
+    assert again.to_qasm() == text
+
+
+@pytest.mark.parametrize("qasm, message", [
+    ("qreg q[1]; h r[0];", "Unknown register"),
+    ("qreg q[1]; h q[1];", "out of range"),
+    ("qreg q[2]; qreg r[3]; cx q, r;", "size mismatch"),
+    ("qreg q[1]; qreg q[2];", "already declared"),
+    ("qreg q[1]; h q[0]", "Missing")
+])
+def test_invalid_qasm_is_rejected(qasm, message):
+    with pytest.raises(Exception, match=message):
+        parse_qasm(qasm)
+
+
+def test_transpile_accepts_parsed_circuit(stub, client):
+    circuit = parse_qasm(QASM)
+
+    job_id = client.synth.transpile(circuit, start_job=False)
+
+    assert stub.job(job_id)["source"]["circuit"]["qasm"] == circuit.to_qasm()
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+import requests
+
+from quantastica.qps_api import QRETRYPOLICY, QCIRCUITBREAKER, QCIRCUITOPENERROR
+
+
+@pytest.fixture
+def make_retry_client(make_client):
+    def make(stub, max_attempts=3, circuit_breaker=None):
+        return make_client(stub, job_cache=None, single_flight=None, retry_policy=QRETRYPOLICY(max_attempts=max_attempts, base_delay=0.001, max_delay=0.001), circuit_breaker=circuit_breaker)
+
+    return make
+
+
+def test_non_idempotent_request_is_not_repeated_on_server_error(make_stub, make_retry_client, requests_to):
+    stub = make_stub(error_rate=1.0, error_status=500, fault_endpoints=["generator/job/create", "generator/job/stop"])
+    api = make_retry_client(stub)
+    job_id = stub.add_job({ "type": "vectors", "status": "running" })
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        api.http_post(stub.url + "/generator/job/create", { "Authorization": "Bearer stub-token" }, { "type": "vectors" })
+    assert requests_to(stub, "generator/job/create") == 1
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        api.synth.stop_job(job_id)
+    assert requests_to(stub, "generator/job/stop") == 1
+
+    # idempotent request is retried
+    stub.fault_endpoints = ["generator/job/status"]
+    with pytest.raises(requests.exceptions.RetryError):
+        api.synth.job_status(job_id)
+    assert requests_to(stub, "generator/job/status") == 3
+
+
+def test_rejected_non_idempotent_request_is_retried(make_stub, make_retry_client, requests_to):
+    stub = make_stub(error_rate=1.0, error_status=503, fault_endpoints=["generator/job/start"])
+    api = make_retry_client(stub)
+    job_id = stub.add_job({ "type": "vectors", "status": "draft" })
+
+    with pytest.raises(requests.exceptions.RetryError) as raised:
+        api.synth.start_job(job_id)
+
+    assert requests_to(stub, "generator/job/start") == api.retry_policy.non_idempotent_max_attempts
+    # exhausted retries carry the last error
+    assert isinstance(raised.value.__cause__, requests.exceptions.HTTPError)
+    assert raised.value.__cause__.response.status_code == 503
+
+
+def test_retry_after_is_honoured(make_stub, make_retry_client, requests_to):
+    stub = make_stub(retry_after=0.3)
+    api = make_retry_client(stub)
+    job_id = stub.add_job({ "type": "vectors", "status": "done" })
+
+    stub.brownout(0.5)
+    started = time.monotonic()
+    assert api.synth.job_status(job_id)["status"] == "done"
+
+    # two failed attempts, each followed by at least 0.3 s wait (backoff alone is 1 ms)
+    assert time.monotonic() - started >= 0.6
+    assert requests_to(stub, "generator/job/status") == 3
+
+
+def test_circuit_breaker_opens_half_opens_and_closes(make_stub, make_retry_client, requests_to):
+    stub = make_stub()
+    api = make_retry_client(stub, max_attempts=1, circuit_breaker=QCIRCUITBREAKER(failure_threshold=2, reset_timeout=0.3))
+    job_id = stub.add_job({ "type": "vectors", "status": "done" })
+
+    states = []
+    api.hooks.on("circuit_state", lambda data: states.append(data["state"]))
+
+    stub.brownout(0.3)
+    for i in range(2):
+        with pytest.raises(requests.exceptions.RetryError):
+            api.synth.job_status(job_id)
+    assert states == [QCIRCUITBREAKER.OPEN]
+
+    # fails fast without contacting the server
+    with pytest.raises(QCIRCUITOPENERROR):
+        api.synth.job_status(job_id)
+    assert requests_to(stub, "generator/job/status") == 2
+
+    time.sleep(0.35)
+    assert api.synth.job_status(job_id)["status"] == "done"
+    assert states == [QCIRCUITBREAKER.OPEN, QCIRCUITBREAKER.HALF_OPEN, QCIRCUITBREAKER.CLOSED]
+
+
+def test_half_open_probe_is_released_after_client_side_error(make_stub, make_retry_client, requests_to):
+    stub = make_stub()
+    api = make_retry_client(stub, max_attempts=1, circuit_breaker=QCIRCUITBREAKER(failure_threshold=1, reset_timeout=0.1))
+    job_id = stub.add_job({ "type": "vectors", "status": "done" })
+
+    stub.brownout(0.1)
+    with pytest.raises(requests.exceptions.RetryError):
+        api.synth.job_status(job_id)
+    time.sleep(0.15)
+
+    # probe fails before it is sent (body can't be serialized)
+    with pytest.raises(TypeError):
+        api.http_post(stub.url + "/generator/job/status", { "Authorization": "Bearer stub-token" }, { "_id": object() })
+    assert api.circuit_breaker.state == QCIRCUITBREAKER.HALF_OPEN
+
+    # next probe is let through
+    assert api.synth.job_status(job_id)["status"] == "done"
+    assert api.circuit_breaker.state == QCIRCUITBREAKER.CLOSED
@@ -0,0 +1,71 @@
+import time
+
+from quantastica.qps_api import QJOBSCHEDULER, QJOBJOURNAL
+
+
+def test_jobs_queued_by_others_dont_block_scheduler(stub, client, problem):
+    stub.job_duration = 0.02
+    # another client's queue that never drains
+    for i in range(3):
+        stub.add_job({ "type": "vectors", "status": "queued" })
+
+    scheduler = QJOBSCHEDULER(client, max_queued=1, poll_interval=0.01)
+    synth = scheduler.synth()
+    job_ids = [synth.solve(problem(seed)) for seed in range(3)]
+
+    jobs = synth.wait_jobs(job_ids, timeout=10.0)
+
+    assert [job["status"] for job in jobs] == ["done"] * 3
+    assert scheduler.stats()["server_queued"] >= 3
+    scheduler.close()
+
+
+def test_max_queued_limits_jobs_started_by_scheduler(stub, client, problem):
+    # the first started job runs for the whole test, the next ones stay queued
+    stub.job_duration = 60.0
+
+    scheduler = QJOBSCHEDULER(client, max_queued=2, poll_interval=0.01)
+    job_ids = [scheduler.submit(problem(seed)) for seed in range(6)]
+    for i in range(3):
+        scheduler.pump()
+
+    statuses = [stub.job(job_id)["status"] for job_id in job_ids]
+    assert statuses == ["running", "queued", "queued", "draft", "draft", "draft"]
+    assert scheduler.held_jobs() == job_ids[3:]
+    scheduler.close()
+
+
+def test_finished_journaled_job_is_not_held(tmp_path, stub, make_client, problem):
+    journal_path = str(tmp_path / "journal.db")
+    client = make_client(stub, job_cache=None, job_journal=QJOBJOURNAL(journal_path))
+    job_id = client.synth.solve(problem(1))
+    client.synth.get_job(job_id)
+    client.job_journal.close()
+
+    # another run re-attaches to the journaled job
+    client = make_client(stub, job_cache=None, job_journal=QJOBJOURNAL(journal_path))
+    scheduler = QJOBSCHEDULER(client, max_queued=1, poll_interval=60.0)
+
+    assert scheduler.submit(problem(1)) == job_id
+    assert scheduler.held_jobs() == []
+    assert scheduler.synth().get_job(job_id, timeout=1.0)["status"] == "done"
+    scheduler.close()
+
+
+def test_job_being_started_is_still_held(stub, client, problem, monkeypatch):
+    start_job = client.synth.start_job
+
+    def slow_start_job(job_id):
+        time.sleep(0.2)
+        return start_job(job_id)
+
+    monkeypatch.setattr(client.synth, "start_job", slow_start_job)
+
+    scheduler = QJOBSCHEDULER(client, max_queued=1, poll_interval=0.01)
+    synth = scheduler.synth()
+    job_ids = [synth.solve(problem(seed)) for seed in range(3)]
+
+    # draft on the server until start_job() returns: not finished
+    assert [job["status"] for job in synth.wait_jobs(job_ids, timeout=10.0)] == ["done"] * 3
+    assert synth.get_job(synth.solve(problem(3)), timeout=10.0)["status"] == "done"
+    scheduler.close()
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from quantastica.qps_api import QSINGLEFLIGHT
+
+
+def _concurrently(function, count):
+    barrier = threading.Barrier(count)
+
+    def call(index):
+        barrier.wait()
+        return function()
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        return list(executor.map(call, range(count)))
+
+
+def test_identical_concurrent_solve_calls_share_one_job(stub, client, problem):
+    stub.latency = 0.2
+
+    job_ids = _concurrently(lambda: client.synth.solve(problem(1)), 4)
+
+    assert len(set(job_ids)) == 1
+    assert stub.stats()["jobs_created"] == 1
+    assert client.single_flight.stats()["coalesced"] == 3
+
+
+def test_identical_concurrent_status_requests_are_coalesced(stub, client, problem, requests_to):
+    job_id = client.synth.solve(problem(1))
+    stub.latency = 0.2
+    before = requests_to(stub, "generator/job/status")
+
+    statuses = _concurrently(lambda: client.synth.job_status(job_id), 4)
+
+    assert [status["status"] for status in statuses] == ["done"] * 4
+    assert requests_to(stub, "generator/job/status") - before == 1
+    # each caller parses its own result
+    assert len(set(id(status) for status in statuses)) == 4
+
+
+def test_disabled_single_flight_makes_every_request(stub, make_client, problem, requests_to):
+    client = make_client(stub, single_flight=None)
+    job_id = client.synth.solve(problem(1))
+    stub.latency = 0.1
+    before = requests_to(stub, "generator/job/status")
+
+    _concurrently(lambda: client.synth.job_status(job_id), 3)
+
+    assert requests_to(stub, "generator/job/status") - before == 3
+
+
+def test_error_is_raised_in_every_waiting_caller():
+    single_flight = QSINGLEFLIGHT()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait()
+        raise ValueError("failed")
+
+    def call():
+        with pytest.raises(ValueError):
+            single_flight.do("key", fail)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=call) for i in range(2)]
+    for follower in followers:
+        follower.start()
+    while(single_flight.stats()["coalesced"] < 2):
+        release.wait(0.01)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert single_flight.stats() == { "calls": 1, "coalesced": 2 }
+    # finished call is forgotten: next call runs again
+    assert single_flight.do("key", lambda: 1) == 1
+
+
+def test_async_solve_calls_share_one_job(stub, async_client, problem):
+    stub.latency = 0.1
+
+    async def solve():
+        return await asyncio.gather(*[async_client.synth.solve(problem(1)) for i in range(3)])
+
+    job_ids = asyncio.run(solve())
+
+    assert len(set(job_ids)) == 1
+    assert stub.stats()["jobs_created"] == 1
@@ -0,0 +1,40 @@
+import time
+
+
+def test_job_ids_are_in_order_of_problems(stub, client, problem):
+    batch_result = client.synth.solve_many([problem(seed) for seed in range(6)])
+
+    assert batch_result.ok()
+    assert [stub.job(job_id)["settings"]["seed"] for job_id in batch_result] == list(range(6))
+
+
+def test_problems_are_submitted_concurrently(stub, client, problem):
+    stub.latency = 0.1
+
+    started = time.monotonic()
+    client.synth.solve_many([problem(seed) for seed in range(8)], start_job=False, max_in_flight=8)
+
+    # one create request each, sequentially at least 0.8 s
+    assert time.monotonic() - started < 0.6
+
+
+def test_failed_problems_are_resubmitted(make_stub, make_client, problem):
+    stub = make_stub(error_rate=1.0, error_status=400, fault_endpoints=["generator/job/create"])
+    client = make_client(stub, circuit_breaker=None)
+
+    failed = client.synth.solve_many([problem(seed) for seed in range(3)])
+    assert not failed.ok()
+    assert failed.failed_indexes() == [0, 1, 2]
+
+    stub.error_rate = 0.0
+    batch_result = client.synth.solve_many([problem(seed) for seed in range(3)], previous_result=failed)
+    assert batch_result.ok()
+    assert stub.stats()["jobs_created"] == 3
+
+
+def test_start_many(stub, client, problem):
+    job_ids = client.synth.solve_many([problem(seed) for seed in range(3)], start_job=False).results
+    assert [stub.job(job_id)["status"] for job_id in job_ids] == ["draft"] * 3
+
+    assert client.synth.start_many(job_ids).ok()
+    assert [job["status"] for job in client.synth.wait_jobs(job_ids)] == ["done"] * 3
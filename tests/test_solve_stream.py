@@ -0,0 +1,41 @@
+def test_stream_yields_every_problem_with_bounded_jobs_in_flight(stub, client, problem):
+    stub.job_duration = 0.01
+    consumed = []
+
+    def problems():
+        for seed in range(10):
+            consumed.append(seed)
+            yield problem(seed)
+
+    results = []
+    for solved_problem, job in client.synth.solve_stream(problems(), max_in_flight=3):
+        # problems are consumed only as jobs finish
+        assert len(consumed) <= len(results) + 3
+        results.append((solved_problem["settings"]["seed"], job["status"]))
+
+    assert sorted(results) == [(seed, "done") for seed in range(10)]
+    assert stub.stats()["max_queue"] <= 3
+
+
+def test_failed_submission_is_yielded_as_error(make_stub, make_client, problem):
+    stub = make_stub(error_rate=1.0, error_status=400, fault_endpoints=["generator/job/create"])
+    client = make_client(stub, circuit_breaker=None)
+
+    results = list(client.synth.solve_stream([problem(1)]))
+
+    assert len(results) == 1
+    assert results[0][1]["status"] == "error" and results[0][1]["_id"] is None
+
+
+def test_iter_circuits_of_job_id_and_job_object(make_stub, make_client, problem):
+    stub = make_stub(num_circuits=5)
+    client = make_client(stub, job_cache=None)
+    job_id = client.synth.solve(problem(1))
+
+    streamed = list(client.synth.iter_circuits(job_id))
+    job = client.synth.get_job(job_id)
+
+    assert len(streamed) == 5
+    assert streamed == job["output"]["circuits"]
+    assert list(client.synth.iter_circuits(job, fields=["qasm"])) == [{ "qasm": circuit["qasm"] } for circuit in streamed]
+    assert list(client.synth.iter_circuits(job_id, fields=["qasm"])) == [{ "qasm": circuit["qasm"] } for circuit in streamed]
@@ -0,0 +1,121 @@
+import gzip
+import json
+import time
+
+import pytest
+import requests
+
+from quantastica.qps_api.stub_server import QSTUBSERVER
+
+
+def _post(stub, endpoint, data=None, headers=None):
+    all_headers = { "Authorization": "Bearer stub-token" }
+    all_headers.update(headers or {})
+
+    return requests.post(stub.url + "/api/" + endpoint, data=json.dumps(data or {}), headers=all_headers, timeout=10)
+
+
+def _create(stub, start=True):
+    job_id = _post(stub, "generator/job/create", { "type": "vectors" }).json()["_id"]
+    if(start):
+        _post(stub, "generator/job/start", { "_id": job_id }).raise_for_status()
+
+    return job_id
+
+
+def test_started_jobs_run_one_at_a_time(make_stub):
+    stub = make_stub(job_duration=0.2, num_circuits=3)
+    first, second = _create(stub), _create(stub)
+
+    assert [stub.job(job_id)["status"] for job_id in (first, second)] == ["running", "queued"]
+
+    time.sleep(0.5)
+    jobs = [_post(stub, "generator/job/get", { "_id": job_id }).json() for job_id in (first, second)]
+    assert [job["status"] for job in jobs] == ["done", "done"]
+    assert len(jobs[0]["output"]["circuits"]) == 3
+    # second job starts when the first one finishes
+    assert jobs[1]["startedAt"] == jobs[0]["finishedAt"]
+
+    stats = stub.stats()
+    assert (stats["jobs_created"], stats["jobs_finished"], stats["max_queue"]) == (2, 2, 2)
+    assert stats["statuses"] == { "done": 2 }
+
+
+def test_jobs_can_be_stopped_and_reset(make_stub):
+    stub = make_stub(job_duration=10.0)
+    running, queued = _create(stub), _create(stub)
+
+    _post(stub, "generator/job/stop", { "_id": queued })
+    assert stub.job(queued)["status"] == "draft"
+
+    assert _post(stub, "generator/job/reset", { "_id": running }).status_code == 400
+    stopped = _post(stub, "generator/job/stop_all").json()["stopped"]
+    assert [job["_id"] for job in stopped] == [running]
+
+    stub.update_job(running, status="done", output={ "circuits": [] })
+    assert _post(stub, "generator/job/reset", { "_id": running }).status_code == 200
+    assert "output" not in stub.job(running) and stub.job(running)["status"] == "draft"
+
+    assert _post(stub, "generator/job/status", { "_id": "missing" }).status_code == 404
+
+
+def test_added_jobs_are_listed_but_not_run(stub):
+    done = stub.add_job({ "name": "history" })
+    queued = stub.add_job({ "status": "queued", "createdAt": None })
+
+    listed = _post(stub, "generator/job/list", { "status": "queued" }).json()["list"]
+    assert [job["_id"] for job in listed] == [queued]
+    assert stub.job(done)["status"] == "done" and stub.job(queued)["status"] == "queued"
+    assert stub.stats()["jobs_created"] == 0
+
+
+def test_faults_are_injected_only_to_fault_endpoints(make_stub):
+    stub = make_stub(error_rate=1.0, error_status=429, retry_after=2, fault_endpoints=["generator/job/create"])
+
+    response = _post(stub, "generator/job/create")
+    assert response.status_code == 429 and response.headers["Retry-After"] == "2"
+    assert _post(stub, "generator/job/list").status_code == 200
+
+    stub.brownout(10.0, status=502)
+    assert _post(stub, "generator/job/list").status_code == 502
+    assert stub.stats()["errors"] == 2
+
+
+def test_timeouts_are_injected(make_stub):
+    stub = make_stub(timeout_rate=1.0, timeout_seconds=0.3)
+
+    started = time.monotonic()
+    job_id = _create(stub, start=False)
+
+    assert time.monotonic() - started >= 0.3
+    # request is processed, only the response is late
+    assert stub.job(job_id) is not None and stub.stats()["timeouts"] == 1
+
+
+def test_requests_are_authorized_and_decoded(stub):
+    assert requests.post(stub.url + "/api/generator/job/list", data="{}", timeout=10).status_code == 401
+    assert _post(stub, "generator/job/unknown").status_code == 404
+
+    body = gzip.compress(json.dumps({ "input": "x", "source": "a", "dest": "b" }).encode("utf-8"))
+    response = requests.post(stub.url + "/api/qconvert", data=body, headers={ "Authorization": "Bearer stub-token", "Content-Encoding": "gzip" }, timeout=10)
+    assert response.text == "// converted from a to b\nx"
+
+
+def test_stats_count_requests_and_bytes(stub):
+    _post(stub, "generator/job/list")
+    _post(stub, "generator/job/list")
+
+    stats = stub.stats()
+    assert stats["requests"] == { "generator/job/list": 2 }
+    assert stats["bytes_in"] == 4 and stats["bytes_out"] > 0
+
+    stub.reset_stats()
+    assert stub.stats()["requests"] == {}
+
+
+def test_server_can_be_used_as_context_manager():
+    with QSTUBSERVER(seed=1) as stub:
+        assert _post(stub, "generator/job/list").status_code == 200
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        requests.post(stub.url + "/api/generator/job/list", timeout=2)
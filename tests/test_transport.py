@@ -0,0 +1,72 @@
+from quantastica.qps_api.qps_api import QHTTPTRANSPORT
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def close(self):
+        return
+
+
+class FakeSession:
+    # records Content-Encoding of each request. Compressed bodies are answered with compressed_status.
+    def __init__(self, compressed_status=200):
+        self.compressed_status = compressed_status
+        self.encodings = []
+
+    def post(self, url, headers, data, timeout, stream):
+        encoding = headers.get("Content-Encoding")
+        self.encodings.append(encoding)
+        return FakeResponse(self.compressed_status if encoding is not None else 200)
+
+
+def transport_with(session, **options):
+    transport = QHTTPTRANSPORT(**options)
+    transport._session = session
+    return transport
+
+
+BIG = { "data": "x" * 100000 }
+
+
+def test_request_bodies_are_not_compressed_by_default():
+    session = FakeSession()
+    transport = transport_with(session)
+
+    assert transport.compress_threshold is None
+    transport.post("http://server/a", {}, BIG, timeout=1)
+    assert session.encodings == [None]
+
+
+def test_compression_is_opt_in():
+    session = FakeSession()
+    transport = transport_with(session, compress_threshold=1024)
+
+    transport.post("http://server/a", {}, BIG, timeout=1)
+    transport.post("http://server/a", {}, { "data": "small" }, timeout=1)
+    assert session.encodings == ["gzip", None]
+
+
+def test_rejected_compression_is_remembered_per_server():
+    for status_code in (400, 415):
+        session = FakeSession(compressed_status=status_code)
+        transport = transport_with(session, compress_threshold=1024)
+
+        assert transport.post("http://server/a", {}, BIG, timeout=1).status_code == 200
+        assert transport.post("http://server/b", {}, BIG, timeout=1).status_code == 200
+        assert session.encodings == ["gzip", None, None]
+
+        # other server is tried compressed
+        transport.post("http://other/a", {}, BIG, timeout=1)
+        assert session.encodings[-2:] == ["gzip", None]
+
+
+def test_stub_server_accepts_compressed_bodies(stub, make_client, problem):
+    client = make_client(stub)
+    client.transport.compress_threshold = 100
+
+    job_id = client.synth.solve(dict(problem(1), name="x" * 1000), start_job=False)
+
+    assert stub.job(job_id)["name"] == "x" * 1000
+    assert stub.stats()["bytes_in"] < 1000
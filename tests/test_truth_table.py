@@ -0,0 +1,61 @@
+import pytest
+
+from quantastica.qps_api.truth_table import compile_truth_table
+
+
+COLUMNS = ["input", "input", "ignore", "output"]
+
+CSV = "A,B,Note,Y\n1,1,x,0\n0,0,y,0\n0,1,z,1\n1,0,w,1\n"
+
+
+def test_csv_is_compiled_sorted_without_ignored_columns():
+    table = compile_truth_table(CSV, COLUMNS)
+
+    assert (table.num_rows(), table.num_inputs(), table.num_outputs()) == (4, 2, 1)
+    assert table.to_csv() == "A,B,Y\n0,0,0\n0,1,1\n1,0,1\n1,1,0\n"
+    assert [coldef["index"] for coldef in table.payload_coldefs()] == [0, 1, 2]
+
+
+def test_rows_lists_and_tab_delimited_text_give_the_same_table():
+    expected = compile_truth_table(CSV, COLUMNS).to_csv().split("\n", 1)[1]
+
+    assert compile_truth_table([[1, 1, 0, 0], [0, 0, 0, 0], [0, 1, 0, 1], [1, 0, 0, 1]], COLUMNS).to_csv().endswith(expected)
+    assert compile_truth_table(CSV.replace(",", "\t"), COLUMNS).to_csv() == compile_truth_table(CSV, COLUMNS).to_csv()
+    assert compile_truth_table(CSV.splitlines(True), COLUMNS).to_csv() == compile_truth_table(CSV, COLUMNS).to_csv()
+
+
+def test_numpy_array_is_packed_like_csv():
+    np = pytest.importorskip("numpy")
+
+    array = np.array([[1, 1, 5, 0], [0, 0, 5, 0], [0, 1, 5, 1], [1, 0, 5, 1]])
+    assert compile_truth_table(array, COLUMNS).rows.keys() == compile_truth_table(CSV, COLUMNS).rows.keys()
+
+    with pytest.raises(Exception, match="not binary"):
+        compile_truth_table(np.array([[1, 2, 0, 0]]), COLUMNS)
+
+
+def test_duplicates_are_merged_and_conflicts_rejected():
+    table = compile_truth_table("0,0,a,1\n0,0,b,1\n", COLUMNS)
+    assert table.num_rows() == 1 and table.num_duplicates == 1
+
+    with pytest.raises(Exception, match="Conflicting rows: line 1 and line 2"):
+        compile_truth_table("0,0,a,1\n0,0,b,0\n", COLUMNS)
+
+
+@pytest.mark.parametrize("truth_table, message", [
+    ("0,0,a,2\n", "not binary"),
+    ("0,0,a,1\n0,0,1\n", "has 3 columns"),
+    ("0,0,1\n", "doesn't match number of column_defs"),
+    ("", "empty")
+])
+def test_malformed_tables_are_rejected(truth_table, message):
+    with pytest.raises(Exception, match=message):
+        compile_truth_table(truth_table, COLUMNS)
+
+
+def test_problem_sends_compiled_table(stub, client):
+    job_id = client.synth.circuit_from_truth_table(CSV, COLUMNS, start_job=False)
+
+    source = stub.job(job_id)["source"]["truth"]
+    assert source["text"] == "A,B,Y\n0,0,0\n0,1,1\n1,0,1\n1,1,0\n"
+    assert len(source["coldefs"]) == 3
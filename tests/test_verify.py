@@ -0,0 +1,70 @@
+import pytest
+
+from quantastica.qps_api import verify_job, verify_circuits, circuit_unitary, parse_qasm
+
+
+np = pytest.importorskip("numpy")
+
+BELL = "OPENQASM 2.0;\ninclude \"qelib1.inc\";\nqreg q[2];\nh q[0];\ncx q[0], q[1];\n"
+
+CX = [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]]
+
+
+def test_unitary_respects_endianness():
+    circuit = "qreg q[2]; cx q[0], q[1];"
+
+    assert np.allclose(circuit_unitary(circuit), CX)
+    assert np.allclose(circuit_unitary(circuit, endianness="little"), [[1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0], [0, 1, 0, 0]])
+
+
+def test_fused_gates_give_the_same_unitary_as_plain_product():
+    circuit = parse_qasm("qreg q[2]; h q[0]; rz(pi/3) q[0]; x q[1]; cx q[1], q[0]; ry(0.2) q[1]; cx q[0], q[1];")
+    hadamard = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+    rz = np.diag([np.exp(-1j * np.pi / 6), np.exp(1j * np.pi / 6)])
+    x = np.array([[0, 1], [1, 0]])
+    ry = np.array([[np.cos(0.1), -np.sin(0.1)], [np.sin(0.1), np.cos(0.1)]])
+    cx_10 = np.array([[1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0], [0, 1, 0, 0]])
+    expected = np.kron(np.eye(2), ry) @ cx_10 @ np.kron(rz @ hadamard, x)
+
+    assert np.allclose(circuit_unitary(circuit), np.array(CX) @ expected)
+
+
+def test_circuits_are_checked_against_vectors_and_unitary():
+    s = 1 / np.sqrt(2)
+    results = verify_circuits([BELL, "qreg q[2]; h q[0];"], vector_pairs=[([1, 0, 0, 0], [s, 0, 0, s])])
+    assert [result["valid"] for result in results] == [True, False]
+    assert results[0]["diff"] < 1e-9
+
+    unitary = "[[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]]"
+    assert verify_circuits([{ "qasm": "qreg q[2]; cx q[0], q[1];", "diff": 0 }], unitary=unitary)[0]["reported_diff"] == 0
+    assert verify_circuits(["qreg q[2]; cx q[0], q[1];"], unitary=unitary)[0]["valid"]
+
+
+def test_equivalent_source_circuit_is_valid_up_to_global_phase():
+    results = verify_circuits(["qreg q[1]; rz(pi/2) q[0];", "qreg q[1]; rx(pi/2) q[0];"], source_circuit="qreg q[1]; s q[0];", diff_method="ignorephase")
+
+    assert [result["valid"] for result in results] == [True, False]
+
+
+def test_job_is_verified_against_its_problem():
+    job = {
+        "type": "vectors",
+        "source": { "vectors": { "text1": "[1, 0]\n[0, 1]", "text2": "[0, 1]\n[1, 0]" } },
+        "settings": { "max_diff": 1e-6 },
+        "output": { "circuits": [{ "qasm": "qreg q[1]; x q[0];" }, { "program": [{ "name": "h", "wires": [0] }] }] }
+    }
+
+    assert [result["valid"] for result in verify_job(job)] == [True, False]
+
+    with pytest.raises(Exception, match="cannot be verified"):
+        verify_job({ "type": "truth" })
+
+
+def test_job_id_is_fetched_when_finished(make_stub, make_client):
+    stub = make_stub(num_circuits=3)
+    client = make_client(stub)
+    job_id = client.synth.transpile(BELL)
+
+    results = client.synth.verify_job(job_id, timeout=10.0)
+
+    assert [result["index"] for result in results] == [0, 1, 2]